@@ -2,6 +2,9 @@
 import sys
 import os
 import json
+import threading
+import time
+from contextlib import nullcontext
 from typing import Optional, Dict, Any
 from pathlib import Path
 
@@ -10,15 +13,41 @@ REPO_ROOT = Path(__file__).resolve().parent
 if str(REPO_ROOT) not in sys.path:
     sys.path.append(str(REPO_ROOT))
 
-from core.file_ops import list_files, read_file, write_file, append_to_file, delete_file, rename_file, copy_file, move_file
-from core.code_execution import run_python_code
-from core.file_extended import exists, size, batch_rename, zip_folder, unzip_file, replace_text, count_lines, find_large
-from core.system_extended import disk_space, cpu_usage, shell, rand_pass, open_url, open_file_in_vscode
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+# Heavy or optional modules (requests, asyncio, sqlite3, psutil, ...) are imported
+# where they are used, and file/system commands load from plugins/ on first use,
+# so starting Lucien stays fast; `python Lucien.py --profile-startup` checks it.
+from core.commit_cache import CommitMessageCache, staged_tree
+from core.diff_summary import format_summaries, read_file_diff, summarize_files
+from core.git_stream import LOG_FORMAT, git_records, parse_log, parse_status_v2
+from core.workspace import Workspace, repo_log, repo_pull, repo_status, run_across
+from core.hedging import Hedger
+from core.history import ConversationHistory
+from core.http_pool import PoolConfig, get_session
+from core.llm_cache import ResponseCache, make_key
+from core.ollama_warm import WarmthStats, start_preload
+from core.rate_limit import RequestScheduler
+from core.singleflight import SingleFlight
+from core.speculation import Speculator
+from core.router import CommandTable
+from core.spell_dag import parse_stages, run_dag, step_order
+from core.incremental import Manifest
+from core.scheduler import Scheduler
+from core.output_capture import install as install_thread_output
+from core.plugins import plugin_status, read_manifest, register
+from core import semantic_cache
+from core.telemetry import Telemetry
+from core.tokens import estimate_messages_tokens, estimate_tokens
+from core.llm_stream import STREAM_HISTORY, StreamStats, iter_sse_content, iter_ndjson_content, timed
+from plugins import INTERACTIVE as INTERACTIVE_COMMANDS, MANIFEST as PLUGIN_MANIFEST
+
+# Load environment variables. Every setting below is read at import time, so
+# .env cannot wait for main(); python-dotenv itself is only imported when there
+# is a file for it to load (the one its own search would find: next to this
+# file or in a parent directory).
+_DOTENV = next((d / ".env" for d in (REPO_ROOT, *REPO_ROOT.parents) if (d / ".env").is_file()), None)
+if _DOTENV is not None:
+    from dotenv import load_dotenv
+    load_dotenv(_DOTENV)
 
 # --- Configuration & Environment ---
 # Prefer environment variables. Optionally support .env if python-dotenv is installed.
@@ -37,7 +66,30 @@ GROQ_API_KEY = _getenv("GROQ_API_KEY")  # required if using Groq
 
 # Feature flags
 USE_INTERNET = _getenv("USE_INTERNET", "true").lower() == "true"
+OLLAMA_KEEP_ALIVE = _getenv("OLLAMA_KEEP_ALIVE", "30m")  # how long Ollama keeps the model loaded
+OLLAMA_PRELOAD = _getenv("OLLAMA_PRELOAD", "true").lower() == "true"
+STREAM_OUTPUT = _getenv("LUCIEN_STREAM", "false").lower() == "true"
+HEDGE_ENABLED = _getenv("LUCIEN_HEDGE", "false").lower() == "true"
+HISTORY_ENABLED = _getenv("LUCIEN_HISTORY", "true").lower() == "true"
+SEMANTIC_ENABLED = _getenv("LUCIEN_SEMANTIC_CACHE", "false").lower() == "true"
+SPECULATE_COMMIT = _getenv("LUCIEN_SPECULATE_COMMIT", "false").lower() == "true"
 DEFAULT_TIMEOUT = 30  # seconds
+BATCH_CONCURRENCY = int(_getenv("LUCIEN_BATCH_CONCURRENCY", "4"))
+SPELL_WORKERS = int(_getenv("LUCIEN_SPELL_WORKERS", "4"))  # parallel spell steps
+WORKSPACE_WORKERS = int(_getenv("LUCIEN_WORKSPACE_WORKERS", "8"))  # repos handled in parallel
+GIT_STATUS_LIMIT = int(_getenv("LUCIEN_GIT_STATUS_LIMIT", "200"))  # rows per `git status` page, 0 = all
+COMMIT_WORKERS = int(_getenv("LUCIEN_COMMIT_WORKERS", "4"))  # parallel per-file diff summaries
+DIFF_FILE_CHARS = int(_getenv("LUCIEN_DIFF_FILE_CHARS", "6000"))  # diff text kept per file
+COMMIT_DIRECT_TOKENS = int(_getenv("LUCIEN_COMMIT_DIRECT_TOKENS", "3000"))  # staged diffs up to this go in one call
+
+# Pooled keep-alive HTTP sessions, one per provider
+HTTP_POOL = PoolConfig(
+    pool_size=int(_getenv("LUCIEN_POOL_SIZE", "10")),
+    connect_timeout=float(_getenv("LUCIEN_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(_getenv("LUCIEN_READ_TIMEOUT", str(DEFAULT_TIMEOUT))),
+    keepalive=_getenv("LUCIEN_KEEPALIVE", "true").lower() == "true",
+    keepalive_idle=int(_getenv("LUCIEN_KEEPALIVE_IDLE", "60")),
+)
 
 HEADERS_GROQ = {
     "Authorization": f"Bearer {GROQ_API_KEY}" if GROQ_API_KEY else "",
@@ -60,6 +112,19 @@ You are Lucien, a modern wizard AI coding assistant.
 Keep responses concise and practical.
 """
 
+# ============
+# COMMAND REGISTRY
+# ============
+
+COMMANDS = CommandTable()  # name -> handler, routed by longest word prefix
+
+def command(name):
+    """Decorator to register commands in the router."""
+    def _wrap(fn):
+        COMMANDS[name] = fn
+        return fn
+    return _wrap
+
 # ============
 # MEMORY HANDLING
 # ============
@@ -70,11 +135,34 @@ def load_memory():
     with open(MEMORY_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def _write_json_atomic(path, data) -> None:
+    """Write through a temp file and rename, so readers never see a half-written file."""
+    import tempfile
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
 def save_memory(mem):
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(mem, f, indent=2)
+    _write_json_atomic(MEMORY_FILE, mem)
 
-memory = load_memory()
+# Loaded on first use (get_memory), so commands that never touch memory skip the file read
+memory = None
+
+def get_memory() -> dict:
+    global memory
+    if memory is None:
+        memory = load_memory()
+    return memory
+
+def save_loaded_memory() -> None:
+    if memory is not None:
+        save_memory(memory)
 
 # ============
 # LLM HANDLERS
@@ -86,6 +174,42 @@ memory = load_memory()
 # IMPROVED LLM HANDLERS (Generic API functions)
 # ============
 
+# Per-call latency, payload size, token usage and outcome for every provider request
+TELEMETRY = Telemetry(path=_getenv("LUCIEN_METRICS_FILE"))
+
+def _requests_errors():
+    import requests
+    return (requests.ConnectionError, requests.Timeout)
+
+# Shared pacing/retry gate for every Groq request (interactive, batch and streaming)
+GROQ_SCHEDULER = RequestScheduler(
+    requests_per_min=int(_getenv("GROQ_RPM", "30")),
+    tokens_per_min=int(_getenv("GROQ_TPM", "6000")),
+    max_retries=int(_getenv("LUCIEN_MAX_RETRIES", "4")),
+    retry_exceptions=_requests_errors,  # resolved on the first request
+)
+GROQ_COMPLETION_ESTIMATE = 256  # tokens reserved per call for the answer
+
+def _groq_post(payload, messages, stream=False):
+    """POST to Groq through the scheduler; retries 429/5xx before giving up."""
+    session = get_session("groq", HTTP_POOL)
+
+    def send():
+        return session.post(GROQ_API_URL, json=payload, headers=HEADERS_GROQ,
+                            timeout=HTTP_POOL.timeout, stream=stream)
+
+    tokens = estimate_messages_tokens(messages) + GROQ_COMPLETION_ESTIMATE
+    return GROQ_SCHEDULER.submit(send, tokens=tokens)
+
+def _payload_bytes(payload) -> int:
+    return len(json.dumps(payload).encode("utf-8"))
+
+def _counted(lines, record):
+    """Pass streamed lines through while counting received bytes."""
+    for line in lines:
+        record["bytes_received"] += len(line) + 1
+        yield line
+
 def chat_groq(messages, model="llama3-8b", temperature=0.2) -> str:
     """
     Calls Groq's OpenAI-compatible chat API and returns assistant content.
@@ -96,58 +220,326 @@ def chat_groq(messages, model="llama3-8b", temperature=0.2) -> str:
     import requests
     payload = {"model": model, "messages": messages, "temperature": float(temperature)}
     try:
-        resp = requests.post(GROQ_API_URL, json=payload, headers=HEADERS_GROQ, timeout=DEFAULT_TIMEOUT)
-        resp.raise_for_status()
-        try:
-            data = resp.json()
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Groq: invalid JSON response: {e}") from e
-        try:
-            return data["choices"][0]["message"]["content"]
-        except (KeyError, IndexError) as e:
-            raise RuntimeError(f"Groq: unexpected response format: {data}") from e
+        with TELEMETRY.track("groq", model) as rec:
+            rec["bytes_sent"] = _payload_bytes(payload)
+            resp = _groq_post(payload, messages)
+            rec["status"] = resp.status_code
+            rec["bytes_received"] = len(resp.content or b"")
+            resp.raise_for_status()
+            try:
+                data = resp.json()
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"Groq: invalid JSON response: {e}") from e
+            usage = data.get("usage") or {}
+            rec["prompt_tokens"] = usage.get("prompt_tokens")
+            rec["completion_tokens"] = usage.get("completion_tokens")
+            try:
+                return data["choices"][0]["message"]["content"]
+            except (KeyError, IndexError) as e:
+                raise RuntimeError(f"Groq: unexpected response format: {data}") from e
     except requests.RequestException as e:
         raise RuntimeError(f"Groq request failed: {e}") from e
 
+# Cold vs warm timings of local model calls
+OLLAMA_WARMTH = WarmthStats()
+
+def preload_ollama(model: str = "llama3"):
+    """Loads the local model in the background so the first question is warm."""
+    return start_preload(lambda: get_session("ollama", HTTP_POOL), OLLAMA_URL, model,
+                         OLLAMA_KEEP_ALIVE, HTTP_POOL.read_timeout, OLLAMA_WARMTH)
+
 def chat_ollama(messages, model="llama3", temperature=0.2) -> str:
     """
     Calls local Ollama chat endpoint and returns assistant content.
     """
     import requests
-    payload = {"model": model, "messages": messages, "options": {"temperature": float(temperature)}}
+    payload = {"model": model, "messages": messages, "stream": False,
+               "keep_alive": OLLAMA_KEEP_ALIVE, "options": {"temperature": float(temperature)}}
     try:
-        r = requests.post(OLLAMA_URL, json=payload, timeout=DEFAULT_TIMEOUT)
-        r.raise_for_status()
-        try:
-            result = r.json()
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Ollama: invalid JSON response: {e}") from e
-        try:
-            return result["message"]["content"]
-        except KeyError as e:
-            raise RuntimeError(f"Ollama: unexpected response format: {result}") from e
+        with TELEMETRY.track("ollama", model) as rec:
+            rec["bytes_sent"] = _payload_bytes(payload)
+            session = get_session("ollama", HTTP_POOL)
+            start = time.perf_counter()
+            r = session.post(OLLAMA_URL, json=payload, timeout=HTTP_POOL.timeout)
+            rec["status"] = r.status_code
+            rec["bytes_received"] = len(r.content or b"")
+            r.raise_for_status()
+            try:
+                result = r.json()
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"Ollama: invalid JSON response: {e}") from e
+            OLLAMA_WARMTH.record(model, time.perf_counter() - start, result)
+            rec["prompt_tokens"] = result.get("prompt_eval_count")
+            rec["completion_tokens"] = result.get("eval_count")
+            try:
+                return result["message"]["content"]
+            except KeyError as e:
+                raise RuntimeError(f"Ollama: unexpected response format: {result}") from e
+    except requests.RequestException as e:
+        raise RuntimeError(f"Ollama request failed: {e}") from e
+
+def stream_groq(messages, model="llama3-8b", temperature=0.2):
+    """
+    Streams Groq's SSE chat completion, yielding content tokens as they arrive.
+    Time-to-first-token and tokens/sec are recorded in STREAM_HISTORY.
+    """
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY is not set. Export it or add to your environment.")
+    import requests
+    payload = {"model": model, "messages": messages, "temperature": float(temperature), "stream": True}
+    stats = StreamStats("groq", model)
+    try:
+        with TELEMETRY.track("groq", model, stream=True) as rec:
+            rec["bytes_sent"] = _payload_bytes(payload)
+            with _groq_post(payload, messages, stream=True) as resp:
+                rec["status"] = resp.status_code
+                resp.raise_for_status()
+                lines = _counted(resp.iter_lines(), rec)
+                yield from timed(iter_sse_content(lines, stats), stats)
+            rec["prompt_tokens"] = stats.prompt_tokens
+            rec["completion_tokens"] = stats.tokens
+    except requests.RequestException as e:
+        raise RuntimeError(f"Groq request failed: {e}") from e
+
+def stream_ollama(messages, model="llama3", temperature=0.2):
+    """
+    Streams Ollama's NDJSON chat response, yielding content tokens as they arrive.
+    """
+    import requests
+    payload = {"model": model, "messages": messages, "stream": True,
+               "keep_alive": OLLAMA_KEEP_ALIVE, "options": {"temperature": float(temperature)}}
+    stats = StreamStats("ollama", model)
+    try:
+        with TELEMETRY.track("ollama", model, stream=True) as rec:
+            rec["bytes_sent"] = _payload_bytes(payload)
+            session = get_session("ollama", HTTP_POOL)
+            with session.post(OLLAMA_URL, json=payload, timeout=HTTP_POOL.timeout, stream=True) as r:
+                rec["status"] = r.status_code
+                r.raise_for_status()
+                lines = _counted(r.iter_lines(), rec)
+                yield from timed(iter_ndjson_content(lines, stats), stats)
+            if stats.final:
+                OLLAMA_WARMTH.record(model, stats.finished - stats.started, stats.final)
+            rec["prompt_tokens"] = stats.prompt_tokens
+            rec["completion_tokens"] = stats.tokens
     except requests.RequestException as e:
         raise RuntimeError(f"Ollama request failed: {e}") from e
 
+def print_stream(tokens) -> str:
+    """Print tokens as they arrive and return the full text."""
+    parts = []
+    for token in tokens:
+        print(token, end="", flush=True)
+        parts.append(token)
+    print()
+    return "".join(parts)
+
+# ============
+# RESPONSE CACHE
+# ============
+
+CACHE_ENABLED = _getenv("LUCIEN_CACHE", "true").lower() == "true"
+LLM_CACHE = ResponseCache(
+    _getenv("LUCIEN_CACHE_DIR", ".lucien/cache/llm"),
+    max_entries=int(_getenv("LUCIEN_CACHE_ENTRIES", "256")),
+    ttl=float(_getenv("LUCIEN_CACHE_TTL", str(7 * 24 * 3600))),
+    max_bytes=int(_getenv("LUCIEN_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+)
+
+DEFAULT_MODELS = {"groq": "llama3-70b-8192", "ollama": "llama3"}
+
+def build_messages(prompt: str) -> list:
+    """Standard [system, user] message list for a single prompt."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+
+# Groq -> local Ollama hedging; thresholds come from observed Groq latency
+HEDGER = Hedger(
+    percentile=float(_getenv("LUCIEN_HEDGE_PERCENTILE", "95")),
+    default_delay=float(_getenv("LUCIEN_HEDGE_DELAY", "2.0")),
+    log_path=_getenv("LUCIEN_HEDGE_LOG", ".lucien/hedge.jsonl"),
+)
+
+def _hedged_chat(messages, model: str, temperature) -> tuple:
+    """Races Groq against local Ollama; returns (provider, model, answer)."""
+    fallback = DEFAULT_MODELS["ollama"]
+    winner, out = HEDGER.call(
+        ("groq", lambda: chat_groq(messages, model=model, temperature=temperature)),
+        ("ollama", lambda: chat_ollama(messages, model=fallback, temperature=temperature)),
+    )
+    return winner, (model if winner == "groq" else fallback), out
+
+INFLIGHT = SingleFlight()
+
+def _cached_answer(key: str, use_cache: bool) -> Optional[str]:
+    if not (use_cache and CACHE_ENABLED):
+        return None
+    return LLM_CACHE.get(key)
+
+def ask_llm(provider: str, messages, model: Optional[str] = None, temperature=0.5, use_cache=True) -> str:
+    """
+    Returns a complete answer from the provider, served from the response cache
+    when an identical request was answered before. use_cache=False skips the
+    lookup but still refreshes the stored answer.
+    """
+    model = model or DEFAULT_MODELS[provider]
+    key = make_key(provider, model, temperature, messages)
+    cached = _cached_answer(key, use_cache)
+    if cached is not None:
+        return cached
+    # Identical requests already on the wire share that call's answer
+    return INFLIGHT.do(key, lambda: _fetch_answer(provider, messages, model, temperature, key))
+
+def _fetch_answer(provider: str, messages, model: str, temperature, key: str) -> str:
+    if HEDGE_ENABLED and provider == "groq":
+        provider, model, out = _hedged_chat(messages, model, temperature)
+        key = make_key(provider, model, temperature, messages)
+    else:
+        chat = chat_groq if provider == "groq" else chat_ollama
+        out = chat(messages, model=model, temperature=temperature)
+    if CACHE_ENABLED:
+        LLM_CACHE.put(key, out)
+    return out
+
+def respond(provider: str, messages, temperature=0.5, use_cache=True) -> str:
+    """
+    Prints an answer for the REPL, streaming it when stream mode is on.
+    Hedging races complete answers, so it only applies when not streaming.
+    """
+    if not STREAM_OUTPUT:
+        out = ask_llm(provider, messages, temperature=temperature, use_cache=use_cache)
+        print(out)
+        return out
+    model = DEFAULT_MODELS[provider]
+    key = make_key(provider, model, temperature, messages)
+    cached = _cached_answer(key, use_cache)
+    if cached is not None:
+        print(cached)
+        return cached
+    stream = stream_groq if provider == "groq" else stream_ollama
+    out = print_stream(stream(messages, model=model, temperature=temperature))
+    if CACHE_ENABLED:
+        LLM_CACHE.put(key, out)
+    return out
+
+# ============
+# CONVERSATION HISTORY
+# ============
+
+def _summarize_turns(previous: str, turns) -> str:
+    """Folds turns that fell out of the context window into the running summary."""
+    transcript = "\n".join(f"User: {user}\nLucien: {answer}" for user, answer in turns)
+    messages = [
+        {"role": "system", "content": "Summarize this conversation in a few short sentences. Keep facts, names and decisions needed to continue it."},
+        {"role": "user", "content": f"Earlier summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"}
+    ]
+    return ask_llm("groq" if USE_INTERNET else "ollama", messages, temperature=0.2)
+
+def new_conversation() -> ConversationHistory:
+    return ConversationHistory(
+        budget=int(_getenv("LUCIEN_HISTORY_TOKENS", "2048")),
+        summarizer=_summarize_turns if _getenv("LUCIEN_HISTORY_SUMMARY", "false").lower() == "true" else None,
+    )
+
+CONVERSATION = new_conversation()  # the REPL's; each daemon client session has its own
+
+# ============
+# SEMANTIC CACHE (optional, needs numpy)
+# ============
+
+_semantic = None
+
+def get_semantic_cache():
+    """The near-duplicate prompt cache, built on first use; None without numpy."""
+    global _semantic
+    if _semantic is None and semantic_cache.available():
+        _semantic = semantic_cache.SemanticCache(
+            max_entries=int(_getenv("LUCIEN_SEMANTIC_ENTRIES", "10000")),
+            threshold=float(_getenv("LUCIEN_SEMANTIC_THRESHOLD", "0.85")),
+        )
+    return _semantic
+
+def _semantic_namespace(provider: str, messages, temperature) -> str:
+    # Only the last turn of the history: the whole history would change the key every
+    # time, but without any, a follow-up like "explain more" would get an answer
+    # written for some other conversation. Opening questions all share one namespace
+    context = [{"role": "system", "content": system_prompt}] + list(messages[1:-1][-2:])
+    return make_key(provider, DEFAULT_MODELS[provider], temperature, context)
+
+def semantic_answer(provider: str, messages, temperature=0.5) -> Optional[str]:
+    """Cached answer to a near-identical earlier question, if any."""
+    cache = get_semantic_cache() if SEMANTIC_ENABLED else None
+    if cache is None:
+        return None
+    hit = cache.lookup(_semantic_namespace(provider, messages, temperature), messages[-1]["content"])
+    return hit[0] if hit else None
+
+def remember_semantic(provider: str, messages, answer: str, temperature=0.5) -> None:
+    cache = get_semantic_cache() if SEMANTIC_ENABLED else None
+    if cache is not None:
+        cache.add(_semantic_namespace(provider, messages, temperature), messages[-1]["content"], answer)
+
 # ============
 # GIT INTEGRATION
 # ============
 
+def _git_options(args: str, options: dict) -> tuple:
+    """
+    Parse ``--flag value`` options for git commands.
+
+    Args:
+        options: Flag -> converter (e.g. int, str) for each accepted option.
+
+    Returns:
+        tuple: ({flag: value}, remaining positional args)
+    """
+    import shlex
+    tokens = shlex.split(args)
+    values, rest = {}, []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in options:
+            if i + 1 >= len(tokens):
+                raise ValueError(f"{token} needs a value")
+            values[token] = options[token](tokens[i + 1])
+            i += 2
+        elif token.startswith("-"):
+            raise ValueError(f"unknown option {token}")
+        else:
+            rest.append(token)
+            i += 1
+    return values, rest
+
 @command("git status")
 def cmd_git_status(args: str) -> None:
-    """Show current git repository status"""
+    """Show repository status: git status [--limit N] [--offset N] [paths...]"""
     try:
         import subprocess
-        result = subprocess.run(["git", "status", "--porcelain"], 
-                              capture_output=True, text=True, check=True)
-        if result.stdout.strip():
-            print("Modified files:")
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    status, filename = line[:2], line[3:]
-                    print(f"  {status} {filename}")
-        else:
+        opts, paths = _git_options(args, {"--limit": int, "--offset": int})
+    except ValueError as e:
+        print(f"❌ Invalid arguments: {e}")
+        return
+    limit = opts.get("--limit", GIT_STATUS_LIMIT)
+    offset = opts.get("--offset", 0)
+    cmd = ["status", "--porcelain=v2", "-z"] + (["--"] + paths if paths else [])
+    try:
+        shown = total = 0
+        # Rows are printed as git produces them; past the page we only count
+        for entry in parse_status_v2(git_records(cmd)):
+            total += 1
+            if total <= offset or (limit and shown >= limit):
+                continue
+            if not shown:
+                print("Modified files:")
+            print(f"  {entry}", flush=True)
+            shown += 1
+        if not total:
             print("✅ Working directory clean")
+        elif shown < total:
+            print(f"  ... showing {offset + 1}-{offset + shown} of {total} (use --limit N --offset N)")
     except subprocess.CalledProcessError:
         print("❌ Error: Not a git repository or git command failed")
     except FileNotFoundError:
@@ -165,11 +557,127 @@ def cmd_git_add(args: str) -> None:
         result = subprocess.run(["git", "add"] + files, 
                               capture_output=True, text=True, check=True)
         print(f"✅ Staged {len(files)} file(s)")
+        if SPECULATE_COMMIT:
+            speculate_commit_message()
     except subprocess.CalledProcessError as e:
         print(f"❌ Error staging files: {e.stderr.strip()}")
     except FileNotFoundError:
         print("❌ Error: Git not installed")
 
+COMMIT_CACHE = CommitMessageCache(
+    _getenv("LUCIEN_COMMIT_CACHE", ".lucien/commit_cache.json"),
+    max_entries=int(_getenv("LUCIEN_COMMIT_CACHE_ENTRIES", "200")),
+    ttl=float(_getenv("LUCIEN_COMMIT_CACHE_TTL", str(30 * 24 * 3600))),
+)
+
+# Commit messages drafted in the background after `git add`
+COMMIT_SPECULATOR = Speculator()
+SPECULATION_WAIT = float(_getenv("LUCIEN_SPECULATE_WAIT", "60"))  # seconds commit waits for a running draft
+
+COMMIT_SYSTEM_PROMPT = "Generate a concise, conventional commit message based on the git diff. Use format: type(scope): description. Keep it under 50 characters."
+
+def _summarize_file_diff(provider, diff):
+    """Map step: one-line summary of a single file's staged diff."""
+    note = "\n[diff truncated]" if diff.truncated else ""
+    messages = [
+        {"role": "system", "content": "Summarize what this change to one file does in one short line. No preamble."},
+        {"role": "user", "content": f"File: {diff.path} ({diff.stat})\n{diff.text}{note}"}
+    ]
+    return ask_llm(provider, messages, temperature=0.3)
+
+def _read_diffs_within(files: list, budget_tokens: int) -> tuple:
+    """
+    Read staged diffs until they stop fitting in ``budget_tokens``.
+
+    Returns:
+        tuple: ({path: FileDiff} read so far, whether the whole changeset fits)
+    """
+    diffs, used = {}, 0
+    for path in files:
+        diff = diffs[path] = read_file_diff(path, DIFF_FILE_CHARS)
+        used += estimate_tokens(diff.text)
+        if diff.truncated or used > budget_tokens:
+            return diffs, False
+    return diffs, True
+
+def generate_commit_message(provider: str, files: list) -> str:
+    """
+    Commit message for the staged files. A single file, or a changeset whose
+    diffs fit in COMMIT_DIRECT_TOKENS, goes straight to the model in one
+    call; larger changesets are summarized per file in parallel (map) and
+    the summaries combined into one message (reduce).
+    """
+    diffs, fits = _read_diffs_within(files, COMMIT_DIRECT_TOKENS)
+    if fits or len(files) == 1:
+        diff_text = "\n".join(diff.text for diff in diffs.values())
+        note = "\n[diff truncated]" if any(diff.truncated for diff in diffs.values()) else ""
+        content = f"Generate commit message for these changes:\n{diff_text}{note}"
+    else:
+        # Diffs already read for the size check are reused instead of read twice
+        read = lambda path, max_chars: diffs.pop(path, None) or read_file_diff(path, max_chars)
+        summaries = summarize_files(files, lambda diff: _summarize_file_diff(provider, diff),
+                                    max_workers=COMMIT_WORKERS, max_chars=DIFF_FILE_CHARS, read=read)
+        content = f"Generate one commit message covering these file changes:\n{format_summaries(summaries)}"
+    messages = [
+        {"role": "system", "content": COMMIT_SYSTEM_PROMPT},
+        {"role": "user", "content": content}
+    ]
+    return ask_llm(provider, messages, temperature=0.3, use_cache=False)
+
+def _clean_commit_message(commit_msg: str) -> str:
+    commit_msg = commit_msg.strip().strip('"').strip("'")
+    if len(commit_msg) > 50:
+        commit_msg = commit_msg[:47] + "..."
+    return commit_msg
+
+def _staged_files() -> list:
+    import subprocess
+    result = subprocess.run(["git", "diff", "--cached", "--name-only", "-z"],
+                            capture_output=True, text=True, check=True)
+    return [f for f in result.stdout.split("\0") if f]
+
+def commit_message_for_index(provider: str, files: list, tree: Optional[str] = None) -> tuple:
+    """
+    Commit message for the current index. A draft speculated after `git add`
+    for this exact staged tree is used first, then COMMIT_CACHE, and only
+    then is a new message generated.
+
+    Returns:
+        tuple: (message, source) with source "speculative", "cached" or "generated"
+    """
+    model = DEFAULT_MODELS[provider]
+    tree = tree or staged_tree()
+    commit_msg = COMMIT_SPECULATOR.claim((tree, provider, model), timeout=SPECULATION_WAIT)
+    if commit_msg is not None:
+        return commit_msg, "speculative"
+    commit_msg = COMMIT_CACHE.get(tree, provider, model)
+    if commit_msg is not None:
+        return commit_msg, "cached"
+    commit_msg = _clean_commit_message(generate_commit_message(provider, files))
+    COMMIT_CACHE.put(tree, provider, model, commit_msg)
+    return commit_msg, "generated"
+
+def _draft_commit_message(provider: str, model: str, tree: str, files: list) -> str:
+    commit_msg = COMMIT_CACHE.get(tree, provider, model)
+    if commit_msg is None:
+        commit_msg = _clean_commit_message(generate_commit_message(provider, files))
+        COMMIT_CACHE.put(tree, provider, model, commit_msg)
+    return commit_msg
+
+def speculate_commit_message() -> bool:
+    """Start drafting the commit message for the just-staged index in the background."""
+    try:
+        tree = staged_tree()
+        files = _staged_files()
+    except Exception:
+        return False  # nothing to speculate on; git commit will report the problem
+    if not files:
+        return False
+    provider = "groq" if USE_INTERNET else "ollama"
+    model = DEFAULT_MODELS[provider]
+    return COMMIT_SPECULATOR.start((tree, provider, model),
+                                   lambda: _draft_commit_message(provider, model, tree, files))
+
 @command("git commit")
 def cmd_git_commit(args: str) -> None:
     """Commit staged changes with AI-generated message"""
@@ -177,37 +685,20 @@ def cmd_git_commit(args: str) -> None:
         import subprocess
         
         # Check if there are staged changes
-        result = subprocess.run(["git", "diff", "--cached", "--name-only"], 
-                              capture_output=True, text=True, check=True)
-        if not result.stdout.strip():
+        files = _staged_files()
+        if not files:
             print("❌ No staged changes to commit")
             return
         
-        # Get staged changes for AI analysis
-        diff_result = subprocess.run(["git", "diff", "--cached"], 
-                                   capture_output=True, text=True, check=True)
-        
-        # Generate commit message using AI
-        messages = [
-            {"role": "system", "content": "Generate a concise, conventional commit message based on the git diff. Use format: type(scope): description. Keep it under 50 characters."},
-            {"role": "user", "content": f"Generate commit message for these changes:\n{diff_result.stdout[:1000]}"}
-        ]
-        
         try:
-            if USE_INTERNET:
-                commit_msg = chat_groq(messages, model="llama3-70b-8192", temperature=0.3)
-            else:
-                commit_msg = chat_ollama(messages, model="llama3", temperature=0.3)
-            
-            # Clean up the message
-            commit_msg = commit_msg.strip().strip('"').strip("'")
-            if len(commit_msg) > 50:
-                commit_msg = commit_msg[:47] + "..."
+            provider = "groq" if USE_INTERNET else "ollama"
+            commit_msg, source = commit_message_for_index(provider, files)
             
             # Commit with the generated message
             result = subprocess.run(["git", "commit", "-m", commit_msg], 
                                   capture_output=True, text=True, check=True)
-            print(f"✅ Committed: {commit_msg}")
+            note = {"cached": " (cached message)", "speculative": " (drafted after git add)"}.get(source, "")
+            print(f"✅ Committed: {commit_msg}{note}")
             
         except Exception as e:
             print(f"❌ Error generating commit message: {e}")
@@ -246,23 +737,173 @@ def cmd_git_pull(args: str) -> None:
 
 @command("git log")
 def cmd_git_log(args: str) -> None:
-    """Show recent commit history"""
+    """Show commit history: git log [-n N] [--skip N] [--since DATE] [--until DATE] [--author NAME] [paths...]"""
     try:
         import subprocess
-        result = subprocess.run(["git", "log", "--oneline", "-10"], 
-                              capture_output=True, text=True, check=True)
-        if result.stdout.strip():
-            print("Recent commits:")
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    print(f"  {line}")
-        else:
+        opts, paths = _git_options(args, {"-n": int, "--skip": int, "--since": str,
+                                          "--until": str, "--author": str})
+    except ValueError as e:
+        print(f"❌ Invalid arguments: {e}")
+        return
+    cmd = ["log", "-z", f"--format={LOG_FORMAT}", "--date=short", f"-n{opts.get('-n', 10)}"]
+    for flag in ("--skip", "--since", "--until", "--author"):
+        if flag in opts:
+            cmd.append(f"{flag}={opts[flag]}")
+    if paths:
+        cmd += ["--"] + paths
+    try:
+        count = 0
+        for c in parse_log(git_records(cmd)):
+            if not count:
+                print("Recent commits:")
+            print(f"  {c['hash']} {c.get('subject', '')} ({c.get('date', '')}, {c.get('author', '')})", flush=True)
+            count += 1
+        if not count:
             print("No commits found")
     except subprocess.CalledProcessError as e:
         print(f"❌ Error getting log: {e.stderr.strip()}")
     except FileNotFoundError:
         print("❌ Error: Git not installed")
 
+@command("commit cache show")
+def cmd_commit_cache_show(args: str) -> None:
+    """List cached commit messages by staged tree"""
+    entries = COMMIT_CACHE.entries()
+    if not entries:
+        print("No cached commit messages")
+        return
+    s = COMMIT_CACHE.stats()
+    print(f"Cached commit messages ({s['entries']}, {s['hits']} hits, {s['misses']} misses):")
+    for e in entries:
+        age = int(time.time() - e["created"])
+        age = f"{age // 86400}d" if age >= 86400 else f"{age // 3600}h" if age >= 3600 else f"{age // 60}m"
+        print(f"  {e['tree'][:12]} {e['provider']}/{e['model']} {age} ago: {e['message']}")
+
+@command("commit speculate on")
+def cmd_commit_speculate_on(args: str) -> None:
+    """Draft commit messages in the background after git add"""
+    global SPECULATE_COMMIT
+    SPECULATE_COMMIT = True
+    print("[OK] Speculative commit messages ON.")
+
+@command("commit speculate off")
+def cmd_commit_speculate_off(args: str) -> None:
+    """Only generate commit messages when committing"""
+    global SPECULATE_COMMIT
+    SPECULATE_COMMIT = False
+    print("[OK] Speculative commit messages OFF.")
+
+@command("commit speculate stats")
+def cmd_commit_speculate_stats(args: str) -> None:
+    """How often drafts made after git add were used"""
+    s = COMMIT_SPECULATOR.stats()
+    claimed = s["used"] + s["missed"] + s["failed"]
+    rate = f"{s['used'] / claimed:.0%}" if claimed else "n/a"
+    print(f"Speculation: {'ON' if SPECULATE_COMMIT else 'OFF'}")
+    print(f"  Drafts started: {s['started']}{' (one running)' if s['pending'] else ''}")
+    print(f"  Used: {s['used']}, stale (index changed): {s['missed']}, failed: {s['failed']}")
+    print(f"  Use rate: {rate}")
+
+@command("commit cache clear")
+def cmd_commit_cache_clear(args: str) -> None:
+    """Forget all cached commit messages"""
+    COMMIT_CACHE.clear()
+    print("[OK] Commit message cache cleared.")
+
+# ============
+# WORKSPACE (MULTI-REPO GIT)
+# ============
+
+WORKSPACE = Workspace(_getenv("LUCIEN_WORKSPACE_FILE", ".lucien/workspace.json"))
+
+def _run_workspace(title: str, operation) -> None:
+    """Run a git operation across the workspace and print results in repo order."""
+    repos = WORKSPACE.repos()
+    if not repos:
+        print("No repositories in workspace. Add some with: workspace add <path or glob>")
+        return
+    print(f"{title} across {len(repos)} repositories:")
+    start = time.perf_counter()
+    results = []
+    for r in run_across(repos, operation, max_workers=WORKSPACE_WORKERS):
+        results.append(r)
+        if r.error:
+            print(f"❌ {r.repo}: {r.error}")
+        else:
+            print(f"📁 {r.repo}" + ("" if r.lines else " - nothing to report"))
+            for line in r.lines:
+                print(f"  {line}")
+        sys.stdout.flush()
+    wall = time.perf_counter() - start
+    failed = sum(1 for r in results if r.error)
+    print(f"Timing ({WORKSPACE_WORKERS} workers): {wall:.2f}s wall, "
+          f"{sum(r.seconds for r in results):.2f}s total git time, {failed} failed")
+    for r in sorted(results, key=lambda r: r.seconds, reverse=True):
+        print(f"  {r.seconds:7.2f}s  {os.path.basename(r.repo) or r.repo}")
+
+@command("workspace add")
+def cmd_workspace_add(args: str) -> None:
+    """Add a repository path or glob to the workspace: workspace add <path or glob>"""
+    pattern = args.strip()
+    if not pattern:
+        print("Usage: workspace add <path or glob>")
+        return
+    if not WORKSPACE.add(pattern):
+        print(f"Already in workspace: {pattern}")
+        return
+    print(f"✅ Added {pattern}")
+
+@command("workspace remove")
+def cmd_workspace_remove(args: str) -> None:
+    """Remove a path or glob from the workspace: workspace remove <path or glob>"""
+    pattern = args.strip()
+    if WORKSPACE.remove(pattern):
+        print(f"✅ Removed {pattern}")
+    else:
+        print(f"❌ Not in workspace: {pattern}")
+
+@command("workspace list")
+def cmd_workspace_list(args: str) -> None:
+    """Show workspace patterns and the repositories they match"""
+    patterns = WORKSPACE.load()
+    if not patterns:
+        print("Workspace is empty. Add repositories with: workspace add <path or glob>")
+        return
+    print("Workspace patterns:")
+    for pattern in patterns:
+        print(f"  {pattern}")
+    repos = WORKSPACE.repos()
+    print(f"Repositories ({len(repos)}):")
+    for repo in repos:
+        print(f"  {repo}")
+
+@command("workspace status")
+def cmd_workspace_status(args: str) -> None:
+    """git status across the workspace: workspace status [--limit N]"""
+    try:
+        opts, _ = _git_options(args, {"--limit": int})
+    except ValueError as e:
+        print(f"❌ Invalid arguments: {e}")
+        return
+    limit = opts.get("--limit", 20)
+    _run_workspace("git status", lambda repo: repo_status(repo, limit))
+
+@command("workspace log")
+def cmd_workspace_log(args: str) -> None:
+    """Recent commits across the workspace: workspace log [-n N]"""
+    try:
+        opts, _ = _git_options(args, {"-n": int})
+    except ValueError as e:
+        print(f"❌ Invalid arguments: {e}")
+        return
+    count = opts.get("-n", 3)
+    _run_workspace("git log", lambda repo: repo_log(repo, count))
+
+@command("workspace pull")
+def cmd_workspace_pull(args: str) -> None:
+    """git pull in every workspace repository"""
+    _run_workspace("git pull", repo_pull)
+
 # ============
 # WORKFLOW AUTOMATION (SPELLS)
 # ============
@@ -272,55 +913,201 @@ from pathlib import Path
 from datetime import datetime
 
 SPELLS_FILE = Path(".lucien/spells.json")
-SPELLS_FILE.parent.mkdir(exist_ok=True)
+
+# Parsed spells file, reused until its path, mtime or size changes
+_spells_cache = {"key": None, "spells": {}}
+# Spell name -> (commands list, compiled steps), dropped whenever the file is reloaded
+_compiled_spells = {}
+
+# "json" (spells.json, the default) or "sqlite" (one row per spell in SPELL_DB)
+SPELL_STORE = _getenv("LUCIEN_SPELL_STORE", "json").lower()
+SPELL_DB = Path(_getenv("LUCIEN_SPELL_DB", ".lucien/spells.db"))
+_sqlite_spells = None
+
+def get_spell_db():
+    """
+    The SQLite spell store when LUCIEN_SPELL_STORE=sqlite, otherwise None.
+    Spells from spells.json are imported the first time it is opened.
+    """
+    global _sqlite_spells
+    if SPELL_STORE != "sqlite":
+        return None
+    if _sqlite_spells is None:
+        from core.spell_store import SqliteSpellStore
+        store = SqliteSpellStore(SPELL_DB)
+        try:
+            imported = store.migrate_json(SPELLS_FILE)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not import {SPELLS_FILE}: {e}")
+            imported = None
+        if imported:
+            print(f"[OK] Imported {imported} spell(s) from {SPELLS_FILE} into {SPELL_DB}")
+        _sqlite_spells = store
+    return _sqlite_spells
 
 def load_spells():
     """Load spells from JSON file"""
-    if not SPELLS_FILE.exists():
-        return {}
+    db = get_spell_db()
+    if db is not None:
+        return db.load_all()
     try:
-        with open(SPELLS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
+        st = SPELLS_FILE.stat()
+    except OSError:
         return {}
+    key = (str(SPELLS_FILE), st.st_mtime_ns, st.st_size)
+    if _spells_cache["key"] != key:
+        try:
+            with open(SPELLS_FILE, "r", encoding="utf-8") as f:
+                spells = json.load(f)
+        except Exception:
+            return {}
+        _spells_cache["key"] = key
+        _spells_cache["spells"] = spells
+        _compiled_spells.clear()
+    return dict(_spells_cache["spells"])
+
+def compile_spell(name: str, spell: dict) -> list:
+    """
+    Resolve a spell's lines to handlers once. Each step is
+    (handler, args, line); handler is None for lines that are not commands,
+    which are cast through dispatch (and so the AI fallback).
+    """
+    commands = spell["commands"]
+    cached = _compiled_spells.get(name)
+    if cached is not None and cached[0] == commands:
+        return cached[1]
+    names = spell.get("steps") or [None] * len(commands)
+    steps = []
+    for line, cmd_name in zip(commands, names):
+        fn = COMMANDS.get(cmd_name) if cmd_name else None
+        if fn is not None:
+            steps.append((fn, line[len(cmd_name):].strip(), line))
+            continue
+        resolved = resolve_command(line)
+        steps.append((resolved[1], resolved[2], line) if resolved else (None, "", line))
+    _compiled_spells[name] = (commands, steps)
+    return steps
 
 def save_spells(spells):
     """Save spells to JSON file"""
     try:
-        with open(SPELLS_FILE, "w", encoding="utf-8") as f:
-            json.dump(spells, f, indent=2)
+        db = get_spell_db()
+        if db is not None:
+            db.replace_all(spells)
+            return True
+        SPELLS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(SPELLS_FILE, spells)
         return True
     except Exception:
         return False
 
-# Global recording state
+# Single-spell access: indexed lookups with SQLite, whole-file load/save with JSON
+
+def find_spell(name: str):
+    """The spell called ``name``, or None."""
+    db = get_spell_db()
+    if db is not None:
+        return db.get(name)
+    return load_spells().get(name)
+
+def store_spell(name: str, spell: dict, new=False):
+    """
+    Save one spell. With ``new``, an existing spell of that name is left
+    alone and None is returned. Otherwise returns whether the save worked.
+    """
+    db = get_spell_db()
+    try:
+        if db is not None:
+            if new:
+                return db.add(name, spell) or None
+            db.put(name, spell)
+            return True
+    except Exception:
+        return False
+    spells = load_spells()
+    if new and name in spells:
+        return None
+    spells[name] = spell
+    return save_spells(spells)
+
+def remove_spell(name: str):
+    """Delete one spell: True when deleted, None when it did not exist, False on error."""
+    db = get_spell_db()
+    if db is not None:
+        try:
+            return db.delete(name) or None
+        except Exception:
+            return False
+    spells = load_spells()
+    if name not in spells:
+        return None
+    del spells[name]
+    return save_spells(spells)
+
+# Input/output hashes of incremental spell steps from their last successful run
+SPELL_MANIFEST = Manifest(_getenv("LUCIEN_SPELL_MANIFEST", ".lucien/spell_manifest.json"))
+PROFILE_DIR = Path(_getenv("LUCIEN_PROFILE_DIR", ".lucien/profiles"))
+
+# Global recording state (the REPL's; each daemon client session has its own RecordingState)
 recording_spell = None
 recorded_commands = []
 
+class RecordingState:
+    """Spell recording and conversation history of one daemon client session."""
+    __slots__ = ("spell", "commands", "conversation")
+
+    def __init__(self):
+        self.spell = None
+        self.commands = []
+        self.conversation = new_conversation()
+
+# .state is set while a thread runs a line for a daemon client
+_client = threading.local()
+
+def _recording() -> tuple:
+    """(spell being recorded, its commands) for the caller: its daemon session's, else the REPL's."""
+    state = getattr(_client, "state", None)
+    if state is not None:
+        return state.spell, state.commands
+    return recording_spell, recorded_commands
+
+def _set_recording(spell: Optional[str], commands: list) -> None:
+    global recording_spell, recorded_commands
+    state = getattr(_client, "state", None)
+    if state is not None:
+        state.spell, state.commands = spell, commands
+    else:
+        recording_spell, recorded_commands = spell, commands
+
+def _conversation() -> ConversationHistory:
+    """The caller's conversation history: its daemon session's, else the REPL's."""
+    state = getattr(_client, "state", None)
+    return state.conversation if state is not None else CONVERSATION
+
+def _is_foreground() -> bool:
+    """True for the REPL and daemon client threads, False for background spell steps and scheduled runs."""
+    return threading.current_thread() is threading.main_thread() or getattr(_client, "state", None) is not None
+
 @command("record spell")
 def cmd_record_spell(args: str) -> None:
     """Start recording a spell: record spell <name>"""
-    global recording_spell, recorded_commands
-    
     if not args.strip():
         print("Usage: record spell <name>")
         return
     
     spell_name = args.strip()
-    spells = load_spells()
     
-    if spell_name in spells:
+    if find_spell(spell_name) is not None:
         print(f"⚠️ Spell '{spell_name}' already exists. Use 'delete spell {spell_name}' first.")
         return
     
-    recording_spell = spell_name
-    recorded_commands = []
+    _set_recording(spell_name, [])
     print(f"🎬 Recording spell '{spell_name}'. Type 'stop recording' when done.")
 
 @command("stop recording")
 def cmd_stop_recording(args: str) -> None:
     """Stop recording current spell"""
-    global recording_spell, recorded_commands
+    recording_spell, recorded_commands = _recording()
     
     if not recording_spell:
         print("❌ No spell being recorded")
@@ -328,25 +1115,29 @@ def cmd_stop_recording(args: str) -> None:
     
     if not recorded_commands:
         print("❌ No commands recorded")
-        recording_spell = None
-        recorded_commands = []
+        _set_recording(None, [])
         return
     
-    spells = load_spells()
-    spells[recording_spell] = {
+    resolved = [resolve_command(line) for line in recorded_commands]
+    saved = store_spell(recording_spell, {
         "commands": recorded_commands,
+        "steps": [r[0] if r else None for r in resolved],
         "description": f"Recorded spell with {len(recorded_commands)} commands",
         "created": datetime.now().isoformat(),
         "count": len(recorded_commands)
-    }
+    }, new=True)
     
-    if save_spells(spells):
+    if saved is None:
+        print(f"⚠️ Spell '{recording_spell}' was created elsewhere meanwhile; recording discarded")
+    elif saved:
         print(f"✅ Spell '{recording_spell}' saved with {len(recorded_commands)} commands")
+        unresolved = sum(1 for r in resolved if r is None)
+        if unresolved:
+            print(f"⚠️ {unresolved} line(s) are not commands and will be sent to the AI when cast")
     else:
         print("❌ Error saving spell")
     
-    recording_spell = None
-    recorded_commands = []
+    _set_recording(None, [])
 
 @command("cast spell")
 def cmd_cast_spell(args: str) -> None:
@@ -356,35 +1147,432 @@ def cmd_cast_spell(args: str) -> None:
         return
     
     spell_name = args.strip()
-    spells = load_spells()
+    force = spell_name.endswith(" --force")
+    if force:
+        spell_name = spell_name[:-len(" --force")].strip()
+    spell = find_spell(spell_name)
     
-    if spell_name not in spells:
+    if spell is None:
         print(f"❌ Spell '{spell_name}' not found")
         return
     
-    spell = spells[spell_name]
+    db = get_spell_db()
+    if db is not None:
+        db.record_use(spell_name)
+    steps = compile_spell(spell_name, spell)
+    order = range(1, len(steps) + 1)
+    if "after" in spell:
+        interactive = _interactive_steps(steps)
+        if not interactive:
+            _cast_parallel(spell_name, spell, force)
+            return
+        try:
+            if len(spell["after"]) != len(steps):
+                raise ValueError(f"{len(steps)} steps but {len(spell['after'])} dependency entries")
+            order = step_order(spell["after"])
+        except (ValueError, IndexError) as e:
+            print(f"❌ Invalid spell dependencies: {e}")
+            return
+        print(f"⚠️ Step(s) {', '.join(map(str, interactive))} ask for input, so the steps run one at a time")
     print(f"🔮 Casting spell '{spell_name}' ({spell['count']} commands)...")
     
-    for i, command in enumerate(spell['commands'], 1):
+    start = time.perf_counter()
+    for i in order:
+        fn, step_args, command = steps[i - 1]
         print(f"\n[{i}/{spell['count']}] Executing: {command}")
-        dispatch(command)
+        step_start = time.perf_counter()
+        if not _run_spell_step(spell_name, spell, i, fn, step_args, command, force):
+            print("⏭️ Up to date, skipped")
+        print(f"({time.perf_counter() - step_start:.2f}s)")
         print("-" * 40)
     
     print(f"✅ Spell '{spell_name}' completed!")
+    print(f"⏱️ Total: {time.perf_counter() - start:.2f}s")
+
+def _interactive_steps(steps: list) -> list:
+    """Numbers of the steps whose command reads input()."""
+    interactive = []
+    for number, (_, _, command) in enumerate(steps, 1):
+        resolved = resolve_command(command)
+        if resolved is not None and resolved[0] in INTERACTIVE_COMMANDS:
+            interactive.append(number)
+    return interactive
+
+def _step_io(spell: dict, number: int):
+    """Declared {"inputs": [...], "outputs": [...]} of a step, or None."""
+    io = spell.get("io") or []
+    return io[number - 1] if number <= len(io) else None
+
+def _run_spell_step(spell_name: str, spell: dict, number: int, fn, step_args: str, command: str, force=False) -> bool:
+    """
+    Run one spell step. Steps that declare inputs/outputs are skipped when
+    none of them changed since the last successful run. A run only counts as
+    successful when it printed no ❌/⚠️ line and rewrote every declared
+    output. Returns False if skipped.
+    """
+    io = _step_io(spell, number)
+    if not io:
+        if fn is not None:
+            fn(step_args)
+        else:
+            dispatch(command)
+        return True
+    key = f"{spell_name}:{number}"
+    inputs, outputs = io.get("inputs", []), io.get("outputs", [])
+    if not force and SPELL_MANIFEST.is_fresh(key, command, inputs, outputs):
+        return False
+    before = SPELL_MANIFEST.stamp(outputs)
+    with install_thread_output().copy() as output:
+        if fn is not None:
+            fn(step_args)
+        else:
+            dispatch(command)
+    if any(line.lstrip().startswith(("❌", "⚠️")) for line in output.getvalue().splitlines()):
+        SPELL_MANIFEST.forget(spell_name, number)
+        print(f"⚠️ Step {number} reported a problem; it will run again next time")
+    elif not SPELL_MANIFEST.record(key, command, inputs, outputs, before):
+        SPELL_MANIFEST.forget(spell_name, number)
+        print(f"⚠️ Step {number} did not write all declared outputs; it will run again next time")
+    return True
+
+def _cast_parallel(spell_name: str, spell: dict, force=False) -> None:
+    """Run a spell's steps as a dependency graph on a worker pool."""
+    steps = compile_spell(spell_name, spell)
+    after = spell["after"]
+    if len(after) != len(steps):
+        print(f"❌ Spell '{spell_name}' has {len(steps)} steps but {len(after)} dependency entries")
+        return
+    print(f"🔮 Casting spell '{spell_name}' ({spell['count']} commands, up to {SPELL_WORKERS} in parallel)...")
+    start = time.perf_counter()
+    results = []
+    out = install_thread_output()
+    
+    def run_step(number):
+        fn, step_args, command = steps[number - 1]
+        with out.capture() as buffer:
+            if not _run_spell_step(spell_name, spell, number, fn, step_args, command, force):
+                print("⏭️ Up to date, skipped")
+        return buffer.getvalue()
+    
+    try:
+        for r in run_dag(len(steps), after, run_step, max_workers=SPELL_WORKERS):
+            results.append(r)
+            command = steps[r.number - 1][2]
+            status = "skipped, a dependency failed" if r.skipped else f"{r.seconds:.2f}s"
+            print(f"\n[{r.number}/{spell['count']}] {command} ({status})")
+            if r.output:
+                print(r.output.rstrip("\n"))
+            if r.error is not None:
+                print(f"❌ Step failed: {r.error}")
+            print("-" * 40)
+    except ValueError as e:
+        print(f"❌ Invalid spell dependencies: {e}")
+        return
+    wall = time.perf_counter() - start
+    failed = sum(1 for r in results if r.error is not None or r.skipped)
+    if failed:
+        print(f"⚠️ Spell '{spell_name}' finished with {failed} failed or skipped step(s)")
+    else:
+        print(f"✅ Spell '{spell_name}' completed!")
+    print(f"⏱️ Total: {wall:.2f}s wall, {sum(r.seconds for r in results):.2f}s of step time")
+
+@command("profile spell")
+def cmd_profile_spell(args: str) -> None:
+    """Cast a spell step by step and report where the time goes: profile spell <name> [--force] [--cprofile]"""
+    words = args.split()
+    flags = {w for w in words if w.startswith("--")}
+    spell_name = " ".join(w for w in words if not w.startswith("--"))
+    unknown = flags - {"--force", "--cprofile"}
+    if not spell_name or unknown:
+        print("Usage: profile spell <name> [--force] [--cprofile]")
+        return
+    spell = find_spell(spell_name)
+    if spell is None:
+        print(f"❌ Spell '{spell_name}' not found")
+        return
+    from core.profiler import PROCESS_WIDE_NOTE, SpellProfiler, format_table
+    steps = compile_spell(spell_name, spell)
+    after = spell.get("after") or [[] for _ in steps]
+    try:
+        order = step_order(after)
+    except (ValueError, IndexError) as e:
+        print(f"❌ Invalid spell dependencies: {e}")
+        return
+    force = "--force" in flags
+    print(f"🔬 Profiling spell '{spell_name}' ({spell['count']} commands, one at a time)...")
+    failed = set()
+    with SpellProfiler(telemetry=TELEMETRY, cprofile="--cprofile" in flags) as profiler:
+        for number in order:
+            fn, step_args, command = steps[number - 1]
+            print(f"\n[{number}/{spell['count']}] Executing: {command}")
+            if failed.intersection(after[number - 1]):
+                profiler.skip(number, command)
+                failed.add(number)
+                print("⏭️ Skipped, a dependency failed")
+                continue
+            step = profiler.run(number, command,
+                                lambda: _run_spell_step(spell_name, spell, number, fn, step_args, command, force))
+            if step.error:
+                failed.add(number)
+                print(f"❌ Step failed: {step.error}")
+            elif step.skipped:
+                print("⏭️ Up to date, skipped (use --force to profile it)")
+            print("-" * 40)
+
+    ranked = profiler.ranked()
+    print(f"\n📊 Profile of '{spell_name}' (slowest first, {profiler.wall:.2f}s total):")
+    for line in format_table(ranked):
+        print(f"  {line}")
+    print(f"  {PROCESS_WIDE_NOTE}")
+    skipped = len(profiler.steps) - len(ranked)
+    if skipped:
+        print(f"  ({skipped} step(s) skipped)")
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in spell_name)
+    try:
+        saved = profiler.save(PROFILE_DIR / f"{safe_name}-{stamp}.json", spell_name)
+        print(f"💾 Saved profile to {saved}")
+        slowest = profiler.dump_slowest(PROFILE_DIR / f"{safe_name}-{stamp}.prof")
+    except OSError as e:
+        print(f"❌ Could not save profile: {e}")
+        return
+    if slowest:
+        number, top = slowest
+        print(f"🐢 cProfile of step {number} saved to {PROFILE_DIR / f'{safe_name}-{stamp}.prof'}:")
+        print(top.rstrip())
+
+def _run_scheduled_spell(spell_name: str) -> tuple:
+    """Cast a spell for the scheduler; returns (outcome, detail) for its history."""
+    spell = find_spell(spell_name)
+    if spell is None:
+        return "failed", f"spell '{spell_name}' not found"
+    interactive = _interactive_steps(compile_spell(spell_name, spell))
+    if interactive:  # nobody can answer a prompt; input() would read the REPL's next line
+        return "failed", f"step(s) {', '.join(map(str, interactive))} ask for input"
+    with STATE_LOCK, install_thread_output().capture() as buffer:
+        cmd_cast_spell(spell_name)
+    lines = [line.strip() for line in buffer.getvalue().splitlines() if line.strip()]
+    errors = [line for line in lines if line.startswith("❌")]
+    if errors:
+        return "failed", errors[0]
+    return "ok", lines[-1] if lines else ""
+
+SCHEDULER = Scheduler(
+    _getenv("LUCIEN_SCHEDULE_FILE", ".lucien/schedules.json"),
+    _run_scheduled_spell,
+    max_workers=int(_getenv("LUCIEN_SCHEDULER_WORKERS", "2")),
+    history_size=int(_getenv("LUCIEN_SCHEDULE_HISTORY", "200")),
+)
+SCHEDULER_AUTOSTART = _getenv("LUCIEN_SCHEDULER", "true").lower() == "true"
+
+def stop_scheduler() -> bool:
+    return SCHEDULER.stop(wait=False)
+
+def _fmt_when(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+@command("schedule add")
+def cmd_schedule_add(args: str) -> None:
+    """Run a spell on a schedule: schedule add <spell> every 5m | cron */15 * * * *"""
+    parts = args.strip().split(maxsplit=1)
+    if len(parts) < 2:
+        print("Usage: schedule add <spell> every <N><s|m|h|d>  or  schedule add <spell> cron <m> <h> <dom> <mon> <dow>")
+        return
+    spell_name, spec = parts
+    spell = find_spell(spell_name)
+    if spell is None:
+        print(f"❌ Spell '{spell_name}' not found")
+        return
+    interactive = _interactive_steps(compile_spell(spell_name, spell))
+    if interactive:
+        print(f"❌ Step(s) {', '.join(map(str, interactive))} of '{spell_name}' ask for input, "
+              "which nobody can answer in a scheduled run")
+        return
+    try:
+        job = SCHEDULER.add(spell_name, spec)
+    except ValueError as e:
+        print(f"❌ Invalid schedule: {e}")
+        return
+    except OSError as e:
+        print(f"❌ Error saving schedule: {e}")
+        return
+    print(f"✅ '{spell_name}' scheduled {job.schedule}, next run {_fmt_when(job.next_run)}")
+    install_thread_output()  # background spells must never print into the prompt
+    if SCHEDULER.start():
+        print("[OK] Scheduler started.")
+
+@command("schedule remove")
+def cmd_schedule_remove(args: str) -> None:
+    """Stop running a spell on its schedule: schedule remove <spell>"""
+    spell_name = args.strip()
+    if not spell_name:
+        print("Usage: schedule remove <spell>")
+        return
+    if SCHEDULER.remove(spell_name):
+        print(f"✅ '{spell_name}' unscheduled")
+    else:
+        print(f"❌ '{spell_name}' is not scheduled")
+
+@command("schedule list")
+def cmd_schedule_list(args: str) -> None:
+    """Show scheduled spells and their next run"""
+    jobs = SCHEDULER.load()
+    if not jobs:
+        print("No scheduled spells. Add one with: schedule add <spell> every 10m")
+        return
+    state = "running" if SCHEDULER.active else "stopped (schedule start)"
+    print(f"⏰ Scheduled spells (scheduler {state}):")
+    for job in sorted(jobs.values(), key=lambda j: j.next_run):
+        last = SCHEDULER.recent(job.name, limit=1)
+        last_text = f", last {last[0].outcome} in {last[0].seconds:.2f}s" if last else ""
+        busy = ", running now" if job.running else ""
+        print(f"  {job.name}: {job.schedule}, next {_fmt_when(job.next_run)}, "
+              f"{job.runs} runs, {job.skipped} overlaps skipped{last_text}{busy}")
+
+@command("schedule history")
+def cmd_schedule_history(args: str) -> None:
+    """Recent scheduled runs: schedule history [spell] [-n N]"""
+    try:
+        options, rest = _git_options(args, {"-n": int})
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    spell_name = " ".join(rest) or None
+    records = SCHEDULER.recent(spell_name, limit=options.get("-n") or 20)
+    if not records:
+        print("No scheduled runs yet.")
+        return
+    icons = {"ok": "✅", "failed": "❌", "error": "❌", "skipped": "⏭️"}
+    print(f"🕰️ Scheduled runs (newest first, {len(records)} shown):")
+    for r in records:
+        detail = f" - {r.detail}" if r.detail else ""
+        print(f"  {icons.get(r.outcome, '•')} {_fmt_when(r.started)} {r.job} {r.outcome} ({r.seconds:.2f}s){detail}")
+
+@command("schedule start")
+def cmd_schedule_start(args: str) -> None:
+    """Start running scheduled spells in the background"""
+    install_thread_output()  # background spells must never print into the prompt
+    if SCHEDULER.start():
+        print(f"[OK] Scheduler started with {len(SCHEDULER.load())} job(s).")
+    else:
+        print("[OK] Scheduler is already running.")
+
+@command("schedule stop")
+def cmd_schedule_stop(args: str) -> None:
+    """Stop starting scheduled spells (runs in progress finish)"""
+    if stop_scheduler():
+        print("[OK] Scheduler stopped.")
+    else:
+        print("[OK] Scheduler is not running.")
+
+@command("spell io")
+def cmd_spell_io(args: str) -> None:
+    """Declare a step's files for incremental casts: spell io <name> <step> <inputs...> -> <outputs...> (or 'none')"""
+    import shlex
+    try:
+        tokens = shlex.split(args)
+    except ValueError as e:
+        print(f"❌ Invalid arguments: {e}")
+        return
+    if len(tokens) < 3 or not tokens[1].isdigit():
+        print("Usage: spell io <name> <step> <input globs...> -> <outputs...>  (or 'none' to always run)")
+        return
+    spell_name, number, rest = tokens[0], int(tokens[1]), tokens[2:]
+    spell = find_spell(spell_name)
+    if spell is None:
+        print(f"❌ Spell '{spell_name}' not found")
+        return
+    spell = dict(spell)
+    if not 1 <= number <= len(spell["commands"]):
+        print(f"❌ Step must be between 1 and {len(spell['commands'])}")
+        return
+    io = list(spell.get("io") or [])
+    io += [None] * (len(spell["commands"]) - len(io))
+    if rest == ["none"]:
+        io[number - 1] = None
+    else:
+        split = rest.index("->") if "->" in rest else len(rest)
+        io[number - 1] = {"inputs": rest[:split], "outputs": rest[split + 1:]}
+    spell["io"] = io if any(io) else None
+    if spell["io"] is None:
+        del spell["io"]
+    SPELL_MANIFEST.forget(spell_name, number)
+    if store_spell(spell_name, spell):
+        if io[number - 1]:
+            print(f"✅ Step {number} of '{spell_name}' is skipped while its inputs and outputs are unchanged")
+        else:
+            print(f"✅ Step {number} of '{spell_name}' always runs")
+    else:
+        print("❌ Error saving spell")
+
+@command("spell stages")
+def cmd_spell_stages(args: str) -> None:
+    """Group spell steps into parallel stages: spell stages <name> 1 2 | 3 | 4 5 (or 'none')"""
+    parts = args.strip().split(maxsplit=1)
+    if len(parts) < 2:
+        print("Usage: spell stages <name> <steps | steps | ...>  (e.g. 1 2 | 3, or 'none' to run in order)")
+        return
+    spell_name, spec = parts
+    spell = find_spell(spell_name)
+    if spell is None:
+        print(f"❌ Spell '{spell_name}' not found")
+        return
+    spell = dict(spell)
+    if spec.strip().lower() == "none":
+        spell.pop("after", None)
+    else:
+        try:
+            spell["after"] = parse_stages(spec, len(spell["commands"]))
+        except ValueError as e:
+            print(f"❌ Invalid stages: {e}")
+            return
+    if store_spell(spell_name, spell):
+        print(f"✅ Spell '{spell_name}' will run " + ("in order" if "after" not in spell else "in parallel stages"))
+    else:
+        print("❌ Error saving spell")
 
 @command("list spells")
 def cmd_list_spells(args: str) -> None:
-    """List all available spells"""
-    spells = load_spells()
+    """List all available spells: list spells [--tag <tag>]"""
+    tokens = args.split()
+    tag = tokens[1] if len(tokens) == 2 and tokens[0] == "--tag" else None
+    db = get_spell_db()
+    if db is not None:
+        rows = db.summaries(tag)
+    else:
+        rows = [(name, spell["description"], spell["count"], spell["created"], None, spell.get("tags", []))
+                for name, spell in load_spells().items()
+                if tag is None or tag in spell.get("tags", [])]
     
-    if not spells:
-        print("No spells recorded yet.")
+    if not rows:
+        print(f"No spells tagged '{tag}'." if tag else "No spells recorded yet.")
         return
     
     print("Available spells:")
-    for name, spell in spells.items():
-        print(f"  📜 {name} - {spell['description']}")
-        print(f"      Commands: {spell['count']}, Created: {spell['created'][:10]}")
+    for name, description, count, created, uses, tags in rows:
+        print(f"  📜 {name} - {description}")
+        extra = f", Cast: {uses}x" if uses is not None else ""
+        extra += f", Tags: {', '.join(tags)}" if tags else ""
+        print(f"      Commands: {count}, Created: {created[:10]}{extra}")
+
+@command("spell tag")
+def cmd_spell_tag(args: str) -> None:
+    """Set a spell's tags: spell tag <name> <tag...> (no tags clears them)"""
+    parts = args.split()
+    if not parts:
+        print("Usage: spell tag <name> <tag...>")
+        return
+    spell_name, tags = parts[0], sorted(set(parts[1:]))
+    spell = find_spell(spell_name)
+    if spell is None:
+        print(f"❌ Spell '{spell_name}' not found")
+        return
+    spell = dict(spell)
+    spell["tags"] = tags
+    if store_spell(spell_name, spell):
+        print(f"✅ Spell '{spell_name}' tags: {', '.join(tags) or '(none)'}")
+    else:
+        print("❌ Error saving spell")
 
 @command("delete spell")
 def cmd_delete_spell(args: str) -> None:
@@ -394,14 +1582,14 @@ def cmd_delete_spell(args: str) -> None:
         return
     
     spell_name = args.strip()
-    spells = load_spells()
+    deleted = remove_spell(spell_name)
     
-    if spell_name not in spells:
+    if deleted is None:
         print(f"❌ Spell '{spell_name}' not found")
         return
     
-    del spells[spell_name]
-    if save_spells(spells):
+    if deleted:
+        SPELL_MANIFEST.forget(spell_name)
         print(f"✅ Spell '{spell_name}' deleted")
     else:
         print("❌ Error deleting spell")
@@ -410,15 +1598,6 @@ def cmd_delete_spell(args: str) -> None:
 # COMMAND ROUTER
 # ============
 
-COMMANDS = {}
-
-def command(name):
-    """Decorator to register commands in the router."""
-    def _wrap(fn):
-        COMMANDS[name] = fn
-        return fn
-    return _wrap
-
 @command("remember")
 def cmd_remember(args: str) -> None:
     """Persist a memory entry: remember <text>"""
@@ -426,14 +1605,15 @@ def cmd_remember(args: str) -> None:
     if not text:
         print("Usage: remember <text>")
         return
-    memory.setdefault("notes", []).append(text)
-    save_memory(memory)
+    mem = get_memory()
+    mem.setdefault("notes", []).append(text)
+    save_memory(mem)
     print("[OK] Memory saved.")
 
 @command("show memory")
 def cmd_show_memory(args: str) -> None:
     """Show all saved memories"""
-    notes = memory.get("notes", [])
+    notes = get_memory().get("notes", [])
     if notes:
         for i, note in enumerate(notes, 1):
             print(f"{i}. {note}")
@@ -443,120 +1623,250 @@ def cmd_show_memory(args: str) -> None:
 @command("clear memory")
 def cmd_clear_memory(args: str) -> None:
     """Clear all saved memories"""
-    memory["notes"] = []
-    save_memory(memory)
+    mem = get_memory()
+    mem["notes"] = []
+    save_memory(mem)
     print("[OK] Memory cleared.")
 
-@command("list files")
-def cmd_list_files(args: str) -> None:
-    """List files in directory: list files [path]"""
-    path = args.strip() if args.strip() else "."
-    print(list_files(path))
-
-@command("read file")
-def cmd_read_file(args: str) -> None:
-    """Read file contents: read file <path>"""
-    if not args.strip():
-        print("Usage: read file <path>")
-        return
-    print(read_file(args.strip()))
-
-@command("write file")
-def cmd_write_file(args: str) -> None:
-    """Write content to file: write file <path>"""
-    if not args.strip():
-        print("Usage: write file <path>")
-        return
-    print("Enter text. Empty line to finish.")
-    text = "\n".join(iter(input, ""))
-    print(write_file(args.strip(), text))
-
-@command("delete file")
-def cmd_delete_file(args: str) -> None:
-    """Delete a file: delete file <path>"""
-    if not args.strip():
-        print("Usage: delete file <path>")
-        return
-    if input(f"Delete {args.strip()}? (y/n): ").lower() == "y":
-        print(delete_file(args.strip()))
-    else:
-        print("Cancelled.")
+# File and system commands live in plugins/ and are imported on first use
+register(COMMANDS, PLUGIN_MANIFEST)
 
-@command("disk space")
-def cmd_disk_space(args: str) -> None:
-    """Show disk space usage"""
-    print(disk_space())
-
-@command("cpu usage")
-def cmd_cpu_usage(args: str) -> None:
-    """Show CPU usage"""
-    print(cpu_usage())
-
-@command("run shell")
-def cmd_run_shell(args: str) -> None:
-    """Run shell command: run shell <command>"""
-    if not args.strip():
-        print("Usage: run shell <command>")
-        return
-    print(shell(args.strip()))
-
-@command("generate password")
-def cmd_generate_password(args: str) -> None:
-    """Generate random password: generate password [length]"""
-    try:
-        length = int(args.strip()) if args.strip() else 16
-        print(rand_pass(length))
-    except ValueError:
-        print("Usage: generate password [length] (length must be a number)")
-
-@command("open url")
-def cmd_open_url(args: str) -> None:
-    """Open URL in browser: open url <url>"""
-    if not args.strip():
-        print("Usage: open url <url>")
-        return
-    print(open_url(args.strip()))
-
-@command("open file")
-def cmd_open_file(args: str) -> None:
-    """Open file in VS Code: open file <path>"""
-    if not args.strip():
-        print("Usage: open file <path>")
-        return
-    print(open_file_in_vscode(args.strip()))
-
-@command("run python")
-def cmd_run_python(args: str) -> None:
-    """Execute Python code interactively"""
-    print("Enter Python code. Blank line to execute.")
-    code = "\n".join(iter(input, ""))
-    out = run_python_code(code)
-    print(out["stdout"], out["stderr"])
+@command("plugins")
+def cmd_plugins(args: str) -> None:
+    """Show plugin modules, their commands and whether they are loaded yet"""
+    print("🧩 Plugins:")
+    for module, imported, names in plugin_status(_plugin_manifest()):
+        state = "loaded" if imported else "not loaded yet"
+        print(f"  {module} ({state}): {', '.join(names)}")
 
 @command("ai")
 def cmd_ai(args: str) -> None:
-    """AI chat with specific provider: ai <provider:groq|ollama> <prompt>"""
+    """AI chat with specific provider: ai [--no-cache] <provider:groq|ollama> <prompt>"""
+    use_cache = True
+    if args.startswith("--no-cache"):
+        use_cache = False
+        args = args[len("--no-cache"):].strip()
     parts = args.split(maxsplit=1)
     if len(parts) < 2:
-        print("Usage: ai <groq|ollama> <prompt>")
+        print("Usage: ai [--no-cache] <groq|ollama> <prompt>")
         return
     provider, prompt = parts[0], parts[1]
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": prompt}
-    ]
+    if provider == "batch":
+        cmd_ai_batch(prompt)
+        return
+    if provider not in DEFAULT_MODELS:
+        print("Provider must be 'groq' or 'ollama'")
+        return
     try:
-        if provider == "groq":
-            out = chat_groq(messages, model="llama3-70b-8192", temperature=0.5)
-        elif provider == "ollama":
-            out = chat_ollama(messages, model="llama3", temperature=0.5)
-        else:
-            print("Provider must be 'groq' or 'ollama'")
-            return
-        print(out)
+        respond(provider, build_messages(prompt), temperature=0.5, use_cache=use_cache)
     except RuntimeError as e:
         print(f"[ERROR] {e}")
 
+@command("ai batch")
+def cmd_ai_batch(args: str) -> None:
+    """Run a prompt file concurrently: ai batch <file> [--provider groq|ollama] [--concurrency N] [--out results.jsonl] [--no-cache]"""
+    tokens = args.split()
+    if not tokens:
+        print("Usage: ai batch <file> [--provider groq|ollama] [--concurrency N] [--out results.jsonl] [--no-cache]")
+        return
+    path = tokens[0]
+    provider = "groq" if USE_INTERNET else "ollama"
+    concurrency = BATCH_CONCURRENCY
+    out_path = str(Path(path).with_suffix("")) + ".results.jsonl"
+    use_cache = True
+    i = 1
+    try:
+        while i < len(tokens):
+            opt = tokens[i]
+            if opt == "--no-cache":
+                use_cache = False
+                i += 1
+                continue
+            value = tokens[i + 1]
+            if opt == "--provider":
+                provider = value
+            elif opt == "--concurrency":
+                concurrency = int(value)
+            elif opt == "--out":
+                out_path = value
+            else:
+                raise ValueError(f"unknown option {opt}")
+            i += 2
+    except (IndexError, ValueError) as e:
+        print(f"❌ Invalid arguments: {e}")
+        return
+    if provider not in DEFAULT_MODELS:
+        print("Provider must be 'groq' or 'ollama'")
+        return
+    from core.batch import read_prompts, run_batch
+    try:
+        prompts = read_prompts(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read prompts: {e}")
+        return
+    if not prompts:
+        print("❌ No prompts found")
+        return
+
+    def call(prompt):
+        return ask_llm(provider, build_messages(prompt), temperature=0.5, use_cache=use_cache)
+
+    print(f"🚀 Running {len(prompts)} prompts on {provider} (concurrency {concurrency})...")
+    report = run_batch(prompts, call, concurrency=concurrency, out_path=out_path)
+    ok = len(prompts) - report["failed"]
+    print(f"✅ {ok}/{len(prompts)} prompts in {report['seconds']:.2f}s "
+          f"({report['throughput']:.2f} prompts/s) -> {out_path}")
+    if report["failed"]:
+        print(f"⚠️ {report['failed']} prompt(s) failed; see the \"error\" field in the results")
+
+@command("stream stats")
+def cmd_stream_stats(args: str) -> None:
+    """Show time-to-first-token and tokens/sec for recent streamed answers"""
+    if not STREAM_HISTORY:
+        print("No streamed answers yet. Turn streaming on with 'stream on'.")
+        return
+    for stats in STREAM_HISTORY:
+        print(f"  {stats.summary()}")
+
+@command("cache stats")
+def cmd_cache_stats(args: str) -> None:
+    """Show response cache hit/miss counters"""
+    s = LLM_CACHE.stats()
+    print(f"Response cache: {'ON' if CACHE_ENABLED else 'OFF'}")
+    print(f"  Hits: {s['hits']} (memory {s['memory_hits']}, disk {s['disk_hits']})")
+    print(f"  Misses: {s['misses']}  Hit rate: {s['hit_rate']:.0%}")
+    print(f"  Entries: {s['memory_entries']} in memory, {s['disk_entries']} on disk ({s['disk_bytes']} bytes)")
+    f = INFLIGHT.stats()
+    print(f"  In-flight coalescing: {f['coalesced']} call(s) joined an identical request, {f['executed']} sent")
+    if _semantic is not None:
+        m = _semantic.stats()
+        print(f"  Semantic: {'ON' if SEMANTIC_ENABLED else 'OFF'}, {m['hits']} hits, {m['misses']} misses, "
+              f"{m['entries']}/{m['capacity']} prompts (threshold {m['threshold']})")
+
+@command("semantic on")
+def cmd_semantic_on(args: str) -> None:
+    """Answer reworded repeats of earlier questions from the semantic cache"""
+    global SEMANTIC_ENABLED
+    if not semantic_cache.available():
+        print("❌ The semantic cache needs numpy: pip install numpy")
+        return
+    SEMANTIC_ENABLED = True
+    print("[OK] Semantic cache ON.")
+
+@command("semantic off")
+def cmd_semantic_off(args: str) -> None:
+    """Stop matching reworded questions"""
+    global SEMANTIC_ENABLED
+    SEMANTIC_ENABLED = False
+    print("[OK] Semantic cache OFF.")
+
+@command("cache clear")
+def cmd_cache_clear(args: str) -> None:
+    """Remove all cached AI responses"""
+    LLM_CACHE.clear()
+    if _semantic is not None:
+        _semantic.clear()
+    print("[OK] Response cache cleared.")
+
+@command("cache on")
+def cmd_cache_on(args: str) -> None:
+    """Serve repeated prompts from the response cache"""
+    global CACHE_ENABLED
+    CACHE_ENABLED = True
+    print("[OK] Response cache ON.")
+
+@command("cache off")
+def cmd_cache_off(args: str) -> None:
+    """Bypass the response cache for every AI call"""
+    global CACHE_ENABLED
+    CACHE_ENABLED = False
+    print("[OK] Response cache OFF.")
+
+@command("hedge on")
+def cmd_hedge_on(args: str) -> None:
+    """Race slow Groq answers against local Ollama"""
+    global HEDGE_ENABLED
+    HEDGE_ENABLED = True
+    print("[OK] Hedging ON (Groq primary, Ollama secondary).")
+
+@command("hedge off")
+def cmd_hedge_off(args: str) -> None:
+    """Only ever ask the selected provider"""
+    global HEDGE_ENABLED
+    HEDGE_ENABLED = False
+    print("[OK] Hedging OFF.")
+
+@command("hedge stats")
+def cmd_hedge_stats(args: str) -> None:
+    """Show hedge counts, winners and current latency thresholds"""
+    s = HEDGER.summary()
+    print(f"Hedging: {'ON' if HEDGE_ENABLED else 'OFF'}")
+    print(f"  Hedged requests: {s['hedged']}  Failovers: {s['failovers']}")
+    for name in sorted(s["delay"]):
+        p50 = s["p50"][name]
+        p50_text = f"{p50:.2f}s" if p50 is not None else "n/a"
+        print(f"  {name}: wins {s['wins'].get(name, 0)}, p50 {p50_text}, hedge after {s['delay'][name]:.2f}s")
+
+@command("history show")
+def cmd_history_show(args: str) -> None:
+    """Show the conversation context sent with AI questions"""
+    conversation = _conversation()
+    if not conversation.turns and not conversation.summary:
+        print("No conversation history yet.")
+        return
+    if conversation.summary:
+        print(f"Summary ({conversation.summarized_turns} earlier turns): {conversation.summary}")
+    for i, (user, answer, tokens) in enumerate(conversation.turns, 1):
+        print(f"{i}. You: {user[:70]}")
+        print(f"   Lucien: {answer[:70]} (~{tokens} tokens)")
+    print(f"Context: ~{conversation.tokens()}/{conversation.budget} tokens")
+
+@command("history clear")
+def cmd_history_clear(args: str) -> None:
+    """Forget the conversation context"""
+    _conversation().clear()
+    print("[OK] Conversation history cleared.")
+
+@command("ollama status")
+def cmd_ollama_status(args: str) -> None:
+    """Show Ollama keep-alive, preload result and cold vs warm latency"""
+    s = OLLAMA_WARMTH.summary()
+    print(f"Ollama keep_alive: {OLLAMA_KEEP_ALIVE}")
+    preload = s["preload"]
+    if preload is None:
+        print("  Preload: not run")
+    elif preload["ok"]:
+        print(f"  Preload: {preload['model']} loaded in {preload['wall']:.2f}s")
+    else:
+        print(f"  Preload: failed ({preload['error']})")
+    for kind in ("cold", "warm"):
+        avg = s[f"{kind}_avg"]
+        avg_text = f"{avg:.2f}s avg" if avg is not None else "n/a"
+        print(f"  {kind.capitalize()} calls: {s[f'{kind}_calls']} ({avg_text})")
+    if s["last_prompt_tokens"] is not None:
+        print(f"  Prompt tokens evaluated last call: {s['last_prompt_tokens']}")
+
+def _fmt_seconds(value) -> str:
+    return f"{value:.2f}s" if value is not None else "n/a"
+
+@command("stats")
+def cmd_stats(args: str) -> None:
+    """Show latency and throughput per provider and model"""
+    rows = TELEMETRY.summary()
+    if not rows:
+        print("No AI calls recorded yet.")
+        return
+    print("AI call statistics:")
+    for r in rows:
+        print(f"  {r['provider']}/{r['model']}: {r['calls']} calls, {r['errors']} errors")
+        print(f"      latency p50 {_fmt_seconds(r['p50'])}  p95 {_fmt_seconds(r['p95'])}  "
+              f"p99 {_fmt_seconds(r['p99'])}  mean {_fmt_seconds(r['mean'])}")
+        rate = f"{r['tokens_per_sec']:.1f} tok/s" if r["tokens_per_sec"] else "n/a"
+        per_min = f"{r['calls_per_min']:.1f} calls/min" if r["calls_per_min"] else "n/a"
+        print(f"      throughput {rate}, {per_min}; tokens {r['prompt_tokens']} in / {r['completion_tokens']} out")
+        print(f"      bytes {r['bytes_sent']} sent / {r['bytes_received']} received")
+    print(f"  Groq scheduler: {GROQ_SCHEDULER.retries} retries, {GROQ_SCHEDULER.throttled_seconds:.1f}s throttled")
+
 @command("help")
 def cmd_help(args: str) -> None:
     """Show available commands"""
@@ -571,17 +1881,36 @@ def cmd_help(args: str) -> None:
     print("    write file <path>   - Write content to file")
     print("    delete file <path>  - Delete a file")
     print("  Git:")
-    print("    git status          - Show repository status")
+    print("    git status [--limit N] [--offset N] [paths] - Show repository status")
     print("    git add <files>     - Stage files for commit")
     print("    git commit          - Commit with AI-generated message")
     print("    git push            - Push to remote repository")
     print("    git pull            - Pull latest changes")
-    print("    git log             - Show recent commit history")
+    print("    git log [-n N] [--skip N] [--since D] [--author A] [paths] - Show commit history")
+    print("    commit cache show   - Cached commit messages by staged tree")
+    print("    commit cache clear  - Forget cached commit messages")
+    print("    commit speculate on/off - Draft the commit message in the background after git add")
+    print("    commit speculate stats  - How often background drafts were used")
+    print("  Workspace:")
+    print("    workspace add/remove <path or glob> - Manage the repositories in the workspace")
+    print("    workspace list      - Show workspace patterns and matched repositories")
+    print("    workspace status [--limit N] - git status across all repositories")
+    print("    workspace log [-n N] - Recent commits across all repositories")
+    print("    workspace pull      - git pull across all repositories")
     print("  Spells:")
     print("    record spell <name> - Start recording a workflow")
     print("    stop recording      - Stop recording current spell")
-    print("    cast spell <name>   - Execute a recorded workflow")
-    print("    list spells         - Show all available spells")
+    print("    cast spell <name> [--force] - Execute a recorded workflow (--force reruns up-to-date steps)")
+    print("    profile spell <name> [--force] [--cprofile] - Per-step wall/CPU/subprocess/LLM time and memory")
+    print("    list spells [--tag t] - Show all available spells")
+    print("    schedule add <spell> every 5m | cron <m h dom mon dow> - Run a spell in the background")
+    print("    schedule remove <spell> - Unschedule a spell")
+    print("    schedule list       - Scheduled spells and their next run")
+    print("    schedule history [spell] [-n N] - Recent scheduled runs with durations and outcomes")
+    print("    schedule start/stop - Start or stop the background scheduler")
+    print("    spell tag <name> <tags> - Tag a spell for filtering")
+    print("    spell io <name> <step> <inputs> -> <outputs> - Skip the step while its files are unchanged")
+    print("    spell stages <name> 1 2 | 3 - Run steps 1 and 2 in parallel, then 3 ('none' to reset)")
     print("    delete spell <name> - Remove a spell")
     print("  System:")
     print("    disk space          - Show disk usage")
@@ -593,71 +1922,200 @@ def cmd_help(args: str) -> None:
     print("    run python          - Execute Python code")
     print("  AI:")
     print("    ai <provider> <prompt> - Chat with specific AI provider")
+    print("    ai --no-cache <provider> <prompt> - Skip the response cache for one call")
+    print("    ai batch <file> [--provider p] [--concurrency N] [--out f] - Run a prompt file concurrently")
     print("    (any other text)    - Chat with default AI")
+    print("    stats               - Latency (p50/p95/p99) and throughput per provider/model")
+    print("    stream stats        - Time-to-first-token and tokens/sec of streamed answers")
+    print("    cache stats         - Response cache hit/miss counters")
+    print("    cache clear         - Drop all cached responses")
+    print("    cache on/off        - Enable or bypass the response cache")
+    print("    semantic on/off     - Reuse answers to reworded questions (needs numpy)")
+    print("    ollama status       - Local model keep-alive and cold/warm latency")
+    print("    history show        - Show the conversation context sent to the AI")
+    print("    history clear       - Start a fresh conversation")
+    print("    hedge on/off        - Race slow Groq calls against local Ollama")
+    print("    hedge stats         - Hedge winners and latency thresholds")
     print("  Control:")
+    print("    plugins             - Plugin modules and whether they are loaded")
     print("    internet on/off     - Toggle internet mode")
+    print("    stream on/off       - Print AI answers token by token")
     print("    quit/exit/bye       - Exit Lucien")
     print("    help                - Show this help")
 
+def resolve_command(line: str):
+    """
+    Find the handler for a command line: the longest registered command
+    the line starts with, matched word by word.
+
+    Returns:
+        tuple: (command name, handler, args), or None when the line is not a
+        command and would go to the AI fallback.
+    """
+    return COMMANDS.resolve(line)
+
 def dispatch(line: str) -> None:
     """Dispatch command to appropriate handler."""
-    global recorded_commands
-    
     if not line:
         return
     
-    # Record command if we're recording a spell
-    if recording_spell and line not in ["stop recording"]:
-        recorded_commands.append(line)
+    resolved = resolve_command(line)
+    
+    # Record command if we're recording a spell (not lines run by background spells)
+    spell, recorded = _recording()
+    if spell and line not in ["stop recording"] and _is_foreground():
+        recorded.append(line)
+        if resolved is None:
+            print(f"⚠️ '{line}' is not a command; it will be sent to the AI when the spell is cast")
     
     # Handle special cases first
     if line.lower() in ["quit", "exit", "bye"]:
         print("Farewell, brave wizard.")
-        save_memory(memory)
+        save_loaded_memory()
         return "EXIT"
     
-    # Try to find exact command match first
-    name, *rest = line.split(maxsplit=1)
-    args = rest[0] if rest else ""
-    
-    # Check for exact command match
-    fn = COMMANDS.get(name)
-    if fn:
+    if resolved is not None:
+        _, fn, args = resolved
         fn(args)
         return
     
-    # Check for commands with spaces (like "show memory")
-    for cmd_name, fn in COMMANDS.items():
-        if line == cmd_name or line.startswith(cmd_name + " "):
-            args = line[len(cmd_name):].strip()
-            fn(args)
-            return
-    
     # Fallback to AI chat
     try:
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": line}
-        ]
-        
-        if USE_INTERNET:
-            resp = chat_groq(messages, model="llama3-70b-8192", temperature=0.5)
+        conversation = _conversation()
+        messages = conversation.build(system_prompt, line) if HISTORY_ENABLED else build_messages(line)
+        provider = "groq" if USE_INTERNET else "ollama"
+        answer = semantic_answer(provider, messages)
+        if answer is not None:
+            print(answer)
         else:
-            resp = chat_ollama(messages, model="llama3", temperature=0.5)
-        print(resp)
+            answer = respond(provider, messages, temperature=0.5)
+            remember_semantic(provider, messages, answer)
+        if HISTORY_ENABLED:
+            conversation.add(line, answer)
     except RuntimeError as e:
         print(f"[ERROR] {e}")
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
 
+# Extra command plugins listed as {"module": {"command name": "function"}}; registered
+# after the built-in commands, which they cannot replace
+PLUGINS_FILE = _getenv("LUCIEN_PLUGINS_FILE", ".lucien/plugins.json")
+try:
+    USER_PLUGINS = read_manifest(PLUGINS_FILE)
+except ValueError as e:
+    print(f"⚠️ Ignoring plugin manifest {e}")
+    USER_PLUGINS = {}
+register(COMMANDS, USER_PLUGINS)
+
+def _plugin_manifest() -> dict:
+    return {**PLUGIN_MANIFEST, **USER_PLUGINS}
+
+def toggle_setting(line: str) -> bool:
+    """Handle 'internet on/off' and 'stream on/off'; False for any other line."""
+    global USE_INTERNET, STREAM_OUTPUT
+    
+    if line.lower() == "internet on":
+        USE_INTERNET = True
+        print("[OK] Internet mode ON.")
+    elif line.lower() == "internet off":
+        USE_INTERNET = False
+        print("[OK] Internet mode OFF.")
+    elif line.lower() == "stream on":
+        STREAM_OUTPUT = True
+        print("[OK] Streaming output ON.")
+    elif line.lower() == "stream off":
+        STREAM_OUTPUT = False
+        print("[OK] Streaming output OFF.")
+    else:
+        return False
+    return True
+
+# ============
+# DAEMON
+# ============
+
+# Unix socket of `python Lucien.py --daemon`; lucien_client.py reads the same variable.
+# Unset or empty means core.daemon.default_socket_path(), which is per user and absolute
+DAEMON_SOCKET = _getenv("LUCIEN_SOCKET") or None
+
+# Held by daemon clients and scheduled runs while a command may change shared
+# state (memory, spells, schedules, settings, caches), so concurrent
+# read-modify-write updates cannot lose each other's changes
+STATE_LOCK = threading.RLock()
+
+# Commands that only read shared state, plus AI questions (whose caches and
+# history are thread-safe); the daemon runs these without STATE_LOCK
+CONCURRENT_COMMANDS = frozenset({
+    "help", "show memory", "list spells", "plugins", "stats", "stream stats", "cache stats",
+    "hedge stats", "history show", "ollama status", "commit cache show", "commit speculate stats",
+    "schedule list", "schedule history", "workspace list", "workspace status", "workspace log",
+    "git status", "git log", "ai", "list files", "read file", "disk space", "cpu usage",
+})
+
+def _changes_state(line: str) -> bool:
+    resolved = resolve_command(line)
+    if resolved is not None:
+        return resolved[0] not in CONCURRENT_COMMANDS
+    # Setting toggles and quit (which saves memory); any other line is an AI question
+    return line.lower() in ("internet on", "internet off", "stream on", "stream off", "quit", "exit", "bye")
+
+def _daemon_line(line: str, state: RecordingState) -> None:
+    """Run one client line with that client's recording state."""
+    _client.state = state
+    try:
+        line = line.strip()
+        with STATE_LOCK if _changes_state(line) else nullcontext():
+            if not toggle_setting(line) and dispatch(line) == "EXIT":
+                print("(the daemon keeps running; stop it with python lucien_client.py --stop)")
+    finally:
+        _client.state = None
+
+def serve_daemon(path=None) -> int:
+    """
+    Keep one warm Lucien (memory, compiled spells, pooled HTTP sessions and
+    the scheduler) serving lucien_client.py over a Unix socket until Ctrl+C
+    or `lucien_client.py --stop`.
+    """
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        print("❌ The daemon needs Unix domain sockets, which this platform does not have")
+        return 1
+    from core.daemon import Daemon, default_socket_path
+    daemon = Daemon(path or DAEMON_SOCKET or default_socket_path(), _daemon_line, install_thread_output(),
+                    new_state=RecordingState, cwd=os.getcwd())
+    try:
+        daemon.bind()
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Could not start the daemon: {e}")
+        return 1
+    
+    get_memory()
+    load_spells()
+    if OLLAMA_PRELOAD:
+        preload_ollama(DEFAULT_MODELS["ollama"])
+    if USE_INTERNET and GROQ_API_KEY:
+        get_session("groq", HTTP_POOL)
+    if SCHEDULER_AUTOSTART and SCHEDULER.load():
+        SCHEDULER.start()
+        print(f"⏰ Scheduler running {len(SCHEDULER.jobs)} scheduled spell(s).")
+    
+    print(f"🔌 Lucien daemon listening on {daemon.path} (pid {os.getpid()})")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        save_loaded_memory()
+        stop_scheduler()
+    print("Farewell, brave wizard.")
+    return 0
+
 # ============
 # MAIN LOOP
 # ============
 
 def main():
     """Main interactive loop for Lucien AI."""
-    global USE_INTERNET  # Declare once at the top to cover all branches
-    
     print("""
 +======================================+
 |         L U C I E N   A I            |
@@ -665,6 +2123,13 @@ def main():
 +======================================+
 """)
 
+    if OLLAMA_PRELOAD:
+        preload_ollama(DEFAULT_MODELS["ollama"])
+    if SCHEDULER_AUTOSTART and SCHEDULER.load():
+        install_thread_output()
+        SCHEDULER.start()
+        print(f"⏰ Scheduler running {len(SCHEDULER.jobs)} scheduled spell(s).")
+
     print("*** Lucien stands ready. Type your command or 'quit' to exit. ***")
     print("Type 'help' for available commands.")
 
@@ -674,16 +2139,10 @@ def main():
                 line = input("You >>> ").strip()
             except (EOFError, KeyboardInterrupt):
                 print("\nFarewell, brave wizard.")
-                save_memory(memory)
+                save_loaded_memory()
                 break
             
-            if line.lower() == "internet on":
-                USE_INTERNET = True
-                print("[OK] Internet mode ON.")
-                continue
-            if line.lower() == "internet off":
-                USE_INTERNET = False
-                print("[OK] Internet mode OFF.")
+            if toggle_setting(line):
                 continue
             
             result = dispatch(line)
@@ -692,7 +2151,27 @@ def main():
 
     except KeyboardInterrupt:
         print("\nFarewell, brave wizard.")
-        save_memory(memory)
+        save_loaded_memory()
+    finally:
+        stop_scheduler()
+
+def profile_startup(limit: int = 15) -> int:
+    """Print where `import Lucien` spends its time (python Lucien.py --profile-startup)."""
+    from core.startup import format_breakdown, measure_import
+    try:
+        plain = measure_import("Lucien", path=REPO_ROOT)
+        traced = measure_import("Lucien", importtime=True, path=REPO_ROOT)
+    except (OSError, RuntimeError, ValueError, SyntaxError) as e:
+        print(f"❌ Could not profile startup: {e}")
+        return 1
+    print(f"⏱️ Startup: import Lucien took {plain.seconds * 1000:.1f} ms ({len(plain.modules)} modules loaded)")
+    for line in format_breakdown(traced.entries, "Lucien", limit):
+        print(line)
+    return 0
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv[1:]:
+        sys.exit(profile_startup())
+    if "--daemon" in sys.argv[1:]:
+        sys.exit(serve_daemon())
     main()
\ No newline at end of file
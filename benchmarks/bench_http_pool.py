@@ -0,0 +1,77 @@
+# benchmarks/bench_http_pool.py
+"""
+Back-to-back request latency: one-shot requests.post vs pooled keep-alive session.
+
+Runs against a local stub server that mimics Ollama's /api/chat response, so the
+numbers isolate connection setup cost from model latency.
+
+    python benchmarks/bench_http_pool.py [requests]
+"""
+
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from core.http_pool import PoolConfig, close_sessions, get_session
+
+BODY = json.dumps({"message": {"role": "assistant", "content": "pong"}}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def _measure(post, url, n):
+    payload = {"model": "stub", "messages": [{"role": "user", "content": "ping"}]}
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        post(url, json=payload, timeout=5).raise_for_status()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<18} mean {statistics.mean(timings):7.3f} ms  "
+          f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/chat"
+    try:
+        print(f"{n} back-to-back POSTs to {url}")
+        _report("requests.post", _measure(requests.post, url, n))
+        session = get_session("bench", PoolConfig())
+        _report("pooled session", _measure(session.post, url, n))
+    finally:
+        close_sessions()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_router.py
+"""
+Command lookup cost with 10, 100 and 1000 registered commands: the word
+trie used by resolve_command versus the old first-word lookup followed by
+a startswith scan over every command.
+
+    python benchmarks/bench_router.py [lookups]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.router import CommandTable
+
+
+def linear_resolve(commands, line):
+    """The router before the trie, kept here for comparison."""
+    name, *rest = line.split(maxsplit=1) or [""]
+    fn = commands.get(name)
+    if fn:
+        return name, fn, rest[0] if rest else ""
+    for cmd_name, fn in commands.items():
+        if line == cmd_name or line.startswith(cmd_name + " "):
+            return cmd_name, fn, line[len(cmd_name):].strip()
+    return None
+
+
+def per_lookup(resolve, lines, lookups):
+    start = time.perf_counter()
+    for i in range(lookups):
+        resolve(lines[i % len(lines)])
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    noop = lambda args: None
+    cases = {
+        "one word": ["remember buy milk"],
+        "multi-word (last)": None,  # filled per size: the last registered command
+        "miss (AI fallback)": ["what is the capital of france"],
+    }
+    print(f"{'commands':>8}  {'case':<20} {'linear us':>10} {'trie us':>10}")
+    for size in (10, 100, 1000):
+        names = ["remember"] + [f"plugin{i // 4} action{i % 4}" for i in range(size - 1)]
+        plain = {name: noop for name in names}
+        table = CommandTable(plain)
+        cases["multi-word (last)"] = [f"{names[-1]} --flag value"]
+        for case, lines in cases.items():
+            assert linear_resolve(plain, lines[0]) == table.resolve(lines[0])
+            linear = per_lookup(lambda line: linear_resolve(plain, line), lines, lookups)
+            trie = per_lookup(table.resolve, lines, lookups)
+            print(f"{size:>8}  {case:<20} {linear:>10.2f} {trie:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_semantic_cache.py
+"""
+Lookup latency of the semantic prompt cache at 10k and 100k entries.
+
+    python benchmarks/bench_semantic_cache.py [lookups]
+"""
+
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.semantic_cache import SemanticCache
+
+WORDS = ("list dict python error explain function class async await import module "
+         "string parse json file read write git commit branch merge test fixture "
+         "docker build deploy cache memory thread lock queue socket http request").split()
+
+
+def _prompt(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+
+
+def bench(entries, lookups, rng):
+    cache = SemanticCache(max_entries=entries)
+    start = time.perf_counter()
+    for i in range(entries):
+        cache.add("ns", _prompt(rng), f"answer {i}")
+    fill = time.perf_counter() - start
+    queries = [_prompt(rng) for _ in range(lookups)]
+    timings = []
+    for q in queries:
+        t = time.perf_counter()
+        cache.lookup("ns", q)
+        timings.append((time.perf_counter() - t) * 1000)
+    timings.sort()
+    print(f"{entries:>7} entries  fill {fill:6.2f}s  lookup mean {statistics.mean(timings):6.3f} ms  "
+          f"p50 {statistics.median(timings):6.3f} ms  p95 {timings[int(len(timings) * 0.95) - 1]:6.3f} ms")
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(42)
+    for entries in (10_000, 100_000):
+        bench(entries, lookups, rng)
+
+
+if __name__ == "__main__":
+    main()
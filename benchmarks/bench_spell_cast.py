@@ -0,0 +1,50 @@
+# benchmarks/bench_spell_cast.py
+"""
+Routing overhead per step when casting a 100-step spell: compiled steps
+versus re-resolving every line through dispatch's command lookup.
+
+    python benchmarks/bench_spell_cast.py [casts]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Lucien
+
+STEPS = 100
+
+
+def main():
+    casts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    noop = lambda args: None
+    # Worst case for lookup: multi-word commands registered last
+    names = [f"bench step {i}" for i in range(10)]
+    for name in names:
+        Lucien.COMMANDS[name] = noop
+    lines = [f"{names[i % len(names)]} arg{i}" for i in range(STEPS)]
+    spell = {"commands": lines, "steps": [Lucien.resolve_command(l)[0] for l in lines], "count": STEPS}
+
+    start = time.perf_counter()
+    for _ in range(casts):
+        for line in lines:
+            _, fn, args = Lucien.resolve_command(line)
+            fn(args)
+    lookup = (time.perf_counter() - start) / (casts * STEPS)
+
+    Lucien.compile_spell("bench", spell)
+    start = time.perf_counter()
+    for _ in range(casts):
+        for fn, args, _ in Lucien.compile_spell("bench", spell):
+            fn(args)
+    compiled = (time.perf_counter() - start) / (casts * STEPS)
+
+    print(f"{len(Lucien.COMMANDS)} commands, {STEPS}-step spell, {casts} casts")
+    print(f"  lookup per line : {lookup * 1e6:7.2f} us/step")
+    print(f"  compiled steps  : {compiled * 1e6:7.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_spell_store.py
+"""
+JSON file versus SQLite spell store at 10k spells: the cost of the
+operations commands perform (record one, look one up to cast, list,
+delete one).
+
+    python benchmarks/bench_spell_store.py [spells]
+"""
+
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.spell_store import SqliteSpellStore
+
+REPEAT = 20
+
+
+def _spell(i):
+    commands = [f"git status --limit {i % 50}", "workspace pull", f"remember step {i}", "list files ."]
+    return {"commands": commands, "steps": ["git status", "workspace pull", "remember", "list files"],
+            "description": f"Recorded spell with {len(commands)} commands",
+            "created": "2025-01-01T00:00:00", "count": len(commands), "tags": [f"team{i % 20}"]}
+
+
+def _ms(fn):
+    timings = []
+    for i in range(REPEAT):
+        start = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_json(path, spells):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spells, f, indent=2)
+
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(data):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def record(i):
+        data = load()
+        data[f"new{i}"] = _spell(i)
+        save(data)
+
+    def delete(i):
+        data = load()
+        del data[f"new{i}"]
+        save(data)
+
+    return {
+        "record": _ms(record),
+        "cast lookup": _ms(lambda i: load()[f"spell{i * 7}"]),
+        "list": _ms(lambda i: [(n, s["description"]) for n, s in load().items()]),
+        "delete": _ms(delete),
+    }
+
+
+def bench_sqlite(path, spells):
+    store = SqliteSpellStore(path)
+    store.replace_all(spells)
+    return {
+        "record": _ms(lambda i: store.add(f"new{i}", _spell(i))),
+        "cast lookup": _ms(lambda i: store.get(f"spell{i * 7}")),
+        "list": _ms(lambda i: store.summaries()),
+        "delete": _ms(lambda i: store.delete(f"new{i}")),
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    spells = {f"spell{i}": _spell(i) for i in range(count)}
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {"json": bench_json(Path(tmp) / "spells.json", spells),
+                   "sqlite": bench_sqlite(Path(tmp) / "spells.db", spells)}
+    print(f"{count} spells, median of {REPEAT} runs (ms)")
+    print(f"  {'operation':<12} {'json':>9} {'sqlite':>9}")
+    for op in results["json"]:
+        print(f"  {op:<12} {results['json'][op]:9.2f} {results['sqlite'][op]:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
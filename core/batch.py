@@ -0,0 +1,109 @@
+# core/batch.py
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def read_prompts(path):
+    """
+    Read prompts from a text file (one per line) or JSONL.
+
+    Lines starting with "{" (or every line of a .jsonl file) are parsed as
+    JSON: either a bare string or an object with a "prompt" key and an
+    optional "id". Blank lines are skipped.
+
+    Returns:
+        list: dicts with "prompt" and, when given, "id".
+    """
+    prompts = []
+    is_jsonl = str(path).endswith(".jsonl")
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if is_jsonl or line.startswith("{"):
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {lineno}: invalid JSON: {e}") from e
+                if isinstance(item, str):
+                    item = {"prompt": item}
+                if not isinstance(item, dict) or not item.get("prompt"):
+                    raise ValueError(f"line {lineno}: expected a \"prompt\" field")
+                prompts.append(item)
+            else:
+                prompts.append({"prompt": line})
+    return prompts
+
+
+async def _run(prompts, call, concurrency, on_result):
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="lucien-batch") as pool:
+
+        async def one(index, item):
+            async with limit:
+                start = time.perf_counter()
+                result = {"index": index, "prompt": item["prompt"]}
+                if "id" in item:
+                    result["id"] = item["id"]
+                try:
+                    result["output"] = await loop.run_in_executor(pool, call, item["prompt"])
+                except Exception as e:
+                    result["error"] = str(e)
+                result["seconds"] = round(time.perf_counter() - start, 3)
+                on_result(result)
+
+        await asyncio.gather(*(one(i, item) for i, item in enumerate(prompts)))
+
+
+def run_batch(prompts, call, concurrency=4, out_path=None):
+    """
+    Fan prompts out to ``call`` with at most ``concurrency`` in flight.
+
+    Results are written to ``out_path`` as JSONL in input order; each line is
+    flushed as soon as every earlier prompt has finished.
+
+    Args:
+        prompts (list): Items from read_prompts().
+        call (callable): Blocking function mapping a prompt string to an answer.
+        concurrency (int): Maximum simultaneous calls.
+        out_path (str): Optional JSONL destination.
+
+    Returns:
+        dict: "results" in input order, "seconds" elapsed, "failed" count and
+        "throughput" in prompts per second.
+    """
+    concurrency = max(1, int(concurrency))
+    ordered = [None] * len(prompts)
+    pending = {}
+    next_index = 0
+    out = open(out_path, "w", encoding="utf-8") if out_path else None
+
+    def on_result(result):
+        nonlocal next_index
+        ordered[result["index"]] = result
+        pending[result["index"]] = result
+        while next_index in pending:
+            done = pending.pop(next_index)
+            if out:
+                out.write(json.dumps(done, ensure_ascii=False) + "\n")
+                out.flush()
+            next_index += 1
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(_run(prompts, call, concurrency, on_result))
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "results": ordered,
+        "seconds": elapsed,
+        "failed": sum(1 for r in ordered if r and "error" in r),
+        "throughput": len(prompts) / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,101 @@
+# core/commit_cache.py
+
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+
+def staged_tree(run=None):
+    """
+    Object id of the tree the index would commit (``git write-tree``).
+    Identical staged content always yields the same id.
+    """
+    result = (run or subprocess.run)(["git", "write-tree"], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+class CommitMessageCache:
+    """
+    Generated commit messages keyed by staged tree id, provider and model,
+    kept in one small JSON file. Entries older than ``ttl`` seconds are
+    dropped and the oldest go first once there are more than ``max_entries``.
+    """
+
+    def __init__(self, path, max_entries=200, ttl=30 * 24 * 3600):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = None  # loaded on first use
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tree, provider, model):
+        return f"{tree}:{provider}:{model}"
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a lost cache entry only costs one model call
+
+    def _prune(self, now):
+        entries = self._load()
+        for key in [k for k, e in entries.items() if e["created"] + self.ttl <= now]:
+            del entries[key]
+        excess = len(entries) - self.max_entries
+        if excess > 0:
+            for key in sorted(entries, key=lambda k: entries[k]["created"])[:excess]:
+                del entries[key]
+
+    def get(self, tree, provider, model):
+        """Cached message for this staged tree and model, or None."""
+        with self._lock:
+            entry = self._load().get(self.key(tree, provider, model))
+            if entry is None or entry["created"] + self.ttl <= time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["message"]
+
+    def put(self, tree, provider, model, message):
+        now = time.time()
+        with self._lock:
+            self._load()[self.key(tree, provider, model)] = {
+                "tree": tree, "provider": provider, "model": model,
+                "message": message, "created": now,
+            }
+            self._prune(now)
+            self._save()
+
+    def entries(self):
+        """Live entries, newest first."""
+        with self._lock:
+            self._prune(time.time())
+            return sorted(self._load().values(), key=lambda e: e["created"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._load()), "hits": self.hits, "misses": self.misses}
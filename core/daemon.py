@@ -0,0 +1,279 @@
+# core/daemon.py
+
+import builtins
+import io
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from pathlib import Path
+
+# Protocol: one JSON object per line in each direction.
+#   client -> daemon  {"line": "...", "session": "...", "cwd": "..."}
+#                                                          run a command line
+#                     {"control": "ping" | "stop"}
+#                     {"input": "..."} or {"eof": true}    answer to a prompt
+#   daemon -> client  {"out": "..."}                       output, as it is printed
+#                     {"prompt": "..."}                    the command called input()
+#                     {"done": true}                       command finished
+#                     {"error": "..."}                     request rejected
+
+
+def default_socket_path():
+    """
+    The socket used when LUCIEN_SOCKET is not set: absolute and per user, so
+    clients find the daemon from any directory.
+    """
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return Path(runtime) / "lucien.sock"
+    return Path(tempfile.gettempdir()) / f"lucien-{os.getuid()}" / "lucien.sock"
+
+
+def same_directory(a, b):
+    return os.path.realpath(a) == os.path.realpath(b)
+
+
+def send_message(stream, message):
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def read_message(stream):
+    """The next message from ``stream``, or None when the peer hung up."""
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class SocketWriter(io.TextIOBase):
+    """
+    Text stream that forwards whole lines to the client as "out" messages,
+    so a command's output arrives while it is still running.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._pending = []
+
+    def write(self, text):
+        self._pending.append(text)
+        if "\n" in text:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._pending:
+            text, self._pending = "".join(self._pending), []
+            send_message(self.stream, {"out": text})
+
+
+class _Prompter:
+    """
+    Replacement for builtins.input that asks the client a thread is
+    serving; threads not serving a client get the original input().
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def __call__(self, prompt=""):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            return self.original(prompt)
+        writer, stream = client
+        writer.flush()
+        send_message(writer.stream, {"prompt": str(prompt)})
+        reply = read_message(stream)
+        if reply is None or "input" not in reply:
+            raise EOFError
+        return reply["input"]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        daemon = self.server.owner
+        while True:
+            try:
+                message = read_message(self.rfile)
+            except (ValueError, OSError):
+                return
+            if message is None:
+                return
+            if message.get("control") == "ping":
+                send_message(self.wfile, {"done": True, "pid": os.getpid()})
+            elif message.get("control") == "stop":
+                send_message(self.wfile, {"done": True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            elif isinstance(message.get("line"), str):
+                cwd = message.get("cwd")
+                if daemon.cwd is not None and isinstance(cwd, str) and not same_directory(cwd, daemon.cwd):
+                    send_message(self.wfile, {"error": f"the daemon runs commands in {daemon.cwd}, not {cwd}; "
+                                                       "cd there or start a daemon here with its own LUCIEN_SOCKET"})
+                    continue
+                daemon.run(message["line"], str(message.get("session") or ""), self.rfile, self.wfile)
+            else:
+                send_message(self.wfile, {"error": "expected a 'line' or 'control' message"})
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Daemon:
+    """
+    Serves command lines from many clients at once over a Unix socket, one
+    thread per connection. ``run_line(line, state)`` runs a line with the
+    client's output and input() routed back to it; ``state`` is the object
+    ``new_state()`` made for the client's session id, so per-client state
+    such as spell recording survives between connections of one client.
+    ``stdout`` must be a ThreadLocalStdout installed as sys.stdout. With a
+    ``cwd``, lines from clients working in another directory are refused:
+    commands would run against the daemon's directory, not theirs.
+    """
+
+    def __init__(self, path, run_line, stdout, new_state=dict, cwd=None):
+        self.path = Path(path)
+        self.run_line = run_line
+        self.stdout = stdout
+        self.new_state = new_state
+        self.cwd = cwd
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._prompter = None
+
+    def session(self, session_id):
+        with self._lock:
+            state = self.sessions.get(session_id)
+            if state is None:
+                state = self.sessions[session_id] = self.new_state()
+            return state
+
+    def run(self, line, session_id, rfile, wfile):
+        writer = SocketWriter(wfile)
+        self._prompter.local.client = (writer, rfile)
+        try:
+            with self.stdout.redirect(writer):
+                try:
+                    self.run_line(line, self.session(session_id))
+                except EOFError:
+                    print("❌ Input ended before the command finished")
+                except Exception as e:
+                    print(f"❌ Unexpected error: {e}")
+            writer.flush()
+            send_message(wfile, {"done": True})
+        except OSError:
+            pass  # the client went away mid-command
+        finally:
+            self._prompter.local.client = None
+
+    def bind(self):
+        """
+        Listen on the socket path. A leftover socket file from a daemon that
+        is no longer running is replaced; a live one raises RuntimeError.
+        """
+        if self.path.exists():
+            if ping(self.path) is not None:
+                raise RuntimeError(f"a daemon is already listening on {self.path}")
+            self.path.unlink()
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        umask = os.umask(0o177)  # socket readable and writable by the owner only
+        try:
+            self._server = _Server(str(self.path), _Handler)
+        finally:
+            os.umask(umask)
+        self._server.owner = self
+
+    def serve_forever(self):
+        """Serve until shutdown() or a client's "stop"; removes the socket afterwards."""
+        if self._server is None:
+            self.bind()
+        self._prompter = _Prompter(builtins.input)
+        builtins.input = self._prompter
+        try:
+            self._server.serve_forever(poll_interval=0.2)
+        finally:
+            builtins.input = self._prompter.original
+            self._server.server_close()
+            self._server = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def connect(path, timeout=None):
+    """A socket connected to the daemon; ``timeout`` applies to every later call too."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def ping(path, timeout=1.0):
+    """The daemon's pid, or None when nothing answers on ``path``."""
+    try:
+        with connect(path, timeout) as sock, sock.makefile("rwb") as stream:
+            send_message(stream, {"control": "ping"})
+            reply = read_message(stream)
+    except (OSError, ValueError):
+        return None
+    return reply.get("pid") if reply else None
+
+
+def stop(path):
+    """Ask the daemon on ``path`` to shut down; False if none was running."""
+    try:
+        with connect(path, 1.0) as sock, sock.makefile("rwb") as stream:
+            send_message(stream, {"control": "stop"})
+            return read_message(stream) is not None
+    except (OSError, ValueError):
+        return False
+
+
+def run_lines(path, lines, session, out, read_input, cwd=None):
+    """
+    Send each command line to the daemon over one connection, writing its
+    output to ``out`` as it arrives. ``read_input(prompt)`` answers input()
+    calls made by a command and may raise EOFError. ``cwd`` tells the daemon
+    where the client works.
+    Raises OSError when the daemon cannot be reached and RuntimeError when
+    it refuses a line.
+    """
+    with connect(path) as sock, sock.makefile("rwb") as stream:
+        for line in lines:
+            message = {"line": line, "session": session}
+            if cwd is not None:
+                message["cwd"] = str(cwd)
+            send_message(stream, message)
+            while True:
+                message = read_message(stream)
+                if message is None:
+                    raise ConnectionError("the daemon closed the connection")
+                if "out" in message:
+                    out.write(message["out"])
+                    out.flush()
+                elif "prompt" in message:
+                    try:
+                        send_message(stream, {"input": read_input(message["prompt"])})
+                    except EOFError:
+                        send_message(stream, {"eof": True})
+                elif "error" in message:
+                    raise RuntimeError(message["error"])
+                elif message.get("done"):
+                    break
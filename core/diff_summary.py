@@ -0,0 +1,99 @@
+# core/diff_summary.py
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Characters of one file's diff kept for the model; the rest is only counted
+MAX_FILE_CHARS = 6000
+# Characters of per-file summaries handed to the reduce step
+MAX_REDUCE_CHARS = 8000
+READ_CHUNK = 64 * 1024
+
+
+class FileDiff:
+    """One staged file's diff, capped at ``max_chars`` with line counts for the rest."""
+
+    def __init__(self, path):
+        self.path = path
+        self.text = ""
+        self.added = 0
+        self.removed = 0
+        self.truncated = False
+
+    @property
+    def stat(self):
+        return f"+{self.added}/-{self.removed}"
+
+
+def read_file_diff(path, max_chars=MAX_FILE_CHARS, popen=subprocess.Popen):
+    """
+    Stream ``git diff --cached -- <path>`` line by line. Only the first
+    ``max_chars`` characters are kept; later lines are counted and dropped,
+    so memory does not grow with the size of the diff.
+    """
+    diff = FileDiff(path)
+    kept = []
+    size = 0
+    proc = popen(["git", "diff", "--cached", "--no-color", "--", path],
+                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                 text=True, encoding="utf-8", errors="replace")
+    line_start = True
+    in_hunk = False  # +/- before the first @@ are file headers
+    try:
+        # Bounded reads so one huge line (minified or generated files) stays capped too
+        for line in iter(lambda: proc.stdout.readline(READ_CHUNK), ""):
+            if line_start:
+                if line.startswith("@@"):
+                    in_hunk = True
+                elif in_hunk and line.startswith("+"):
+                    diff.added += 1
+                elif in_hunk and line.startswith("-"):
+                    diff.removed += 1
+            line_start = line.endswith("\n")
+            piece = line[:max(0, max_chars - size)]
+            if piece:
+                kept.append(piece)
+                size += len(piece)
+            if len(piece) < len(line):
+                diff.truncated = True
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, ["git", "diff", "--cached", "--", path])
+    diff.text = "".join(kept)
+    return diff
+
+
+def summarize_files(paths, summarize, max_workers=4, max_chars=MAX_FILE_CHARS, read=read_file_diff):
+    """
+    Map step: read and summarize each staged file with at most
+    ``max_workers`` diffs in memory at once.
+
+    Args:
+        paths: Staged file paths.
+        summarize: ``fn(FileDiff) -> str`` producing a one-line summary.
+
+    Returns:
+        list: (path, stat, summary) tuples in input order.
+    """
+    def one(path):
+        diff = read(path, max_chars)
+        return path, diff.stat, summarize(diff).strip()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="lucien-diff") as pool:
+        return list(pool.map(one, paths))
+
+
+def format_summaries(summaries, max_chars=MAX_REDUCE_CHARS):
+    """Join per-file summaries for the reduce prompt, eliding what does not fit."""
+    lines = []
+    size = 0
+    for index, (path, stat, summary) in enumerate(summaries):
+        line = f"- {path} ({stat}): {summary}"
+        if size + len(line) > max_chars and lines:
+            lines.append(f"- ... and {len(summaries) - index} more file(s)")
+            break
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+# core/git_stream.py
+
+import subprocess
+import threading
+
+READ_CHUNK = 64 * 1024
+FIELD_SEP = "\x1f"  # between fields of one `git log` record
+
+# `git log --format` for LOG_FIELDS, one NUL-terminated record per commit with -z
+LOG_FIELDS = ("hash", "date", "author", "subject")
+LOG_FORMAT = "%h%x1f%ad%x1f%an%x1f%s"
+
+
+class StatusEntry:
+    """One path from ``git status --porcelain=v2``."""
+
+    __slots__ = ("xy", "path", "orig_path")
+
+    def __init__(self, xy, path, orig_path=None):
+        self.xy = xy
+        self.path = path
+        self.orig_path = orig_path
+
+    @property
+    def short(self):
+        """Two-letter code as in ``git status --short`` (" M", "R ", "??")."""
+        return self.xy.replace(".", " ")
+
+    def __str__(self):
+        if self.orig_path:
+            return f"{self.short} {self.orig_path} -> {self.path}"
+        return f"{self.short} {self.path}"
+
+
+def iter_records(stream, sep=b"\0", chunk_size=READ_CHUNK):
+    """
+    Yield decoded records from a binary pipe as they arrive, split on ``sep``.
+    Only the current partial record is buffered.
+    """
+    read = getattr(stream, "read1", stream.read)  # read1 returns whatever has arrived
+    buffer = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        *records, buffer = buffer.split(sep)
+        for record in records:
+            yield record.decode("utf-8", errors="replace")
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace")
+
+
+def parse_status_v2(records):
+    """
+    Turn ``git status --porcelain=v2 -z`` records into StatusEntry objects.
+    Renames and copies carry their original path in the following record.
+    """
+    records = iter(records)
+    for record in records:
+        kind = record[:1]
+        if kind == "1":
+            fields = record.split(" ", 8)
+            yield StatusEntry(fields[1], fields[8])
+        elif kind == "2":
+            fields = record.split(" ", 9)
+            yield StatusEntry(fields[1], fields[9], next(records, None))
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            yield StatusEntry(fields[1], fields[10])
+        elif kind == "?":
+            yield StatusEntry("??", record[2:])
+        elif kind == "!":
+            yield StatusEntry("!!", record[2:])
+        # "#" header lines and anything unknown are skipped
+
+
+def parse_log(records):
+    """Turn ``git log -z --format=LOG_FORMAT`` records into dicts."""
+    for record in records:
+        record = record.strip("\n")
+        if record:
+            yield dict(zip(LOG_FIELDS, record.split(FIELD_SEP, len(LOG_FIELDS) - 1)))
+
+
+def git_records(args, sep=b"\0", popen=None):
+    """
+    Run ``git <args>`` and yield its output records as they are produced.
+
+    Closing the generator early (pagination) kills git. A non-zero exit
+    after the output was fully read raises CalledProcessError with stderr.
+    """
+    cmd = ["git"] + list(args)
+    proc = (popen or subprocess.Popen)(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Drained alongside stdout: git blocks once a full stderr pipe is left unread
+    stderr = []
+    drain = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    drain.start()
+    complete = False
+    try:
+        yield from iter_records(proc.stdout, sep)
+        complete = True
+    finally:
+        if not complete:
+            proc.kill()
+        proc.stdout.close()
+        returncode = proc.wait()
+        drain.join()
+        proc.stderr.close()
+    if returncode:
+        message = b"".join(stderr).decode("utf-8", errors="replace")
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=message)
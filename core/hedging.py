@@ -0,0 +1,141 @@
+# core/hedging.py
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+log = logging.getLogger("lucien.hedge")
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per backend."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def names(self):
+        with self._lock:
+            return set(self._samples)
+
+    def count(self, name):
+        with self._lock:
+            return len(self._samples.get(name, ()))
+
+    def percentile(self, name, pct):
+        """Nearest-rank percentile in seconds, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+
+class Hedger:
+    """
+    Runs a primary call and, if it has not answered within the primary's
+    latency percentile, fires the same request at a secondary backend. The
+    first successful answer wins; the other call is cancelled if it has not
+    started yet, otherwise its result is discarded when it finishes.
+
+    Every decision is logged to the ``lucien.hedge`` logger and, when
+    ``log_path`` is set, appended there as JSONL for threshold tuning.
+    """
+
+    def __init__(self, percentile=95, default_delay=2.0, min_samples=20, max_workers=8, log_path=None):
+        self.log_path = log_path
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.tracker = LatencyTracker()
+        self.wins = Counter()
+        self.hedged = 0
+        self.failovers = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lucien-hedge")
+
+    def delay_for(self, name):
+        """Seconds to wait on ``name`` before hedging."""
+        if self.tracker.count(name) < self.min_samples:
+            return self.default_delay
+        return self.tracker.percentile(name, self.percentile)
+
+    def _submit(self, name, fn):
+        def run():
+            start = time.perf_counter()
+            result = fn()
+            self.tracker.record(name, time.perf_counter() - start)
+            return result
+        return self._pool.submit(run)
+
+    def call(self, primary, secondary):
+        """
+        Args:
+            primary: (name, fn) tried first.
+            secondary: (name, fn) fired after the hedge delay or on failure.
+
+        Returns:
+            tuple: (winning backend name, result).
+        """
+        primary_name, primary_fn = primary
+        secondary_name, secondary_fn = secondary
+        delay = self.delay_for(primary_name)
+        start = time.perf_counter()
+        first = self._submit(primary_name, primary_fn)
+        done, _ = wait([first], timeout=delay)
+        if done and first.exception() is None:
+            return self._finish(primary_name, first.result(), start, delay, hedged=False)
+        if done:
+            self.failovers += 1
+            log.warning("%s failed before hedge delay (%s); failing over to %s",
+                        primary_name, first.exception(), secondary_name)
+        self.hedged += 1
+        names = {first: primary_name, self._submit(secondary_name, secondary_fn): secondary_name}
+        pending = set(names)
+        if done:
+            pending.discard(first)
+        error = None
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return self._finish(names[future], future.result(), start, delay, hedged=True)
+                error = error or future.exception()
+        raise first.exception() or error
+
+    def _finish(self, name, result, start, delay, hedged):
+        elapsed = time.perf_counter() - start
+        self.wins[name] += 1
+        log.info("hedge winner=%s hedged=%s delay=%.3fs elapsed=%.3fs", name, hedged, delay, elapsed)
+        if self.log_path:
+            entry = {"ts": time.time(), "winner": name, "hedged": hedged,
+                     "delay": round(delay, 4), "elapsed": round(elapsed, 4)}
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError:
+                pass
+        return name, result
+
+    def summary(self):
+        """Dict of counters and current per-backend thresholds for reporting."""
+        backends = set(self.wins) | self.tracker.names()
+        return {
+            "hedged": self.hedged,
+            "failovers": self.failovers,
+            "wins": dict(self.wins),
+            "p50": {n: self.tracker.percentile(n, 50) for n in backends},
+            "delay": {n: self.delay_for(n) for n in backends},
+        }
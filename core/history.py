@@ -0,0 +1,95 @@
+# core/history.py
+
+import threading
+
+from core.tokens import MESSAGE_OVERHEAD, estimate_tokens
+
+
+class ConversationHistory:
+    """
+    Multi-turn chat context kept under a token budget.
+
+    Token counts are estimated once when a turn is added, so building the
+    request is a single pass over cached integers. Turns that no longer fit
+    are dropped oldest first; with a ``summarizer`` they are folded into a
+    running summary that is only regenerated when more turns fall off.
+    ``reserve`` tokens are held back for the system prompt and next question.
+    """
+
+    def __init__(self, budget=2048, summarizer=None, summary_budget=None, reserve=None):
+        self.budget = budget
+        self.reserve = reserve if reserve is not None else budget // 4
+        self.summarizer = summarizer
+        self.summary_budget = summary_budget if summary_budget is not None else budget // 4
+        self.turns = []  # (user, assistant, tokens)
+        self.summary = ""
+        self.summarized_turns = 0
+        self._lock = threading.Lock()
+
+    def _summary_tokens(self):
+        return estimate_tokens(self.summary) + MESSAGE_OVERHEAD if self.summary else 0
+
+    def add(self, user, assistant):
+        """Store a finished turn and evict whatever no longer fits the budget."""
+        tokens = estimate_tokens(user) + estimate_tokens(assistant) + 2 * MESSAGE_OVERHEAD
+        with self._lock:
+            self.turns.append((user, assistant, tokens))
+            dropped = self._evict()
+        if dropped and self.summarizer:
+            self._summarize(dropped)
+
+    def _evict(self):
+        limit = self.budget - self.reserve - self._summary_tokens()
+        total = sum(t for _, _, t in self.turns)
+        dropped = []
+        while self.turns and total > limit:
+            user, assistant, tokens = self.turns.pop(0)
+            dropped.append((user, assistant))
+            total -= tokens
+        return dropped
+
+    def _summarize(self, dropped):
+        try:
+            summary = self.summarizer(self.summary, dropped)
+        except Exception:
+            return  # keep the previous summary; history still stays bounded
+        if not summary:
+            return
+        max_chars = self.summary_budget * 4
+        with self._lock:
+            self.summary = summary.strip()[:max_chars]
+            self.summarized_turns += len(dropped)
+
+    def build(self, system_prompt, user):
+        """
+        Messages for the next request: system prompt (plus summary), as many
+        recent turns as fit the budget, then the new user message.
+        """
+        system = system_prompt
+        if self.summary:
+            system = f"{system_prompt}\nSummary of the earlier conversation:\n{self.summary}"
+        used = estimate_tokens(system) + estimate_tokens(user) + 2 * MESSAGE_OVERHEAD
+        with self._lock:
+            turns = list(self.turns)
+        picked = []
+        for turn in reversed(turns):
+            if used + turn[2] > self.budget:
+                break
+            used += turn[2]
+            picked.append(turn)
+        messages = [{"role": "system", "content": system}]
+        for user_text, assistant_text, _ in reversed(picked):
+            messages.append({"role": "user", "content": user_text})
+            messages.append({"role": "assistant", "content": assistant_text})
+        messages.append({"role": "user", "content": user})
+        return messages
+
+    def tokens(self):
+        with self._lock:
+            return sum(t for _, _, t in self.turns) + self._summary_tokens()
+
+    def clear(self):
+        with self._lock:
+            self.turns = []
+            self.summary = ""
+            self.summarized_turns = 0
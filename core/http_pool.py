@@ -0,0 +1,89 @@
+# core/http_pool.py
+
+import socket
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection pool settings shared by every provider session."""
+    pool_size: int = 10
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    keepalive: bool = True
+    keepalive_idle: int = 60  # seconds before the first TCP keep-alive probe
+
+    @property
+    def timeout(self):
+        """(connect, read) tuple in the form requests expects."""
+        return (self.connect_timeout, self.read_timeout)
+
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _socket_options(config):
+    """TCP options that keep idle pooled connections from being dropped."""
+    from urllib3.connection import HTTPConnection
+
+    options = list(HTTPConnection.default_socket_options)
+    if not config.keepalive:
+        return options
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Probe tuning is platform specific; only set what the OS exposes.
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, config.keepalive_idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, config.keepalive_idle // 4)))
+    return options
+
+
+def _make_session(config, headers=None):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    class _KeepAliveAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs["socket_options"] = _socket_options(config)
+            super().init_poolmanager(*args, **kwargs)
+
+    session = requests.Session()
+    adapter = _KeepAliveAdapter(pool_connections=config.pool_size, pool_maxsize=config.pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_session(provider, config=None, headers=None):
+    """
+    Return the long-lived pooled session for a provider, creating it on first use.
+
+    Args:
+        provider (str): Pool name, e.g. "groq" or "ollama".
+        config (PoolConfig): Pool settings used when the session is created.
+        headers (dict): Default headers applied to every request on the session.
+
+    Returns:
+        requests.Session: The shared session for this provider.
+    """
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = _make_session(config or PoolConfig(), headers)
+            _sessions[provider] = session
+        return session
+
+
+def close_sessions():
+    """Close every pooled session; they are recreated lazily on next use."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
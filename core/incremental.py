@@ -0,0 +1,152 @@
+# core/incremental.py
+
+import glob
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+HASH_CHUNK = 1024 * 1024
+
+
+def expand(patterns):
+    """
+    Files named by ``patterns``: globs are expanded (``**`` recurses),
+    directories contribute every file under them, and a plain path that
+    does not exist is kept so its absence is part of the fingerprint.
+    """
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    files.update(os.path.join(root, n) for n in names)
+            else:
+                files.add(match)
+    return sorted(os.path.normpath(f) for f in files)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Content hashes of each incremental spell step's inputs and outputs as of
+    its last successful run, stored as JSON. Files whose size and mtime are
+    unchanged since they were hashed are not read again.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _fingerprint(patterns, previous):
+        """{path: [size, mtime_ns, sha256]} with None for missing files."""
+        result = {}
+        for path in expand(patterns):
+            try:
+                st = os.stat(path)
+            except OSError:
+                result[path] = None
+                continue
+            old = previous.get(path)
+            if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                result[path] = old
+            else:
+                result[path] = [st.st_size, st.st_mtime_ns, file_hash(path)]
+        return result
+
+    @staticmethod
+    def _same(a, b):
+        """Equal content: same files with the same hashes (mtimes may differ)."""
+        if a.keys() != b.keys():
+            return False
+        return all((a[p] and a[p][2]) == (b[p] and b[p][2]) for p in a)
+
+    def is_fresh(self, key, command, inputs, outputs):
+        """True when the step ran successfully before and nothing it declared has changed."""
+        with self._lock:
+            entry = self._load().get(key)
+        if not entry or entry.get("command") != command:
+            return False
+        out_now = self._fingerprint(outputs, entry["outputs"])
+        if any(v is None for v in out_now.values()):
+            return False
+        return (self._same(self._fingerprint(inputs, entry["inputs"]), entry["inputs"])
+                and self._same(out_now, entry["outputs"]))
+
+    @staticmethod
+    def stamp(patterns):
+        """{path: [size, mtime_ns] or None} of the files named by ``patterns``, taken before a run."""
+        result = {}
+        for path in expand(patterns):
+            try:
+                st = os.stat(path)
+            except OSError:
+                result[path] = None
+                continue
+            result[path] = [st.st_size, st.st_mtime_ns]
+        return result
+
+    def record(self, key, command, inputs, outputs, before=None):
+        """
+        Store the state after a successful run. Returns False (and stores
+        nothing) when a declared output is missing or, given the ``stamp()``
+        taken before the run, was not rewritten by it: a failed build must
+        not leave an old output looking up to date.
+        """
+        with self._lock:
+            previous = self._load().get(key) or {"inputs": {}, "outputs": {}}
+        out_now = self._fingerprint(outputs, previous["outputs"])
+        if any(v is None for v in out_now.values()):
+            return False
+        if before is not None and any(before.get(p) == v[:2] for p, v in out_now.items()):
+            return False
+        entry = {"command": command, "inputs": self._fingerprint(inputs, previous["inputs"]), "outputs": out_now}
+        with self._lock:
+            self._load()[key] = entry
+            try:
+                self._save()
+            except OSError:
+                return False
+        return True
+
+    def forget(self, spell, step=None):
+        """Drop the entry for one step of ``spell``, or all of its steps."""
+        prefix = f"{spell}:"
+        with self._lock:
+            entries = self._load()
+            stale = [k for k in entries if k == f"{spell}:{step}" or (step is None and k.startswith(prefix))]
+            if not stale:
+                return
+            for key in stale:
+                del entries[key]
+            try:
+                self._save()
+            except OSError:
+                pass
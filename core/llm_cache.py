@@ -0,0 +1,165 @@
+# core/llm_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_messages(messages):
+    """Drop extra keys and surrounding whitespace so equivalent prompts hash alike."""
+    return [
+        {"role": m.get("role", ""), "content": (m.get("content") or "").replace("\r\n", "\n").strip()}
+        for m in messages
+    ]
+
+
+def make_key(provider, model, temperature, messages):
+    """Stable SHA-256 key for a chat request."""
+    blob = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "temperature": round(float(temperature), 4),
+            "messages": normalize_messages(messages),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM answers: a bounded in-memory LRU in front of a
+    directory of small JSON files. Entries expire after ``ttl`` seconds and
+    the oldest files are evicted once the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory, max_entries=256, ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._disk_bytes = None  # computed lazily on first write
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached answer or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            record = None
+        with self._lock:
+            if record is None or record.get("expires", 0) <= now:
+                self.misses += 1
+                return None
+            self._remember(key, record["expires"], record["value"])
+            self.hits += 1
+            self.disk_hits += 1
+            return record["value"]
+
+    def put(self, key, value):
+        """Store an answer in both tiers."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = json.dumps({"expires": expires_at, "value": value}, ensure_ascii=False)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return  # the disk tier is best effort
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._disk_bytes += len(data.encode("utf-8"))
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Yield (path, size, mtime) for every file in the disk tier."""
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            yield path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        """Drop expired files, then the oldest ones until under 90% of max_bytes."""
+        now = time.time()
+        files = sorted(self._scan(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for path, size, mtime in files:
+            if total <= target and mtime + self.ttl > now:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            for path, _, _ in list(self._scan()):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._disk_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            disk_files = list(self._scan())
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(disk_files),
+                "disk_bytes": sum(size for _, size, _ in disk_files),
+            }
@@ -0,0 +1,127 @@
+# core/llm_stream.py
+
+import json
+import time
+from collections import deque
+
+# Most recent streamed calls, newest last
+STREAM_HISTORY = deque(maxlen=100)
+
+
+class StreamStats:
+    """Timing for one streamed completion."""
+
+    def __init__(self, provider, model):
+        self.provider = provider
+        self.model = model
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.finished = None
+        self.chunks = 0
+        self.prompt_tokens = None
+        self.completion_tokens = None  # exact count when the provider reports usage
+        self.final = None  # provider's closing chunk (Ollama timing fields)
+
+    @property
+    def ttft(self):
+        """Seconds from request start to the first content token."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens(self):
+        return self.completion_tokens if self.completion_tokens is not None else self.chunks
+
+    @property
+    def tokens_per_sec(self):
+        """Generation rate measured after the first token arrives."""
+        if self.first_token_at is None or self.finished is None:
+            return None
+        elapsed = self.finished - self.first_token_at
+        if elapsed <= 0:
+            return None
+        return self.tokens / elapsed
+
+    def summary(self):
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "n/a"
+        rate = f"{self.tokens_per_sec:.1f} tok/s" if self.tokens_per_sec else "n/a"
+        return f"{self.provider}/{self.model}: ttft {ttft}, {self.tokens} tokens, {rate}"
+
+
+def _decode(raw):
+    return raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+
+def iter_sse_content(lines, stats=None):
+    """
+    Yield content deltas from an OpenAI-compatible (Groq) SSE stream.
+
+    Args:
+        lines: Iterable of raw lines, e.g. ``response.iter_lines()``.
+        stats (StreamStats): Receives the completion token count if reported.
+    """
+    for raw in lines:
+        line = _decode(raw).strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Groq: invalid stream chunk: {e}") from e
+        if "error" in chunk:
+            raise RuntimeError(f"Groq stream error: {chunk['error']}")
+        usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+        if stats is not None and usage:
+            stats.prompt_tokens = usage.get("prompt_tokens")
+            stats.completion_tokens = usage.get("completion_tokens")
+        for choice in chunk.get("choices", []):
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield content
+
+
+def iter_ndjson_content(lines, stats=None):
+    """
+    Yield content pieces from an Ollama NDJSON chat stream.
+
+    Args:
+        lines: Iterable of raw lines, one JSON object per line.
+        stats (StreamStats): Receives ``eval_count`` from the final chunk.
+    """
+    for raw in lines:
+        line = _decode(raw).strip()
+        if not line:
+            continue
+        try:
+            chunk = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Ollama: invalid stream chunk: {e}") from e
+        if "error" in chunk:
+            raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+        content = (chunk.get("message") or {}).get("content")
+        if content:
+            yield content
+        if chunk.get("done"):
+            if stats is not None:
+                stats.final = chunk
+                stats.prompt_tokens = chunk.get("prompt_eval_count")
+                if "eval_count" in chunk:
+                    stats.completion_tokens = chunk["eval_count"]
+            return
+
+
+def timed(tokens, stats):
+    """Pass tokens through while recording first-token and finish times."""
+    try:
+        for token in tokens:
+            if stats.first_token_at is None:
+                stats.first_token_at = time.perf_counter()
+            stats.chunks += 1
+            yield token
+    finally:
+        stats.finished = time.perf_counter()
+        STREAM_HISTORY.append(stats)
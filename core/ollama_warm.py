@@ -0,0 +1,84 @@
+# core/ollama_warm.py
+
+import threading
+import time
+from collections import deque
+
+NS = 1e9  # Ollama reports durations in nanoseconds
+
+# A call whose model load took longer than this is counted as a cold start
+COLD_LOAD_SECONDS = 0.5
+
+
+class WarmthStats:
+    """
+    Cold-start vs warm latency for local Ollama calls, taken from the timing
+    fields Ollama returns with every final response.
+    """
+
+    def __init__(self, maxlen=200):
+        self.calls = deque(maxlen=maxlen)
+        self.preload = None  # dict describing the startup preload, once done
+        self._lock = threading.Lock()
+
+    def record(self, model, wall, response):
+        """Store one call; ``response`` is Ollama's final JSON object."""
+        load = response.get("load_duration", 0) / NS
+        entry = {
+            "model": model,
+            "wall": wall,
+            "load": load,
+            "cold": load > COLD_LOAD_SECONDS,
+            "prompt_tokens": response.get("prompt_eval_count"),
+            "prompt_eval": response.get("prompt_eval_duration", 0) / NS,
+        }
+        with self._lock:
+            self.calls.append(entry)
+        return entry
+
+    def summary(self):
+        with self._lock:
+            calls = list(self.calls)
+        cold = [c["wall"] for c in calls if c["cold"]]
+        warm = [c["wall"] for c in calls if not c["cold"]]
+        prompt = [c["prompt_tokens"] for c in calls if c["prompt_tokens"] is not None]
+        return {
+            "cold_calls": len(cold),
+            "warm_calls": len(warm),
+            "cold_avg": sum(cold) / len(cold) if cold else None,
+            "warm_avg": sum(warm) / len(warm) if warm else None,
+            "last_prompt_tokens": prompt[-1] if prompt else None,
+            "preload": self.preload,
+        }
+
+
+def preload(session, url, model, keep_alive, timeout, stats=None):
+    """
+    Load ``model`` into Ollama's memory and pin it for ``keep_alive``.
+
+    An empty chat request makes Ollama load the model without generating.
+    Returns the wall time in seconds; raises on HTTP/connection errors.
+    """
+    start = time.perf_counter()
+    r = session.post(url, json={"model": model, "messages": [], "keep_alive": keep_alive}, timeout=timeout)
+    r.raise_for_status()
+    wall = time.perf_counter() - start
+    if stats is not None:
+        body = r.json() if r.content else {}
+        stats.preload = {"model": model, "ok": True, "wall": wall,
+                         "load": body.get("load_duration", 0) / NS}
+    return wall
+
+
+def start_preload(session_factory, url, model, keep_alive, timeout, stats):
+    """Preload in a daemon thread so startup is never blocked by the model load."""
+
+    def run():
+        try:
+            preload(session_factory(), url, model, keep_alive, timeout, stats)
+        except Exception as e:
+            stats.preload = {"model": model, "ok": False, "error": str(e)}
+
+    thread = threading.Thread(target=run, name="lucien-ollama-preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,86 @@
+# core/output_capture.py
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+
+
+class ThreadLocalStdout(io.TextIOBase):
+    """
+    Stand-in for sys.stdout that sends each thread's writes to that thread's
+    buffer while it is capturing, and everything else to the real stream.
+    Lets concurrently running command handlers keep using print().
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    @property
+    def encoding(self):
+        return getattr(self.target, "encoding", "utf-8")
+
+    def _stream(self):
+        return getattr(self._local, "buffer", None) or self.target
+
+    def write(self, text):
+        return self._stream().write(text)
+
+    def flush(self):
+        self._stream().flush()
+
+    def isatty(self):
+        return False
+
+    @contextmanager
+    def redirect(self, stream):
+        """Send this thread's output to ``stream`` for the block."""
+        previous = getattr(self._local, "buffer", None)
+        self._local.buffer = stream
+        try:
+            yield stream
+        finally:
+            self._local.buffer = previous
+
+    def capture(self):
+        """Collect this thread's output; yields the StringIO receiving it."""
+        return self.redirect(io.StringIO())
+
+    @contextmanager
+    def copy(self):
+        """Keep this thread's output going where it goes now and also collect it; yields the copy."""
+        buffer = io.StringIO()
+        with self.redirect(_Tee(self._stream(), buffer)):
+            yield buffer
+
+
+class _Tee(io.TextIOBase):
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+_install_lock = threading.Lock()
+
+
+def install():
+    """
+    The ThreadLocalStdout acting as sys.stdout, put over the current stream
+    on first use. It is never taken down again: users only capture or
+    redirect their own thread's output, so overlapping casts, scheduled runs
+    and daemon clients cannot restore a stream another one still relies on.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, ThreadLocalStdout):
+            sys.stdout = ThreadLocalStdout(sys.stdout)
+        return sys.stdout
@@ -0,0 +1,78 @@
+# core/plugins.py
+
+import importlib
+import json
+import sys
+
+
+class LazyCommand:
+    """
+    Placeholder handler for a plugin command. The first call imports the
+    plugin module, puts the real handler into the command table in its
+    place and runs it; later calls go straight to the real handler.
+    """
+
+    __slots__ = ("table", "name", "module", "attr")
+
+    def __init__(self, table, name, module, attr):
+        self.table = table
+        self.name = name
+        self.module = module
+        self.attr = attr
+
+    def load(self):
+        """Import the plugin and return the real handler (ImportError/AttributeError if missing)."""
+        handler = getattr(importlib.import_module(self.module), self.attr)
+        if self.table.get(self.name) is self:
+            self.table[self.name] = handler
+        return handler
+
+    def __call__(self, args):
+        try:
+            handler = self.load()
+        except (ImportError, AttributeError) as e:
+            print(f"❌ Command '{self.name}' is unavailable: could not load {self.module}.{self.attr} ({e})")
+            return None
+        return handler(args)
+
+    def __repr__(self):
+        return f"<LazyCommand {self.name!r} from {self.module}.{self.attr}>"
+
+
+def register(table, manifest):
+    """
+    Add the commands of ``manifest`` ({module: {command: function name}})
+    to ``table`` without importing anything. Commands that already exist
+    are left alone. Returns the number of commands added.
+    """
+    added = 0
+    for module, commands in manifest.items():
+        for name, attr in commands.items():
+            if name not in table:
+                table[name] = LazyCommand(table, name, module, attr)
+                added += 1
+    return added
+
+
+def read_manifest(path):
+    """
+    A plugin manifest from a JSON file, or {} when the file does not exist.
+    Raises ValueError when the file is not a {module: {command: function}} object.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: {e}") from e
+    if not isinstance(manifest, dict) or not all(
+            isinstance(commands, dict) and all(isinstance(v, str) for v in commands.values())
+            for commands in manifest.values()):
+        raise ValueError(f"{path}: expected {{\"module\": {{\"command name\": \"function\"}}}}")
+    return manifest
+
+
+def plugin_status(manifest):
+    """(module, imported yet, command names) for every module in ``manifest``."""
+    return [(module, module in sys.modules, list(commands)) for module, commands in manifest.items()]
@@ -0,0 +1,254 @@
+# core/profiler.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import subprocess
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+# Step fields measured for the whole process, not just the step's thread: CPU
+# comes from os.times() and LLM calls from telemetry, so AI questions of daemon
+# clients, scheduled spells and commit drafts running meanwhile count as well
+PROCESS_WIDE = ("cpu", "llm", "llm_calls")
+PROCESS_WIDE_NOTE = ("* CPU and LLM are process-wide: they include other threads "
+                     "(daemon clients, scheduled spells, commit drafts) running during the step")
+
+
+class StepProfile:
+    """Measurements for one spell step."""
+
+    __slots__ = ("number", "command", "wall", "cpu", "subprocess", "subprocesses",
+                 "llm", "llm_calls", "memory_peak", "skipped", "error")
+
+    def __init__(self, number, command):
+        self.number = number
+        self.command = command
+        self.wall = 0.0
+        self.cpu = 0.0          # this process plus reaped child processes (process-wide)
+        self.subprocess = 0.0   # wall time child processes were alive
+        self.subprocesses = 0
+        self.llm = 0.0          # provider call time reported by telemetry (process-wide)
+        self.llm_calls = 0      # process-wide as well
+        self.memory_peak = 0    # bytes allocated above the step's starting point
+        self.skipped = False
+        self.error = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class _SubprocessClock:
+    """
+    Swaps ``subprocess.Popen`` for a subclass that adds each child's
+    lifetime (start to reaped) to ``seconds``. ``subprocess.run`` and code
+    that looks up ``subprocess.Popen`` at call time are covered. Only
+    children started by the installing thread count: the hook is
+    process-wide, and the scheduler's or daemon's threads are not the step.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+        self._original = None
+        self._thread = None
+
+    def _add(self, seconds):
+        with self._lock:
+            self.seconds += seconds
+            self.count += 1
+
+    def install(self):
+        self._original = original = subprocess.Popen
+        self._thread = threading.get_ident()
+        clock = self
+
+        class TimedPopen(original):
+            def __init__(self, *args, **kwargs):
+                self._profile_start = time.perf_counter()
+                # Children of other threads are marked as already counted
+                self._profile_counted = threading.get_ident() != clock._thread
+                super().__init__(*args, **kwargs)
+
+            def _profile_reaped(self):
+                if self.returncode is not None and not self._profile_counted:
+                    self._profile_counted = True
+                    clock._add(time.perf_counter() - self._profile_start)
+
+            def wait(self, timeout=None):
+                try:
+                    return super().wait(timeout)
+                finally:
+                    self._profile_reaped()
+
+            def poll(self):
+                try:
+                    return super().poll()
+                finally:
+                    self._profile_reaped()
+
+        subprocess.Popen = TimedPopen
+
+    def uninstall(self):
+        if self._original is not None:
+            subprocess.Popen = self._original
+            self._original = None
+
+
+class SpellProfiler:
+    """
+    Runs spell steps one at a time and measures each: wall and CPU time,
+    time spent in child processes and in LLM calls (from ``telemetry``),
+    and peak traced memory. Subprocess time is the step thread's own; CPU
+    and LLM time are process-wide (see PROCESS_WIDE). With ``cprofile``
+    every step also runs under cProfile and the stats of the slowest step
+    are kept.
+
+    Use as a context manager around the steps; tracing and the subprocess
+    hook are process-wide while it is active.
+    """
+
+    def __init__(self, telemetry=None, cprofile=False):
+        self.telemetry = telemetry
+        self.cprofile = cprofile
+        self.steps = []
+        self.started = None
+        self.wall = 0.0
+        self._clock = _SubprocessClock()
+        self._owns_tracemalloc = False
+        self._slowest_stats = None
+        self._slowest_wall = -1.0
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._clock.install()
+        self.started = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._start
+        self._clock.uninstall()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        return False
+
+    def skip(self, number, command):
+        step = StepProfile(number, command)
+        step.skipped = True
+        self.steps.append(step)
+        return step
+
+    def run(self, number, command, fn):
+        """
+        Run ``fn()`` as step ``number`` and record its measurements.
+        Exceptions are stored on the step instead of propagating. A return
+        value of False marks the step as skipped (already up to date).
+        """
+        step = StepProfile(number, command)
+        profiler = cProfile.Profile() if self.cprofile else None
+        sub_seconds, sub_count = self._clock.seconds, self._clock.count
+        tracemalloc.reset_peak()
+        base_memory = tracemalloc.get_traced_memory()[0]
+        cpu = _cpu_seconds()
+        start = time.perf_counter()
+        llm_records = []
+        try:
+            if self.telemetry is not None:
+                with self.telemetry.collect() as llm_records:
+                    ran = self._call(fn, profiler)
+            else:
+                ran = self._call(fn, profiler)
+            step.skipped = ran is False
+        except Exception as e:
+            step.error = f"{type(e).__name__}: {e}"
+        step.wall = time.perf_counter() - start
+        step.cpu = _cpu_seconds() - cpu
+        step.memory_peak = max(0, tracemalloc.get_traced_memory()[1] - base_memory)
+        step.subprocess = self._clock.seconds - sub_seconds
+        step.subprocesses = self._clock.count - sub_count
+        step.llm = sum(r["seconds"] for r in llm_records)
+        step.llm_calls = len(llm_records)
+        if profiler is not None and step.wall > self._slowest_wall:
+            self._slowest_wall = step.wall
+            self._slowest_stats = (number, profiler)
+        self.steps.append(step)
+        return step
+
+    @staticmethod
+    def _call(fn, profiler):
+        if profiler is None:
+            return fn()
+        profiler.enable()
+        try:
+            return fn()
+        finally:
+            profiler.disable()
+
+    def ranked(self):
+        """Steps that ran, slowest first."""
+        return sorted((s for s in self.steps if not s.skipped), key=lambda s: s.wall, reverse=True)
+
+    def to_dict(self, spell):
+        return {"spell": spell, "started": self.started, "wall": self.wall,
+                "process_wide": list(PROCESS_WIDE),
+                "steps": [s.to_dict() for s in sorted(self.steps, key=lambda s: s.number)]}
+
+    def save(self, path, spell):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(spell), f, indent=2)
+        return path
+
+    def dump_slowest(self, path, limit=15):
+        """
+        Write the slowest step's cProfile stats to ``path`` (pstats format).
+        Returns (step number, top functions by cumulative time as text), or
+        None when cProfile was not enabled.
+        """
+        if self._slowest_stats is None:
+            return None
+        number, profiler = self._slowest_stats
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(limit)
+        return number, text.getvalue()
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+def format_table(steps, width=40):
+    """
+    Rows of a fixed-width table for StepProfile objects in the given order;
+    the starred columns are explained by PROCESS_WIDE_NOTE.
+    """
+    lines = [f"{'#':>3}  {'Wall':>8}  {'CPU*':>8}  {'Subproc':>8}  {'LLM*':>8}  {'Mem peak':>9}  Command"]
+    for s in steps:
+        command = s.command if len(s.command) <= width else s.command[:width - 3] + "..."
+        if s.error:
+            command += "  (failed)"
+        lines.append(f"{s.number:>3}  {s.wall:>7.3f}s  {s.cpu:>7.3f}s  {s.subprocess:>7.3f}s  "
+                     f"{s.llm:>7.3f}s  {format_bytes(s.memory_peak):>9}  {command}")
+    return lines
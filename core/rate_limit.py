@@ -0,0 +1,177 @@
+# core/rate_limit.py
+
+import random
+import re
+import threading
+import time
+
+# Status codes worth retrying: rate limited or a transient server failure
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value):
+    """
+    Parse Groq's reset headers ("2m59.56s", "7.66s", "120ms") or plain
+    seconds into a float. Returns None when the value is unusable.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(n) * scale[u] for n, u in parts)
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    seconds = parse_duration(value)
+    if seconds is not None:
+        return seconds
+    from email.utils import parsedate_to_datetime  # rarely needed; slow to import
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now if now is not None else time.time()))
+
+
+class TokenBucket:
+    """Refills ``rate_per_min`` units per minute up to ``capacity``."""
+
+    def __init__(self, rate_per_min, capacity=None, clock=time.monotonic):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_min)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1.0):
+        """
+        Take ``amount`` units and return how many seconds the caller must
+        wait before using them (0 if available now). Reservations may push
+        the bucket negative so concurrent callers queue up fairly.
+        """
+        now = self.clock()
+        self._refill(now)
+        amount = min(float(amount), self.capacity)
+        self.tokens -= amount
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def sync(self, remaining=None, reset_seconds=None):
+        """Align with the server's view from rate-limit response headers."""
+        now = self.clock()
+        self._refill(now)
+        if remaining is not None and remaining < self.tokens:
+            self.tokens = float(remaining)
+        if remaining is not None and remaining <= 0 and reset_seconds:
+            self.blocked_until = max(self.blocked_until, now + reset_seconds)
+
+    def block_for(self, seconds):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+class RequestScheduler:
+    """
+    Shared gate in front of a provider: paces requests with request and
+    token buckets, follows Retry-After and x-ratelimit-* headers, and
+    retries transient failures with jittered exponential backoff.
+
+    ``retry_exceptions`` may also be a function returning the exception
+    types, called on first use, so the HTTP client is not imported until a
+    request is actually sent.
+    """
+
+    def __init__(self, requests_per_min=30, tokens_per_min=6000, max_retries=4,
+                 base_delay=0.5, max_delay=30.0, retry_exceptions=(),
+                 sleep=time.sleep, rng=random.random, clock=time.monotonic):
+        self.requests = TokenBucket(requests_per_min, clock=clock)
+        self.tokens = TokenBucket(tokens_per_min, clock=clock)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._retry_exceptions = retry_exceptions if callable(retry_exceptions) else tuple(retry_exceptions)
+        self.sleep = sleep
+        self.rng = rng
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def retry_exceptions(self):
+        if callable(self._retry_exceptions):
+            self._retry_exceptions = tuple(self._retry_exceptions())
+        return self._retry_exceptions
+
+    def _acquire(self, tokens):
+        with self._lock:
+            wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            self.throttled_seconds += wait
+            self.sleep(wait)
+
+    def backoff(self, attempt):
+        """Full-jitter exponential delay for the given retry attempt."""
+        return self.rng() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def observe(self, headers):
+        """Update the buckets from Groq-style rate-limit headers."""
+        if not headers:
+            return
+        with self._lock:
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                try:
+                    remaining = float(remaining) if remaining is not None else None
+                except ValueError:
+                    remaining = None
+                bucket.sync(remaining, reset)
+
+    def submit(self, send, tokens=1):
+        """
+        Call ``send()`` once capacity is available and return its response.
+
+        ``send`` must return an object with ``status_code`` and ``headers``.
+        Retryable responses and exceptions are retried up to ``max_retries``
+        times; after that the last response is returned (or the exception
+        re-raised) for the caller to report.
+        """
+        attempt = 0
+        while True:
+            self._acquire(tokens)
+            try:
+                resp = send()
+            except self.retry_exceptions:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                self.observe(resp.headers)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                retry_after = parse_retry_after(resp.headers.get("retry-after"))
+                delay = max(self.backoff(attempt), retry_after or 0.0)
+                if retry_after:
+                    with self._lock:
+                        self.requests.block_for(retry_after)
+                close = getattr(resp, "close", None)
+                if close:
+                    close()
+            attempt += 1
+            self.retries += 1
+            self.throttled_seconds += delay
+            self.sleep(delay)
@@ -0,0 +1,134 @@
+# core/router.py
+
+
+class _Node:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None  # (name, handler) when a command ends at this word
+
+
+class CommandTrie:
+    """
+    Command names stored word by word. Matching a line walks one node per
+    word, so the cost depends on the length of the line, not on how many
+    commands are registered, and the longest registered prefix wins
+    ("ai batch x" finds "ai batch" even though "ai" exists).
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def insert(self, name, handler):
+        node = self._root
+        for word in name.split():
+            node = node.children.setdefault(word, _Node())
+        if node is self._root:
+            raise ValueError("command name must contain a word")
+        if node.entry is None:
+            self._count += 1
+        node.entry = (name, handler)
+
+    def remove(self, name):
+        """Forget ``name``; returns False if it was not registered."""
+        path = [self._root]
+        words = name.split()
+        for word in words:
+            node = path[-1].children.get(word)
+            if node is None:
+                return False
+            path.append(node)
+        if path[-1].entry is None or path[-1] is self._root:
+            return False
+        path[-1].entry = None
+        self._count -= 1
+        # Drop nodes that no longer lead to any command
+        for word, parent, node in zip(reversed(words), reversed(path[:-1]), reversed(path[1:])):
+            if node.children or node.entry is not None:
+                break
+            del parent.children[word]
+        return True
+
+    def match(self, line):
+        """
+        Longest registered command at the start of ``line``.
+
+        Returns:
+            tuple: (command name, handler, args) or None. ``args`` is the
+            rest of the line with its inner spacing kept.
+        """
+        node = self._root
+        best = depth = 0
+        for word in line.split():
+            node = node.children.get(word)
+            if node is None:
+                break
+            depth += 1
+            if node.entry is not None:
+                best = depth
+                entry = node.entry
+        if not best:
+            return None
+        rest = line.split(maxsplit=best)
+        return entry[0], entry[1], (rest[best].strip() if len(rest) > best else "")
+
+
+class CommandTable(dict):
+    """
+    The ``name -> handler`` registry as a plain dict (so existing code and
+    ``patch.dict`` keep working) that keeps a CommandTrie in step with its
+    keys for routing.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.trie = CommandTrie()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, name, handler):
+        self.trie.insert(name, handler)
+        super().__setitem__(name, handler)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.trie.remove(name)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        for name, handler in dict(*args, **kwargs).items():
+            self[name] = handler
+
+    def setdefault(self, name, handler=None):
+        if name not in self:
+            self[name] = handler
+        return self[name]
+
+    def pop(self, name, *default):
+        if name in self:
+            handler = self[name]
+            del self[name]
+            return handler
+        if default:
+            return default[0]
+        raise KeyError(name)
+
+    def popitem(self):
+        name, handler = super().popitem()
+        self.trie.remove(name)
+        return name, handler
+
+    def clear(self):
+        super().clear()
+        self.trie = CommandTrie()
+
+    def resolve(self, line):
+        """(command name, handler, args) for ``line``, or None."""
+        return self.trie.match(line)
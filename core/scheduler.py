@@ -0,0 +1,319 @@
+# core/scheduler.py
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+
+def _cron_field(text, low, high):
+    """
+    Values allowed by one cron field: "*", "5", "1-5", "*/15", "10-50/10",
+    "5/15" (5 to the field's maximum in steps of 15), "1,3,5".
+    """
+    values = set()
+    for part in text.split(","):
+        body, slash, step = part.partition("/")
+        step = int(step) if slash else 1
+        if body == "*":
+            start, end = low, high
+        elif "-" in body:
+            start, end = (int(v) for v in body.split("-", 1))
+        else:
+            start = int(body)
+            end = high if slash else start
+        if not (low <= start <= high and low <= end <= high) or start > end or step < 1:
+            raise ValueError(f"'{part}' is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Standard five-field cron expression (minute hour day month weekday,
+    Sunday = 0 or 7). As in cron, when both day and weekday are restricted
+    a time matches if either does.
+    """
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError("cron needs 5 fields: minute hour day month weekday")
+        self.expr = " ".join(fields)
+        parsed = {}
+        for text, (name, low, high) in zip(fields, CRON_FIELDS):
+            try:
+                parsed[name] = _cron_field(text, low, high)
+            except ValueError as e:
+                raise ValueError(f"invalid {name} field: {e}") from None
+        if 7 in parsed["weekday"]:
+            parsed["weekday"] = (parsed["weekday"] - {7}) | {0}
+        self.minutes, self.hours = parsed["minute"], parsed["hour"]
+        self.days, self.months, self.weekdays = parsed["day"], parsed["month"], parsed["weekday"]
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, timestamp):
+        """First matching minute strictly after ``timestamp`` (epoch seconds, local time)."""
+        dt = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+        raise ValueError(f"cron '{self.expr}' never matches")
+
+    def __str__(self):
+        return f"cron {self.expr}"
+
+
+class IntervalSchedule:
+    """Every N seconds, counted from when the job was added."""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, timestamp, previous=None):
+        if previous is None:
+            return timestamp + self.seconds
+        # Keep the original cadence; periods missed while busy are not made up
+        missed = max(0, int((timestamp - previous) // self.seconds))
+        return previous + (missed + 1) * self.seconds
+
+    def __str__(self):
+        for unit in ("d", "h", "m"):
+            if self.seconds % UNITS[unit] == 0:
+                return f"every {self.seconds // UNITS[unit]}{unit}"
+        return f"every {self.seconds}s"
+
+
+def parse_schedule(spec):
+    """
+    "every 30s" / "every 5m" / "every 2h" / "every 1d", or "cron <5 fields>".
+    Raises ValueError for anything else.
+    """
+    spec = spec.strip()
+    match = re.fullmatch(r"every\s+(\d+)\s*([smhd])", spec, re.IGNORECASE)
+    if match:
+        return IntervalSchedule(int(match.group(1)) * UNITS[match.group(2).lower()])
+    if spec.lower().startswith("cron "):
+        return CronSchedule(spec[5:])
+    raise ValueError("schedule must be 'every <N><s|m|h|d>' or 'cron <min> <hour> <day> <month> <weekday>'")
+
+
+class Job:
+    __slots__ = ("name", "spec", "schedule", "next_run", "running", "runs", "skipped")
+
+    def __init__(self, name, spec, now):
+        self.name = name
+        self.spec = spec
+        self.schedule = parse_schedule(spec)
+        self.next_run = self.schedule.next_after(now)
+        self.running = False
+        self.runs = 0
+        self.skipped = 0
+
+    def advance(self, now):
+        if isinstance(self.schedule, IntervalSchedule):
+            self.next_run = self.schedule.next_after(now, self.next_run)
+        else:
+            self.next_run = self.schedule.next_after(now)
+
+
+class RunRecord:
+    __slots__ = ("job", "started", "seconds", "outcome", "detail")
+
+    def __init__(self, job, started, seconds=0.0, outcome="ok", detail=""):
+        self.job = job
+        self.started = started
+        self.seconds = seconds
+        self.outcome = outcome  # ok, failed, error or skipped
+        self.detail = detail
+
+
+class Scheduler:
+    """
+    Runs named jobs on interval or cron schedules inside this process.
+
+    One timer thread wakes at the next due time and hands due jobs to a
+    worker pool. A job that is still running when it comes due again is
+    not started twice; the overlap is recorded as "skipped". The last
+    ``history_size`` runs are kept in memory.
+
+    ``run_job(name)`` does the work and returns (outcome, detail); an
+    exception counts as outcome "error". Job definitions are saved to
+    ``path`` so they survive restarts.
+    """
+
+    def __init__(self, path, run_job, max_workers=2, history_size=200, clock=time.time):
+        self.path = Path(path)
+        self.run_job = run_job
+        self.max_workers = max_workers
+        self.clock = clock
+        self.history = deque(maxlen=history_size)
+        self.jobs = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pool = None
+        self._thread = None
+        self._stopping = False
+
+    # --- job definitions ---
+
+    def load(self):
+        if self._loaded:
+            return self.jobs
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return self.jobs
+        now = self.clock()
+        for name, spec in saved.get("jobs", {}).items():
+            try:
+                self.jobs[name] = Job(name, spec, now)
+            except ValueError:
+                continue
+        return self.jobs
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": {name: job.spec for name, job in self.jobs.items()}}, f, indent=2)
+
+    def add(self, name, spec):
+        """Add or reschedule a job. Raises ValueError for a bad schedule."""
+        job = Job(name, spec, self.clock())
+        with self._wake:
+            self.load()
+            old = self.jobs.get(name)
+            if old is not None:
+                job.running, job.runs, job.skipped = old.running, old.runs, old.skipped
+            self.jobs[name] = job
+            self._save()
+            self._wake.notify()
+        return job
+
+    def remove(self, name):
+        with self._wake:
+            if self.load().pop(name, None) is None:
+                return False
+            self._save()
+            self._wake.notify()
+        return True
+
+    # --- running ---
+
+    def run_pending(self, now=None):
+        """Start every job that is due at ``now``; returns the names started."""
+        now = self.clock() if now is None else now
+        started = []
+        with self._wake:
+            for job in list(self.load().values()):
+                if job.next_run > now:
+                    continue
+                job.advance(now)
+                if job.running:
+                    job.skipped += 1
+                    self.history.append(RunRecord(job.name, now, outcome="skipped", detail="previous run still active"))
+                    continue
+                job.running = True
+                started.append(job.name)
+            pool = self._ensure_pool()
+        for name in started:
+            pool.submit(self._run, name, now)
+        return started
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="lucien-sched")
+        return self._pool
+
+    def _run(self, name, started):
+        start = time.perf_counter()
+        try:
+            outcome, detail = self.run_job(name)
+        except Exception as e:
+            outcome, detail = "error", f"{type(e).__name__}: {e}"
+        record = RunRecord(name, started, time.perf_counter() - start, outcome, detail)
+        with self._wake:
+            self.history.append(record)
+            job = self.jobs.get(name)
+            if job is not None:
+                job.running = False
+                job.runs += 1
+
+    def _loop(self):
+        with self._wake:
+            while not self._stopping:
+                jobs = self.load()
+                wait = min((job.next_run for job in jobs.values()), default=None)
+                timeout = None if wait is None else max(0.0, wait - self.clock())
+                if timeout is None or timeout > 0:
+                    self._wake.wait(timeout=timeout)
+                    continue
+                self._wake.release()
+                try:
+                    self.run_pending()
+                finally:
+                    self._wake.acquire()
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the timer thread; False if it is already running."""
+        with self._wake:
+            if self.active:
+                return False
+            self._stopping = False
+            self.load()
+            self._ensure_pool()
+            self._thread = threading.Thread(target=self._loop, name="lucien-scheduler", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self, wait=True):
+        """Stop scheduling new runs; with ``wait``, let running jobs finish."""
+        with self._wake:
+            if self._thread is None and self._pool is None:
+                return False
+            self._stopping = True
+            self._wake.notify()
+            thread, self._thread = self._thread, None
+            pool, self._pool = self._pool, None
+        if thread is not None:
+            thread.join()
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        return True
+
+    def recent(self, name=None, limit=20):
+        """Newest-first run records, optionally for one job."""
+        with self._lock:
+            records = [r for r in self.history if name is None or r.job == name]
+        return records[::-1][:limit]
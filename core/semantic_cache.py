@@ -0,0 +1,202 @@
+# core/semantic_cache.py
+#
+# Optional: needs NumPy. numpy is imported on first use so Lucien starts and
+# runs without it; callers check available() before enabling the cache.
+
+import re
+import threading
+import time
+import zlib
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+# Words that carry no meaning for "is this the same question?"
+STOPWORDS = frozenset(
+    "a an and are as at be can could do does for from how i in is it me my of on "
+    "or please should so that the this to was what whats when where which why "
+    "will with would you your".split()
+)
+
+# Phrasings of the same intent collapse to one token
+CANONICAL = {
+    "mean": "explain", "means": "explain", "meaning": "explain", "explanation": "explain",
+    "describe": "explain", "solve": "fix", "resolve": "fix", "repair": "fix",
+    "create": "make", "generate": "make", "write": "make",
+}
+
+# Words that flip or narrow a question's meaning while barely moving its
+# embedding ("sort ascending" vs "sort descending" scores above 0.8). Two
+# prompts only match when they contain the same ones; see _guard().
+NEGATIONS = frozenset("not no never without cannot none nor neither".split())
+CONTRAST_WORDS = frozenset(
+    # directions and opposites
+    "ascending descending asc desc increasing decreasing increase decrease up down "
+    "upper lower uppercase lowercase left right before after first last min max "
+    "minimum maximum largest smallest biggest highest lowest longest shortest oldest "
+    "newest latest add remove delete insert enable disable start stop open close "
+    "true false push pull encode decode encrypt decrypt import export read upload "
+    "download install uninstall include exclude show hide lock unlock sync async "
+    "horizontal vertical input output public private client server "
+    # programming languages
+    "python javascript js typescript ts java c cpp csharp go golang rust ruby php "
+    "perl bash powershell sql kotlin swift scala haskell lua r "
+    # natural languages
+    "english french spanish german italian portuguese dutch russian chinese "
+    "japanese korean arabic hindi".split()
+)
+NUMBER_WORDS = frozenset("zero one two three four five six seven eight nine ten hundred thousand".split())
+
+
+def available():
+    """True when NumPy can be imported."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _tokens(text):
+    return _WORD.findall(text.lower().replace("n't", " not"))
+
+
+def _guard(text):
+    """
+    What must agree exactly between two prompts on top of their similarity:
+    negations, numbers and contrast words (as a set), and "a to b" pairs
+    between content words, so "convert json to yaml" never answers
+    "convert yaml to json".
+    """
+    tokens = _tokens(text)
+    words = frozenset(t for t in tokens if t in NEGATIONS or t in CONTRAST_WORDS
+                      or t in NUMBER_WORDS or any(c.isdigit() for c in t))
+    pairs = frozenset((a, b) for a, to, b in zip(tokens, tokens[1:], tokens[2:])
+                      if to in ("to", "into") and a not in STOPWORDS and b not in STOPWORDS)
+    return words, pairs
+
+
+def _compatible(guard, other):
+    return guard[0] == other[0] and not any((b, a) in other[1] for a, b in guard[1])
+
+
+def _features(text):
+    words = [CANONICAL.get(w, w) for w in _tokens(text) if w not in STOPWORDS]
+    feats = list(words)
+    feats.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for w in words:
+        padded = f"<{w}>"
+        feats.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return feats
+
+
+class HashingVectorizer:
+    """
+    Stateless text embedding: words, word bigrams and character trigrams are
+    hashed (CRC32, stable across runs) into a fixed number of signed buckets
+    and L2-normalized, so cosine similarity is a dot product.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def transform(self, text):
+        import numpy as np
+
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feat in _features(text):
+            h = zlib.crc32(feat.encode("utf-8"))
+            vec[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = float(np.linalg.norm(vec))
+        if norm:
+            vec /= norm
+        return vec
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour answer cache over prompt embeddings.
+
+    Vectors live in one preallocated matrix so a lookup is a single
+    matrix-vector product. Entries are partitioned by ``namespace`` (the
+    provider, model and system prompt) so a reworded question only matches
+    answers produced the same way. A candidate above the threshold must also
+    agree on negations, numbers and contrast words (see _guard), which the
+    embedding alone cannot tell apart. When full, the least recently used
+    entry is overwritten.
+
+    The default threshold of 0.85 separates the paraphrase and
+    near-miss pairs in tests/test_semantic_cache.py.
+    """
+
+    def __init__(self, max_entries=10000, dim=256, threshold=0.85):
+        import numpy as np
+
+        self.vectorizer = HashingVectorizer(dim)
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._namespaces = np.zeros(max_entries, dtype=np.int64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._answers = [None] * max_entries
+        self._guards = [None] * max_entries
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _namespace_id(namespace):
+        return zlib.crc32(namespace.encode("utf-8"))
+
+    def __len__(self):
+        return self._size
+
+    def lookup(self, namespace, prompt):
+        """
+        Return (answer, similarity) for the closest cached prompt in the
+        namespace, or None when nothing reaches the threshold.
+        """
+        import numpy as np
+
+        query = self.vectorizer.transform(prompt)
+        guard = _guard(prompt)
+        ns = self._namespace_id(namespace)
+        with self._lock:
+            n = self._size
+            if n:
+                scores = self._vectors[:n] @ query
+                scores[self._namespaces[:n] != ns] = -1.0
+                candidates = np.flatnonzero(scores >= self.threshold)
+                for best in candidates[np.argsort(-scores[candidates])]:
+                    if _compatible(guard, self._guards[best]):
+                        self._last_used[best] = time.monotonic()
+                        self.hits += 1
+                        return self._answers[best], float(scores[best])
+            self.misses += 1
+            return None
+
+    def add(self, namespace, prompt, answer):
+        import numpy as np
+
+        vec = self.vectorizer.transform(prompt)
+        with self._lock:
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._vectors[slot] = vec
+            self._namespaces[slot] = self._namespace_id(namespace)
+            self._last_used[slot] = time.monotonic()
+            self._answers[slot] = answer
+            self._guards[slot] = _guard(prompt)
+
+    def clear(self):
+        with self._lock:
+            self._size = 0
+            self._answers = [None] * self.max_entries
+            self._guards = [None] * self.max_entries
+
+    def stats(self):
+        return {"entries": self._size, "capacity": self.max_entries,
+                "hits": self.hits, "misses": self.misses, "threshold": self.threshold}
@@ -0,0 +1,69 @@
+# core/speculation.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("lucien.speculate")
+
+
+class Speculator:
+    """
+    Runs work ahead of time in a background worker, keyed by the input it
+    was computed for. Only the latest key is kept: a newer ``start`` makes
+    the older result stale. ``claim`` hands the result over only when the
+    caller's key still matches, waiting for it if the job is still running.
+    """
+
+    def __init__(self, max_workers=1):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lucien-speculate")
+        self._lock = threading.Lock()
+        self._key = None
+        self._future = None
+        self.started = 0
+        self.used = 0
+        self.missed = 0  # a speculation existed but for different input
+        self.failed = 0
+
+    def start(self, key, fn):
+        """Begin computing ``fn()`` for ``key``. Returns False if already running for it."""
+        with self._lock:
+            if self._key == key and self._future is not None:
+                return False
+            if self._future is not None:
+                self._future.cancel()
+            self._key = key
+            self._future = self._pool.submit(fn)
+            self.started += 1
+            return True
+
+    def claim(self, key, timeout=None):
+        """
+        Result speculated for ``key``, or None when there is none, it was
+        computed for other input, or it failed. The speculation is consumed.
+        """
+        with self._lock:
+            future, spec_key = self._future, self._key
+            if future is None:
+                return None
+            self._future = self._key = None
+            if spec_key != key:
+                future.cancel()
+                self.missed += 1
+                return None
+        try:
+            result = future.result(timeout=timeout)
+        except Exception as e:  # includes timeout and cancellation
+            log.warning("speculative job failed: %s", e)
+            with self._lock:
+                self.failed += 1
+            return None
+        with self._lock:
+            self.used += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            pending = self._future is not None and not self._future.done()
+            return {"started": self.started, "used": self.used, "missed": self.missed,
+                    "failed": self.failed, "pending": pending}
@@ -0,0 +1,138 @@
+# core/spell_dag.py
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def parse_stages(spec, count):
+    """
+    Turn a stage spec like "1 2 | 3 | 4 5" into per-step dependencies: each
+    step waits for every step of the previous stage. Steps left out of the
+    spec run as a final stage.
+
+    Returns:
+        list: for each step, the 1-based step numbers it runs after.
+    """
+    stages = []
+    seen = set()
+    for part in spec.split("|"):
+        stage = []
+        for token in part.replace(",", " ").split():
+            step = int(token)
+            if not 1 <= step <= count:
+                raise ValueError(f"step {step} is out of range 1-{count}")
+            if step in seen:
+                raise ValueError(f"step {step} appears twice")
+            seen.add(step)
+            stage.append(step)
+        if stage:
+            stages.append(stage)
+    rest = [step for step in range(1, count + 1) if step not in seen]
+    if rest:
+        stages.append(rest)
+    after = [[] for _ in range(count)]
+    for previous, stage in zip(stages, stages[1:]):
+        for step in stage:
+            after[step - 1] = sorted(previous)
+    return after
+
+
+def check_dependencies(after):
+    """Raise ValueError for unknown step numbers or dependency cycles."""
+    count = len(after)
+    for index, deps in enumerate(after, 1):
+        for dep in deps:
+            if not 1 <= dep <= count or dep == index:
+                raise ValueError(f"step {index} depends on invalid step {dep}")
+    state = {}
+
+    def visit(step, path):
+        if state.get(step) == "done":
+            return
+        if state.get(step) == "visiting":
+            raise ValueError("dependency cycle: " + " -> ".join(map(str, path + [step])))
+        state[step] = "visiting"
+        for dep in after[step - 1]:
+            visit(dep, path + [step])
+        state[step] = "done"
+
+    for step in range(1, count + 1):
+        visit(step, [])
+
+
+def step_order(after):
+    """
+    Step numbers in an order that runs every step after its dependencies,
+    keeping the recorded order where the dependencies allow it.
+    """
+    check_dependencies(after)
+    order = []
+    done = set()
+    while len(order) < len(after):
+        for number in range(1, len(after) + 1):
+            if number not in done and all(dep in done for dep in after[number - 1]):
+                order.append(number)
+                done.add(number)
+                break
+    return order
+
+
+class StepResult:
+    __slots__ = ("number", "output", "seconds", "error", "skipped")
+
+    def __init__(self, number):
+        self.number = number
+        self.output = ""
+        self.seconds = 0.0
+        self.error = None
+        self.skipped = False
+
+
+def run_dag(count, after, run_step, max_workers=4):
+    """
+    Run steps 1..count, each as soon as the steps it depends on succeeded,
+    with at most ``max_workers`` at once. ``run_step(number)`` returns the
+    step's captured output. A failed step's dependents are skipped.
+
+    Yields StepResult objects in step order, each as soon as it and every
+    earlier step have finished, so output order does not depend on timing.
+    """
+    check_dependencies(after)
+    results = {n: StepResult(n) for n in range(1, count + 1)}
+    waiting = {n: set(after[n - 1]) for n in range(1, count + 1)}
+    dependents = {n: [] for n in range(1, count + 1)}
+    for n, deps in waiting.items():
+        for dep in deps:
+            dependents[dep].append(n)
+
+    def timed(number):
+        start = time.perf_counter()
+        try:
+            results[number].output = run_step(number)
+        except Exception as e:
+            results[number].error = e
+        results[number].seconds = time.perf_counter() - start
+        return number
+
+    finished = set()
+    next_to_yield = 1
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="lucien-spell") as pool:
+        running = {pool.submit(timed, n) for n, deps in waiting.items() if not deps}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            stack = [f.result() for f in done]
+            while stack:
+                number = stack.pop()
+                finished.add(number)
+                failed = results[number].error is not None or results[number].skipped
+                for child in dependents[number]:
+                    if failed and not results[child].skipped:
+                        results[child].skipped = True
+                        stack.append(child)
+                    elif not failed:
+                        waiting[child].discard(number)
+                        if not waiting[child] and not results[child].skipped:
+                            running.add(pool.submit(timed, child))
+            while next_to_yield in finished:
+                yield results[next_to_yield]
+                next_to_yield += 1
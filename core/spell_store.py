@@ -0,0 +1,158 @@
+# core/spell_store.py
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spells (
+    name        TEXT PRIMARY KEY,
+    data        TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    count       INTEGER NOT NULL DEFAULT 0,
+    created     TEXT NOT NULL DEFAULT '',
+    uses        INTEGER NOT NULL DEFAULT 0,
+    last_used   TEXT
+);
+CREATE TABLE IF NOT EXISTS spell_tags (
+    name TEXT NOT NULL REFERENCES spells(name) ON DELETE CASCADE,
+    tag  TEXT NOT NULL,
+    PRIMARY KEY (name, tag)
+);
+CREATE INDEX IF NOT EXISTS spell_tags_by_tag ON spell_tags(tag);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class SqliteSpellStore:
+    """
+    Spells in a SQLite database: one row per spell keyed by name, so
+    recording, casting or deleting one spell touches only its row. WAL mode
+    lets several Lucien processes read while one writes; writers wait on
+    ``busy_timeout`` instead of failing. Tags and usage counters live in
+    their own columns and table so they can be queried without parsing
+    every spell.
+    """
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = Path(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), timeout=self.busy_timeout)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self._local.db = db
+        return db
+
+    def journal_mode(self):
+        return self._connect().execute("PRAGMA journal_mode").fetchone()[0]
+
+    @staticmethod
+    def _row(name, spell):
+        return (name, json.dumps(spell, ensure_ascii=False), spell.get("description", ""),
+                spell.get("count", len(spell.get("commands", []))), spell.get("created", ""))
+
+    def get(self, name):
+        row = self._connect().execute("SELECT data FROM spells WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, db, name, spell):
+        db.execute(
+            "INSERT INTO spells (name, data, description, count, created) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET data = excluded.data, description = excluded.description, "
+            "count = excluded.count, created = excluded.created",
+            self._row(name, spell),
+        )
+        db.execute("DELETE FROM spell_tags WHERE name = ?", (name,))
+        db.executemany("INSERT OR IGNORE INTO spell_tags (name, tag) VALUES (?, ?)",
+                       [(name, tag) for tag in spell.get("tags", [])])
+
+    def put(self, name, spell):
+        """Insert or replace one spell, keeping its usage counters."""
+        with self._connect() as db:
+            self._put(db, name, spell)
+
+    def add(self, name, spell):
+        """Insert a new spell; False if the name is already taken (even by another process)."""
+        try:
+            with self._connect() as db:
+                db.execute("INSERT INTO spells (name, data, description, count, created) VALUES (?, ?, ?, ?, ?)",
+                           self._row(name, spell))
+                db.executemany("INSERT OR IGNORE INTO spell_tags (name, tag) VALUES (?, ?)",
+                               [(name, tag) for tag in spell.get("tags", [])])
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def delete(self, name):
+        with self._connect() as db:
+            return db.execute("DELETE FROM spells WHERE name = ?", (name,)).rowcount > 0
+
+    def exists(self, name):
+        return self._connect().execute("SELECT 1 FROM spells WHERE name = ?", (name,)).fetchone() is not None
+
+    def record_use(self, name):
+        with self._connect() as db:
+            db.execute("UPDATE spells SET uses = uses + 1, last_used = ? WHERE name = ?",
+                       (datetime.now().isoformat(), name))
+
+    def summaries(self, tag=None):
+        """(name, description, count, created, uses, tags) rows by name, optionally for one tag."""
+        db = self._connect()
+        if tag:
+            rows = db.execute(
+                "SELECT s.name, s.description, s.count, s.created, s.uses FROM spells s "
+                "JOIN spell_tags t ON t.name = s.name WHERE t.tag = ? ORDER BY s.name", (tag,)).fetchall()
+        else:
+            rows = db.execute("SELECT name, description, count, created, uses FROM spells ORDER BY name").fetchall()
+        tags = {}
+        for name, t in db.execute("SELECT name, tag FROM spell_tags ORDER BY tag"):
+            tags.setdefault(name, []).append(t)
+        return [row + (tags.get(row[0], []),) for row in rows]
+
+    def load_all(self):
+        return {name: json.loads(data) for name, data in
+                self._connect().execute("SELECT name, data FROM spells ORDER BY name")}
+
+    def replace_all(self, spells):
+        """
+        Make the store hold exactly ``spells`` in one transaction, writing
+        only rows that changed.
+        """
+        with self._connect() as db:
+            current = dict(db.execute("SELECT name, data FROM spells"))
+            for name in current.keys() - spells.keys():
+                db.execute("DELETE FROM spells WHERE name = ?", (name,))
+            for name, spell in spells.items():
+                if current.get(name) != json.dumps(spell, ensure_ascii=False):
+                    self._put(db, name, spell)
+
+    def migrate_json(self, json_path):
+        """
+        Import spells from the JSON file once. Returns the number imported,
+        or None when the file was already migrated or does not exist.
+        """
+        json_path = Path(json_path)
+        db = self._connect()
+        key = f"migrated:{json_path.resolve()}"
+        if not json_path.exists() or db.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+            return None
+        with open(json_path, "r", encoding="utf-8") as f:
+            spells = json.load(f)
+        with db:
+            db.executemany("INSERT OR IGNORE INTO spells (name, data, description, count, created) "
+                           "VALUES (?, ?, ?, ?, ?)", [self._row(n, s) for n, s in spells.items()])
+            db.executemany("INSERT OR IGNORE INTO spell_tags (name, tag) VALUES (?, ?)",
+                           [(n, t) for n, s in spells.items() for t in s.get("tags", [])])
+            db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", (key, datetime.now().isoformat()))
+        return len(spells)
@@ -0,0 +1,103 @@
+# core/startup.py
+
+import ast
+import os
+import subprocess
+import sys
+
+# Prints the import wall time and the loaded module names on the last stdout line
+_SNIPPET = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print()\n"
+    "print(repr((time.perf_counter() - start, sorted(sys.modules))))\n"
+)
+
+
+class ImportEntry:
+    """One line of ``python -X importtime`` output."""
+
+    __slots__ = ("name", "self_us", "cumulative_us", "depth")
+
+    def __init__(self, name, self_us, cumulative_us, depth):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+
+class StartupReport:
+    __slots__ = ("seconds", "modules", "entries")
+
+    def __init__(self, seconds, modules, entries):
+        self.seconds = seconds
+        self.modules = modules
+        self.entries = entries
+
+
+def parse_importtime(text):
+    """ImportEntry objects, in output order (children before their parent)."""
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        field = parts[2]
+        depth = (len(field) - len(field.lstrip(" ")) - 1) // 2
+        entries.append(ImportEntry(field.strip(), int(parts[0]), int(parts[1]), depth))
+    return entries
+
+
+def measure_import(module, importtime=False, cwd=None, path=None, python=None, timeout=120):
+    """
+    Import ``module`` in a fresh interpreter and report how long it took and
+    which modules it loaded. With ``importtime`` the per-module breakdown
+    from ``-X importtime`` is included (it adds some overhead to the total).
+    ``path`` is prepended to PYTHONPATH so the module can be found.
+    """
+    cmd = [python or sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _SNIPPET.format(module=module)]
+    env = dict(os.environ)
+    if path:
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(path), env.get("PYTHONPATH")]))
+    result = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        error = result.stderr.strip().splitlines()[-1:] or [f"exit code {result.returncode}"]
+        raise RuntimeError(f"importing {module} failed: {error[0]}")
+    seconds, modules = ast.literal_eval(lines[-1])
+    return StartupReport(seconds, modules, parse_importtime(result.stderr) if importtime else [])
+
+
+def direct_imports(entries, module):
+    """Entries imported directly by ``module`` (one level below it)."""
+    for index, entry in enumerate(entries):
+        if entry.name == module:
+            children = []
+            for child in reversed(entries[:index]):
+                if child.depth <= entry.depth:
+                    break
+                if child.depth == entry.depth + 1:
+                    children.append(child)
+            return entry, children
+    return None, []
+
+
+def format_breakdown(entries, module, limit=15):
+    """Report lines: the module's own time, its slowest direct imports and slowest modules overall."""
+    top, children = direct_imports(entries, module)
+    if top is None:
+        return [f"{module} does not appear in the import trace"]
+    lines = [f"{module}: {top.cumulative_us / 1000:.1f} ms total, {top.self_us / 1000:.1f} ms in its own body",
+             "Slowest direct imports (cumulative ms):"]
+    for entry in sorted(children, key=lambda e: e.cumulative_us, reverse=True)[:limit]:
+        lines.append(f"  {entry.cumulative_us / 1000:8.1f}  {entry.name}")
+    lines.append("Slowest modules by own time (ms):")
+    for entry in sorted(entries, key=lambda e: e.self_us, reverse=True)[:limit]:
+        lines.append(f"  {entry.self_us / 1000:8.1f}  {entry.name}")
+    return lines
@@ -0,0 +1,176 @@
+# core/telemetry.py
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """
+    Log-scale bucketed histogram: constant memory no matter how many calls
+    are recorded, with percentiles accurate to about 5%.
+    """
+
+    GROWTH = 1.05
+    MIN_SECONDS = 0.001
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, seconds):
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        return int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+
+    def add(self, seconds):
+        index = self._bucket(seconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in seconds."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.max, self.MIN_SECONDS * self.GROWTH ** index)
+        return self.max
+
+
+class _Series:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.ok_seconds = 0.0
+        self.first = None
+        self.last = None
+
+
+class Telemetry:
+    """
+    Per-call metrics for provider requests, aggregated per (provider, model)
+    and optionally appended to a JSONL file.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._series = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, provider, model, stream=False):
+        """
+        Time one provider call. The yielded dict can be filled in with
+        ``bytes_sent``, ``bytes_received``, ``prompt_tokens``,
+        ``completion_tokens`` and ``status``; the outcome is derived from
+        how the block exits.
+        """
+        record = {"provider": provider, "model": model, "stream": stream,
+                  "bytes_sent": 0, "bytes_received": 0,
+                  "prompt_tokens": None, "completion_tokens": None, "status": None}
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield record
+        except GeneratorExit:
+            outcome = "cancelled"
+            raise
+        except BaseException as e:
+            outcome = f"http_{record['status']}" if record["status"] and record["status"] >= 400 else type(e).__name__
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["outcome"] = outcome
+            record["ts"] = time.time()
+            self.add(record)
+
+    def add(self, record):
+        key = (record["provider"], record["model"])
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.calls += 1
+            series.latency.add(record["seconds"])
+            series.bytes_sent += record.get("bytes_sent") or 0
+            series.bytes_received += record.get("bytes_received") or 0
+            if record["outcome"] == "ok":
+                series.ok_seconds += record["seconds"]
+                series.prompt_tokens += record.get("prompt_tokens") or 0
+                series.completion_tokens += record.get("completion_tokens") or 0
+            elif record["outcome"] != "cancelled":
+                series.errors += 1
+            series.first = series.first or record["ts"]
+            series.last = record["ts"]
+            for records in self._collectors:
+                records.append(record)
+        if self.path:
+            self._append(record)
+
+    @contextmanager
+    def collect(self):
+        """
+        Yield a list that receives every call record added during the block,
+        from any thread.
+        """
+        records = []
+        with self._lock:
+            self._collectors.append(records)
+        try:
+            yield records
+        finally:
+            with self._lock:
+                self._collectors.remove(records)
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+    def summary(self):
+        """List of per-(provider, model) dicts, busiest first."""
+        rows = []
+        with self._lock:
+            items = list(self._series.items())
+            for (provider, model), s in items:
+                span = (s.last - s.first) if s.first and s.last else 0
+                rows.append({
+                    "provider": provider,
+                    "model": model,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "p50": s.latency.percentile(50),
+                    "p95": s.latency.percentile(95),
+                    "p99": s.latency.percentile(99),
+                    "mean": s.latency.total / s.latency.count if s.latency.count else None,
+                    "tokens_per_sec": s.completion_tokens / s.ok_seconds if s.ok_seconds else None,
+                    "calls_per_min": s.calls / (span / 60) if span > 0 else None,
+                    "bytes_sent": s.bytes_sent,
+                    "bytes_received": s.bytes_received,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                })
+        return sorted(rows, key=lambda r: r["calls"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
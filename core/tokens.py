@@ -0,0 +1,19 @@
+# core/tokens.py
+
+# Rough per-message overhead added by chat templates (role markers etc.)
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate for English text and code: about four characters
+    per token. Good enough for budgeting, not for billing.
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+def estimate_messages_tokens(messages):
+    """Estimated prompt tokens for a chat message list."""
+    return sum(estimate_tokens(m.get("content") or "") + MESSAGE_OVERHEAD for m in messages)
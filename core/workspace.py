@@ -0,0 +1,127 @@
+# core/workspace.py
+
+import glob
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.git_stream import LOG_FORMAT, git_records, parse_log, parse_status_v2
+
+
+class Workspace:
+    """
+    A saved list of repository paths or glob patterns ("~/src/*") that
+    workspace commands run across. Patterns are stored as typed and
+    expanded on every use, so new checkouts are picked up automatically.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.patterns = []
+        self._loaded = False
+
+    def load(self):
+        if not self._loaded:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.patterns = json.load(f).get("repos", [])
+            except (OSError, json.JSONDecodeError, AttributeError):
+                self.patterns = []
+            self._loaded = True
+        return self.patterns
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"repos": self.patterns}, f, indent=2)
+
+    def add(self, pattern):
+        patterns = self.load()
+        if pattern in patterns:
+            return False
+        patterns.append(pattern)
+        self.save()
+        return True
+
+    def remove(self, pattern):
+        patterns = self.load()
+        if pattern not in patterns:
+            return False
+        patterns.remove(pattern)
+        self.save()
+        return True
+
+    def repos(self):
+        """Git checkouts matched by the patterns, deduplicated, in pattern order."""
+        seen = set()
+        repos = []
+        for pattern in self.load():
+            expanded = os.path.expanduser(pattern)
+            for match in sorted(glob.glob(expanded, recursive=True)) if glob.has_magic(expanded) else [expanded]:
+                path = os.path.abspath(match)
+                if path not in seen and os.path.exists(os.path.join(path, ".git")):
+                    seen.add(path)
+                    repos.append(path)
+        return repos
+
+
+class RepoResult:
+    """Outcome of one workspace operation on one repository."""
+
+    __slots__ = ("repo", "lines", "seconds", "error")
+
+    def __init__(self, repo, lines=None, seconds=0.0, error=None):
+        self.repo = repo
+        self.lines = lines or []
+        self.seconds = seconds
+        self.error = error
+
+
+def run_across(repos, operation, max_workers=8):
+    """
+    Run ``operation(repo) -> list of lines`` on every repo in a bounded
+    thread pool. Results are yielded in ``repos`` order as soon as each one
+    and all before it are done; failures are captured per repo.
+    """
+    def timed(repo):
+        start = time.perf_counter()
+        try:
+            lines = operation(repo)
+        except subprocess.CalledProcessError as e:
+            stderr = (e.stderr or "").strip()
+            error = stderr.splitlines()[0] if stderr else f"git exited with {e.returncode}"
+            return RepoResult(repo, seconds=time.perf_counter() - start, error=error)
+        except (OSError, ValueError) as e:
+            return RepoResult(repo, seconds=time.perf_counter() - start, error=str(e))
+        return RepoResult(repo, lines, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="lucien-ws") as pool:
+        yield from pool.map(timed, repos)
+
+
+def repo_status(repo, limit=20):
+    """Short status lines for ``repo``, at most ``limit`` plus a count of the rest."""
+    lines = []
+    total = 0
+    for entry in parse_status_v2(git_records(["-C", repo, "status", "--porcelain=v2", "-z"])):
+        total += 1
+        if total <= limit:
+            lines.append(str(entry))
+    if total > limit:
+        lines.append(f"... and {total - limit} more")
+    return lines
+
+
+def repo_log(repo, count=3):
+    args = ["-C", repo, "log", "-z", f"--format={LOG_FORMAT}", "--date=short", f"-n{count}"]
+    return [f"{c['hash']} {c.get('subject', '')} ({c.get('date', '')})" for c in parse_log(git_records(args))]
+
+
+def repo_pull(repo):
+    # Parallel pulls cannot share a terminal, so credential prompts fail instead of hanging
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    result = subprocess.run(["git", "-C", repo, "pull"], capture_output=True, text=True, check=True, env=env)
+    return [line for line in result.stdout.strip().splitlines()[-1:] if line]
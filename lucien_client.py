@@ -0,0 +1,69 @@
+# lucien_client.py
+"""
+Thin client for a running Lucien daemon (python Lucien.py --daemon): sends
+command lines over the daemon's Unix socket and prints the output as it
+arrives, without loading Lucien itself.
+
+    python lucien_client.py <command line>     run one command
+    python lucien_client.py < script.txt       run each line as a command
+    python lucien_client.py --ping | --stop    check or stop the daemon
+
+LUCIEN_SOCKET picks the socket (default $XDG_RUNTIME_DIR/lucien.sock, else
+lucien-<uid>/lucien.sock in the temp directory). Commands run in the
+daemon's working directory, so the daemon refuses clients started anywhere
+else. Invocations from the same shell share a session, so "record spell" in
+one and "stop recording" in a later one work as in the REPL; set
+LUCIEN_SESSION to choose the session explicitly.
+"""
+
+import os
+import sys
+
+from core.daemon import default_socket_path, ping, run_lines, stop
+
+
+def main(argv):
+    path = os.getenv("LUCIEN_SOCKET") or default_socket_path()
+    if argv in (["--ping"], ["--stop"]):
+        pid = ping(path)
+        if pid is None:
+            print(f"❌ No Lucien daemon is listening on {path}", file=sys.stderr)
+            return 1
+        if argv == ["--stop"]:
+            stop(path)
+            print(f"[OK] Stopped the Lucien daemon (pid {pid}).")
+        else:
+            print(f"[OK] Lucien daemon running (pid {pid}) on {path}.")
+        return 0
+
+    stdin = (line.rstrip("\n") for line in sys.stdin)
+
+    def read_input(prompt):
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        try:
+            return next(stdin)
+        except StopIteration:
+            raise EOFError from None
+
+    lines = [" ".join(argv)] if argv else (line.strip() for line in stdin)
+    session = os.getenv("LUCIEN_SESSION") or f"ppid-{os.getppid()}"
+    try:
+        run_lines(path, (line for line in lines if line), session, sys.stdout, read_input, os.getcwd())
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No Lucien daemon is listening on {path} (start one with python Lucien.py --daemon)",
+              file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"❌ Lost the Lucien daemon on {path}: {e}", file=sys.stderr)
+        return 1
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
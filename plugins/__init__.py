@@ -0,0 +1,33 @@
+# plugins/__init__.py
+"""
+Built-in command plugins. Each module is imported the first time one of
+its commands runs, so optional dependencies (psutil, webbrowser, ...) do
+not slow down startup.
+
+MANIFEST maps module -> {command name: handler function name}. Extra
+plugins can be listed in the same shape in LUCIEN_PLUGINS_FILE.
+"""
+
+MANIFEST = {
+    "plugins.files": {
+        "list files": "cmd_list_files",
+        "read file": "cmd_read_file",
+        "write file": "cmd_write_file",
+        "delete file": "cmd_delete_file",
+    },
+    "plugins.system": {
+        "disk space": "cmd_disk_space",
+        "cpu usage": "cmd_cpu_usage",
+        "run shell": "cmd_run_shell",
+        "generate password": "cmd_generate_password",
+        "open url": "cmd_open_url",
+        "open file": "cmd_open_file",
+    },
+    "plugins.code_runner": {
+        "run python": "cmd_run_python",
+    },
+}
+
+# Commands that read from input(). Spells never run them on a worker thread,
+# where the prompt would be captured and the step would wait forever.
+INTERACTIVE = frozenset({"write file", "delete file", "run python"})
@@ -0,0 +1,11 @@
+# plugins/code_runner.py
+
+from core.code_execution import run_python_code
+
+
+def cmd_run_python(args: str) -> None:
+    """Execute Python code interactively"""
+    print("Enter Python code. Blank line to execute.")
+    code = "\n".join(iter(input, ""))
+    out = run_python_code(code)
+    print(out["stdout"], out["stderr"])
@@ -0,0 +1,35 @@
+# plugins/files.py
+
+from core.file_ops import delete_file, list_files, read_file, write_file
+
+
+def cmd_list_files(args: str) -> None:
+    """List files in directory: list files [path]"""
+    path = args.strip() if args.strip() else "."
+    print(list_files(path))
+
+def cmd_read_file(args: str) -> None:
+    """Read file contents: read file <path>"""
+    if not args.strip():
+        print("Usage: read file <path>")
+        return
+    print(read_file(args.strip()))
+
+def cmd_write_file(args: str) -> None:
+    """Write content to file: write file <path>"""
+    if not args.strip():
+        print("Usage: write file <path>")
+        return
+    print("Enter text. Empty line to finish.")
+    text = "\n".join(iter(input, ""))
+    print(write_file(args.strip(), text))
+
+def cmd_delete_file(args: str) -> None:
+    """Delete a file: delete file <path>"""
+    if not args.strip():
+        print("Usage: delete file <path>")
+        return
+    if input(f"Delete {args.strip()}? (y/n): ").lower() == "y":
+        print(delete_file(args.strip()))
+    else:
+        print("Cancelled.")
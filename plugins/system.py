@@ -0,0 +1,41 @@
+# plugins/system.py
+
+from core.system_extended import cpu_usage, disk_space, open_file_in_vscode, open_url, rand_pass, shell
+
+
+def cmd_disk_space(args: str) -> None:
+    """Show disk space usage"""
+    print(disk_space())
+
+def cmd_cpu_usage(args: str) -> None:
+    """Show CPU usage"""
+    print(cpu_usage())
+
+def cmd_run_shell(args: str) -> None:
+    """Run shell command: run shell <command>"""
+    if not args.strip():
+        print("Usage: run shell <command>")
+        return
+    print(shell(args.strip()))
+
+def cmd_generate_password(args: str) -> None:
+    """Generate random password: generate password [length]"""
+    try:
+        length = int(args.strip()) if args.strip() else 16
+        print(rand_pass(length))
+    except ValueError:
+        print("Usage: generate password [length] (length must be a number)")
+
+def cmd_open_url(args: str) -> None:
+    """Open URL in browser: open url <url>"""
+    if not args.strip():
+        print("Usage: open url <url>")
+        return
+    print(open_url(args.strip()))
+
+def cmd_open_file(args: str) -> None:
+    """Open file in VS Code: open file <path>"""
+    if not args.strip():
+        print("Usage: open file <path>")
+        return
+    print(open_file_in_vscode(args.strip()))
@@ -0,0 +1,58 @@
+# tests/conftest.py
+import pytest
+
+import Lucien
+from core.commit_cache import CommitMessageCache
+from core.history import ConversationHistory
+from core.incremental import Manifest
+from core.llm_cache import ResponseCache
+from core.scheduler import Scheduler
+from core.speculation import Speculator
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_cache(tmp_path, monkeypatch):
+    """Give every test an empty response cache so mocked answers never leak between runs."""
+    cache = ResponseCache(tmp_path / "llm-cache")
+    monkeypatch.setattr(Lucien, "LLM_CACHE", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_conversation(monkeypatch):
+    """Start every test without conversation history from earlier tests."""
+    history = ConversationHistory()
+    monkeypatch.setattr(Lucien, "CONVERSATION", history)
+    return history
+
+
+@pytest.fixture(autouse=True)
+def isolated_commit_cache(tmp_path, monkeypatch):
+    """Keep generated commit messages out of the working tree's .lucien directory."""
+    cache = CommitMessageCache(tmp_path / "commit_cache.json")
+    monkeypatch.setattr(Lucien, "COMMIT_CACHE", cache)
+    monkeypatch.setattr(Lucien, "COMMIT_SPECULATOR", Speculator())
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_spell_manifest(tmp_path, monkeypatch):
+    """Incremental spell state from one test must not make another skip steps."""
+    manifest = Manifest(tmp_path / "spell_manifest.json")
+    monkeypatch.setattr(Lucien, "SPELL_MANIFEST", manifest)
+    return manifest
+
+
+@pytest.fixture(autouse=True)
+def isolated_scheduler(tmp_path, monkeypatch):
+    """Schedules added by a test are saved under tmp_path and never keep running."""
+    scheduler = Scheduler(tmp_path / "schedules.json", Lucien._run_scheduled_spell)
+    monkeypatch.setattr(Lucien, "SCHEDULER", scheduler)
+    yield scheduler
+    scheduler.stop(wait=True)
+
+
+@pytest.fixture(autouse=True)
+def isolated_spells_file(tmp_path, monkeypatch):
+    """Spells saved by a test go to tmp_path, not the working tree's .lucien directory."""
+    monkeypatch.setattr(Lucien, "SPELLS_FILE", tmp_path / ".lucien" / "spells.json")
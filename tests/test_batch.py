@@ -0,0 +1,73 @@
+# tests/test_batch.py
+import json
+import random
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.batch import read_prompts, run_batch
+
+
+def test_read_prompts_text_and_jsonl(tmp_path):
+    text = tmp_path / "prompts.txt"
+    text.write_text("first\n\n second \n", encoding="utf-8")
+    assert read_prompts(text) == [{"prompt": "first"}, {"prompt": "second"}]
+
+    jsonl = tmp_path / "prompts.jsonl"
+    jsonl.write_text('{"id": "a", "prompt": "one"}\n"two"\n', encoding="utf-8")
+    assert read_prompts(jsonl) == [{"id": "a", "prompt": "one"}, {"prompt": "two"}]
+
+
+def test_read_prompts_rejects_missing_prompt(tmp_path):
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text('{"id": 1}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="line 1"):
+        read_prompts(bad)
+
+
+def test_run_batch_preserves_order_and_limits_concurrency(tmp_path):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def call(prompt):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(random.uniform(0, 0.01))
+        with lock:
+            active -= 1
+        if prompt == "p3":
+            raise RuntimeError("boom")
+        return prompt.upper()
+
+    prompts = [{"prompt": f"p{i}"} for i in range(12)]
+    out = tmp_path / "out.jsonl"
+    report = run_batch(prompts, call, concurrency=3, out_path=out)
+
+    assert peak <= 3
+    assert report["failed"] == 1
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["index"] for r in rows] == list(range(12))
+    assert rows[0]["output"] == "P0"
+    assert rows[3]["error"] == "boom"
+
+
+def test_ai_batch_command(tmp_path):
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("alpha\nbeta\n", encoding="utf-8")
+    out = tmp_path / "answers.jsonl"
+    with patch("Lucien.chat_ollama", side_effect=lambda messages, **kw: messages[-1]["content"] * 2) as mock_ollama, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch(f"ai batch {prompts} --provider ollama --concurrency 2 --out {out}")
+    assert mock_ollama.call_count == 2
+    # Every call reuses the standard system prompt
+    assert mock_ollama.call_args.args[0][0]["content"] == Lucien.system_prompt
+    assert "2/2 prompts" in fake_out.getvalue()
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["output"] for r in rows] == ["alphaalpha", "betabeta"]
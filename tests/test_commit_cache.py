@@ -0,0 +1,62 @@
+# tests/test_commit_cache.py
+import shutil
+import subprocess
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.commit_cache import CommitMessageCache, staged_tree
+
+
+def test_get_put_roundtrip_persists(tmp_path):
+    path = tmp_path / "commits.json"
+    cache = CommitMessageCache(path)
+    assert cache.get("abc", "groq", "m") is None
+    cache.put("abc", "groq", "m", "feat: x")
+    assert cache.get("abc", "groq", "m") == "feat: x"
+    assert cache.get("abc", "ollama", "m") is None
+    assert CommitMessageCache(path).get("abc", "groq", "m") == "feat: x"
+
+
+def test_expired_and_excess_entries_are_evicted(tmp_path):
+    cache = CommitMessageCache(tmp_path / "commits.json", max_entries=2, ttl=60)
+    with patch("core.commit_cache.time.time", return_value=1000.0):
+        cache.put("t1", "groq", "m", "one")
+    with patch("core.commit_cache.time.time", return_value=1001.0):
+        cache.put("t2", "groq", "m", "two")
+    with patch("core.commit_cache.time.time", return_value=1002.0):
+        cache.put("t3", "groq", "m", "three")
+        assert [e["message"] for e in cache.entries()] == ["three", "two"]
+    with patch("core.commit_cache.time.time", return_value=1061.5):
+        assert cache.get("t2", "groq", "m") is None
+        assert [e["message"] for e in cache.entries()] == ["three"]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_git_commit_retry_reuses_message_for_same_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for args in (["init", "-q"], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git"] + args, check=True)
+    (tmp_path / "a.py").write_text("print('a')\n", encoding="utf-8")
+    subprocess.run(["git", "add", "a.py"], check=True)
+    tree = staged_tree()
+
+    with patch("Lucien.ask_llm", return_value="feat: add a") as mock_ask, \
+         patch("sys.stdout", new=StringIO()):
+        first = Lucien.commit_message_for_index("ollama", ["a.py"])
+        second = Lucien.commit_message_for_index("ollama", ["a.py"])
+    assert first == ("feat: add a", "generated")
+    assert second == ("feat: add a", "cached")
+    assert mock_ask.call_count == 1
+    assert Lucien.COMMIT_CACHE.entries()[0]["tree"] == tree
+
+
+def test_commit_cache_show_lists_entries():
+    Lucien.COMMIT_CACHE.put("0123456789abcdef", "groq", "llama3-70b-8192", "fix: typo")
+    with patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("commit cache show")
+    output = fake_out.getvalue()
+    assert "0123456789ab groq/llama3-70b-8192" in output
+    assert "fix: typo" in output
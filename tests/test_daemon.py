@@ -0,0 +1,192 @@
+# tests/test_daemon.py
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+if not hasattr(socket, "AF_UNIX"):
+    pytest.skip("the daemon needs Unix domain sockets", allow_module_level=True)
+
+import Lucien
+from core.daemon import Daemon, default_socket_path, ping, run_lines, stop
+from core.output_capture import install
+
+
+@contextmanager
+def running(path, run_line, new_state=dict, cwd=None):
+    with patch("sys.stdout", new=StringIO()):
+        daemon = Daemon(path, run_line, install(), new_state, cwd)
+        daemon.bind()
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield thread
+        finally:
+            daemon.shutdown()
+            thread.join(5)
+
+
+def client(path, *lines, session="a", answers=(), out=None, cwd=None):
+    out = out or StringIO()
+    answers = iter(answers)
+
+    def read_input(prompt):
+        out.write(prompt)
+        try:
+            return next(answers)
+        except StopIteration:
+            raise EOFError from None
+
+    run_lines(path, lines, session, out, read_input, cwd)
+    return out.getvalue()
+
+
+def test_clients_run_concurrently_with_their_own_session_state(tmp_path):
+    path = tmp_path / "s.sock"
+    both_inside = threading.Barrier(2, timeout=5)
+
+    def run_line(line, state):
+        state.setdefault("lines", []).append(line)
+        if line.startswith("hi"):
+            both_inside.wait()  # only passes when both clients are being served at once
+        print(f"{line}: {state['lines']}")
+
+    results = {}
+    with running(path, run_line):
+        threads = [threading.Thread(target=lambda s=s: results.update({s: client(path, f"hi {s}", session=s)}))
+                   for s in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        again = client(path, "again", "more", session="a")
+    assert results == {"a": "hi a: ['hi a']\n", "b": "hi b: ['hi b']\n"}
+    assert again == "again: ['hi a', 'again']\nmore: ['hi a', 'again', 'more']\n"
+
+
+def test_output_streams_and_input_prompts_reach_the_client(tmp_path):
+    path = tmp_path / "s.sock"
+    received = threading.Event()
+
+    def run_line(line, state):
+        if line == "stream":
+            print("first")
+            received.wait(5)  # set once the client has printed "first"
+            print("second" if received.is_set() else "not streamed")
+        else:
+            print(f"hello {input('name? ')}")
+
+    class Out(StringIO):
+        def write(self, text):
+            received.set()
+            return super().write(text)
+
+    with running(path, run_line):
+        assert client(path, "stream", out=Out()) == "first\nsecond\n"
+        assert client(path, "greet", answers=["merlin"]) == "name? hello merlin\n"
+        assert client(path, "greet") == "name? ❌ Input ended before the command finished\n"
+
+
+def test_bind_replaces_a_stale_socket_and_refuses_a_live_one(tmp_path):
+    path = tmp_path / "s.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()  # the file stays behind with nobody listening
+    with running(path, lambda line, state: None) as thread:
+        assert ping(path) == os.getpid()
+        assert oct(path.stat().st_mode & 0o777) == oct(0o600)
+        with pytest.raises(RuntimeError, match="already listening"):
+            Daemon(path, None, None).bind()
+        assert stop(path)
+        thread.join(5)
+        assert not thread.is_alive()
+    assert not path.exists() and ping(path) is None and not stop(path)
+
+
+def test_daemon_sessions_record_spells_separately(tmp_path, monkeypatch):
+    monkeypatch.setattr(Lucien, "recording_spell", None)
+    monkeypatch.setattr(Lucien, "recorded_commands", [])
+    path = tmp_path / "s.sock"
+    with patch.dict(Lucien.COMMANDS, {"echo": print}), \
+            running(path, Lucien._daemon_line, Lucien.RecordingState):
+        assert "Recording spell 'mine'" in client(path, "record spell mine", session="a")
+        assert client(path, "echo one", session="a") == "one\n"
+        assert client(path, "echo other", session="b") == "other\n"
+        assert "No spell being recorded" in client(path, "stop recording", session="b")
+        assert "saved with 1 commands" in client(path, "stop recording", session="a")
+    assert Lucien.find_spell("mine")["commands"] == ["echo one"]
+    assert Lucien.recording_spell is None and Lucien.recorded_commands == []
+
+
+def test_concurrent_clients_do_not_lose_memory_or_spell_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(Lucien, "MEMORY_FILE", str(tmp_path / "memory.json"))
+    monkeypatch.setattr(Lucien, "memory", None)
+    for name in "abcd":
+        Lucien.store_spell(name, {"commands": ["help"], "description": "", "created": "2025-01-01T00:00:00",
+                                  "count": 1})
+    path = tmp_path / "s.sock"
+
+    def work(name):
+        lines = [f"remember {name}{i}" for i in range(10)] + [f"spell tag {name} t{name}"]
+        client(path, *lines, session=name)
+
+    with running(path, Lucien._daemon_line, Lucien.RecordingState):
+        threads = [threading.Thread(target=work, args=(name,)) for name in "abcd"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+    notes = Lucien.load_memory()["notes"]
+    assert sorted(notes) == sorted(f"{name}{i}" for name in "abcd" for i in range(10))
+    assert [Lucien.find_spell(name)["tags"] for name in "abcd"] == [["ta"], ["tb"], ["tc"], ["td"]]
+    assert list(tmp_path.glob("*.tmp")) == [] and list(tmp_path.glob(".*.tmp")) == []
+
+
+def test_default_socket_is_absolute_and_per_user(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_socket_path() == tmp_path / "lucien.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    path = default_socket_path()
+    monkeypatch.chdir(tmp_path)
+    assert path == default_socket_path() and path.is_absolute()
+    assert path.parent.name == f"lucien-{os.getuid()}"
+
+
+def test_clients_in_another_directory_are_refused(tmp_path):
+    path = tmp_path / "s.sock"
+    home, elsewhere = tmp_path / "repo", tmp_path / "other"
+    home.mkdir()
+    elsewhere.mkdir()
+    with running(path, lambda line, state: print(line), cwd=str(home)):
+        assert client(path, "hello", cwd=str(home)) == "hello\n"
+        with pytest.raises(RuntimeError, match="runs commands in .*repo"):
+            client(path, "hello", cwd=str(elsewhere))
+        assert client(path, "hello") == "hello\n"  # clients that do not say where they are
+
+
+def test_sessions_keep_separate_conversation_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(Lucien, "HISTORY_ENABLED", True)
+    monkeypatch.setattr(Lucien, "SEMANTIC_ENABLED", False)
+    prompts = []
+
+    def respond(provider, messages, temperature=0.5, use_cache=True):
+        prompts.append([m["content"] for m in messages if m["role"] != "system"])
+        return f"answer {len(prompts)}"
+
+    path = tmp_path / "s.sock"
+    with patch.object(Lucien, "respond", respond), running(path, Lucien._daemon_line, Lucien.RecordingState):
+        client(path, "what is a secret plan", session="a")
+        client(path, "explain more", session="b")
+        client(path, "explain more", session="a")
+        shown = client(path, "history show", session="b")
+    assert "You: explain more" in shown and "secret" not in shown
+    assert prompts == [
+        ["what is a secret plan"],
+        ["explain more"],
+        ["what is a secret plan", "answer 1", "explain more"],
+    ]
+    assert Lucien.CONVERSATION.turns == []
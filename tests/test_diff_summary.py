@@ -0,0 +1,106 @@
+# tests/test_diff_summary.py
+import shutil
+import subprocess
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.diff_summary import format_summaries, read_file_diff, summarize_files
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for args in (["init", "-q"], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git"] + args, check=True)
+    return tmp_path
+
+
+def _stage(repo, name, text):
+    (repo / name).write_text(text, encoding="utf-8")
+    subprocess.run(["git", "add", name], check=True)
+
+
+def test_read_file_diff_caps_text_but_counts_every_line(repo):
+    _stage(repo, "big.txt", "".join(f"line {i}\n" for i in range(5000)))
+    diff = read_file_diff("big.txt", max_chars=500)
+    assert len(diff.text) == 500
+    assert diff.truncated
+    assert (diff.added, diff.removed) == (5000, 0)
+
+
+def test_read_file_diff_small_file_is_complete(repo):
+    _stage(repo, "a.py", "--- not a header\n+++ nor this\n")
+    diff = read_file_diff("a.py")
+    assert not diff.truncated
+    assert "+--- not a header" in diff.text
+    assert diff.stat == "+2/-0"
+
+
+def test_summarize_files_keeps_order_and_bounds_workers(repo):
+    names = [f"f{i}.txt" for i in range(8)]
+    for name in names:
+        _stage(repo, name, name + "\n")
+    active = peak = 0
+    lock = threading.Lock()
+
+    def summarize(diff):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return f"add {diff.path}\n"
+
+    result = summarize_files(names, summarize, max_workers=3)
+    assert [r[0] for r in result] == names
+    assert result[0] == ("f0.txt", "+1/-0", "add f0.txt")
+    assert peak <= 3
+
+
+def test_format_summaries_elides_overflow():
+    summaries = [(f"f{i}", "+1/-0", "x" * 50) for i in range(10)]
+    text = format_summaries(summaries, max_chars=200)
+    assert text.endswith("more file(s)")
+    assert text.count("\n") < 10
+
+
+def test_git_commit_sends_a_small_multi_file_diff_in_one_call(repo):
+    _stage(repo, "a.py", "print('a')\n")
+    _stage(repo, "b.py", "print('b')\n")
+    with patch("Lucien.ask_llm", return_value="feat: add a and b") as ask, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_git_commit("")
+    assert "✅ Committed: feat: add a and b" in fake_out.getvalue()
+    assert ask.call_count == 1
+    prompt = ask.call_args[0][1][-1]["content"]
+    assert "+print('a')" in prompt and "+print('b')" in prompt
+
+
+def test_git_commit_reduces_per_file_summaries(repo, monkeypatch):
+    monkeypatch.setattr(Lucien, "COMMIT_DIRECT_TOKENS", 0)  # anything counts as a large diff
+    _stage(repo, "a.py", "print('a')\n")
+    _stage(repo, "b.py", "print('b')\n")
+    prompts = []
+
+    def fake_ask(provider, messages, **kwargs):
+        prompts.append(messages[-1]["content"])
+        if messages[-1]["content"].startswith("File: "):
+            return "add " + messages[-1]["content"].split()[1]
+        return "feat: add a and b"
+
+    with patch("Lucien.ask_llm", side_effect=fake_ask), \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_git_commit("")
+    assert "✅ Committed: feat: add a and b" in fake_out.getvalue()
+    assert len(prompts) == 3
+    assert "- a.py (+1/-0): add a.py" in prompts[-1]
+    assert "- b.py (+1/-0): add b.py" in prompts[-1]
@@ -1,21 +1,25 @@
 # tests/test_git_integration.py
 import pytest
 from unittest.mock import patch, MagicMock
-import subprocess
+import io
 
 # Import the functions we want to test
 from Lucien import cmd_git_status, cmd_git_add, cmd_git_commit, cmd_git_push, cmd_git_pull, cmd_git_log
 
+def fake_git(stdout=b"", stderr=b"", returncode=0):
+    """Stand-in for a git Popen process with the given output."""
+    proc = MagicMock()
+    proc.stdout = io.BytesIO(stdout)
+    proc.stderr = io.BytesIO(stderr)
+    proc.wait.return_value = returncode
+    return proc
+
 class TestGitIntegration:
     
-    @patch('subprocess.run')
-    def test_git_status_clean(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_git_status_clean(self, mock_popen):
         """Test git status when working directory is clean"""
-        mock_run.return_value = MagicMock(
-            stdout="",
-            stderr="",
-            returncode=0
-        )
+        mock_popen.return_value = fake_git()
         
         # Capture print output
         from io import StringIO
@@ -29,18 +33,16 @@ class TestGitIntegration:
         output = captured_output.getvalue()
         
         assert "✅ Working directory clean" in output
-        mock_run.assert_called_once_with(
-            ["git", "status", "--porcelain"],
-            capture_output=True, text=True, check=True
-        )
+        assert mock_popen.call_args[0][0] == ["git", "status", "--porcelain=v2", "-z"]
     
-    @patch('subprocess.run')
-    def test_git_status_modified(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_git_status_modified(self, mock_popen):
         """Test git status when there are modified files"""
-        mock_run.return_value = MagicMock(
-            stdout=" M README.md\nA  new_file.py",
-            stderr="",
-            returncode=0
+        mock_popen.return_value = fake_git(
+            b"1 .M N... 100644 100644 100644 abc abc README.md\0"
+            b"1 A. N... 000000 100644 100644 000 def new file.py\0"
+            b"2 R. N... 100644 100644 100644 abc abc R100 new name.py\0old name.py\0"
+            b"? untracked.txt\0"
         )
         
         from io import StringIO
@@ -55,7 +57,29 @@ class TestGitIntegration:
         
         assert "Modified files:" in output
         assert " M README.md" in output
-        assert "A  new_file.py" in output
+        assert "A  new file.py" in output
+        assert "R  old name.py -> new name.py" in output
+        assert "?? untracked.txt" in output
+    
+    @patch('subprocess.Popen')
+    def test_git_status_limit_and_offset(self, mock_popen):
+        """Test git status pagination counts rows past the page"""
+        mock_popen.return_value = fake_git(b"".join(b"? f%d.txt\0" % i for i in range(10)))
+        
+        from io import StringIO
+        import sys
+        captured_output = StringIO()
+        sys.stdout = captured_output
+        
+        cmd_git_status("--limit 3 --offset 2 src")
+        
+        sys.stdout = sys.__stdout__
+        output = captured_output.getvalue()
+        
+        assert "f2.txt" in output and "f4.txt" in output
+        assert "f1.txt" not in output and "f5.txt" not in output
+        assert "showing 3-5 of 10" in output
+        assert mock_popen.call_args[0][0][-2:] == ["--", "src"]
     
     @patch('subprocess.run')
     def test_git_add_success(self, mock_run):
@@ -98,13 +122,12 @@ class TestGitIntegration:
         assert "Usage: git add <files>" in output
         mock_run.assert_not_called()
     
-    @patch('subprocess.run')
-    def test_git_log_success(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_git_log_success(self, mock_popen):
         """Test git log with commits"""
-        mock_run.return_value = MagicMock(
-            stdout="abc1234 feat: add new feature\ndef5678 fix: bug fix",
-            stderr="",
-            returncode=0
+        mock_popen.return_value = fake_git(
+            b"abc1234\x1f2024-01-02\x1fAda\x1ffeat: add new feature\0"
+            b"\ndef5678\x1f2024-01-01\x1fBob\x1ffix: bug fix\0"
         )
         
         from io import StringIO
@@ -112,22 +135,22 @@ class TestGitIntegration:
         captured_output = StringIO()
         sys.stdout = captured_output
         
-        cmd_git_log("")
+        cmd_git_log("-n 5 --since '2 weeks ago'")
         
         sys.stdout = sys.__stdout__
         output = captured_output.getvalue()
         
         assert "Recent commits:" in output
-        assert "abc1234 feat: add new feature" in output
-        mock_run.assert_called_once_with(
-            ["git", "log", "--oneline", "-10"],
-            capture_output=True, text=True, check=True
-        )
+        assert "abc1234 feat: add new feature (2024-01-02, Ada)" in output
+        assert "def5678 fix: bug fix" in output
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[:3] == ["git", "log", "-z"]
+        assert "-n5" in cmd and "--since=2 weeks ago" in cmd
     
-    @patch('subprocess.run')
-    def test_git_command_error(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_git_command_error(self, mock_popen):
         """Test git command when git is not available"""
-        mock_run.side_effect = FileNotFoundError()
+        mock_popen.side_effect = FileNotFoundError()
         
         from io import StringIO
         import sys
@@ -141,10 +164,10 @@ class TestGitIntegration:
         
         assert "❌ Error: Git not installed" in output
     
-    @patch('subprocess.run')
-    def test_git_command_failure(self, mock_run):
+    @patch('subprocess.Popen')
+    def test_git_command_failure(self, mock_popen):
         """Test git command when it fails"""
-        mock_run.side_effect = subprocess.CalledProcessError(1, "git", stderr="fatal: not a git repository")
+        mock_popen.return_value = fake_git(stderr=b"fatal: not a git repository", returncode=128)
         
         from io import StringIO
         import sys
@@ -0,0 +1,60 @@
+# tests/test_git_stream.py
+import io
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.git_stream import git_records, iter_records, parse_status_v2
+
+
+class Trickle(io.BytesIO):
+    """Pipe that hands out three bytes per read, splitting records mid-way."""
+
+    def read1(self, size=-1):
+        return super().read(3)
+
+
+def test_iter_records_reassembles_across_reads():
+    data = b"one\0two words\0three"
+    assert list(iter_records(Trickle(data))) == ["one", "two words", "three"]
+
+
+def test_parse_status_v2_unmerged_and_ignored():
+    records = ["u UU N... 100644 100644 100644 100644 a b c conflict file.py", "! build/", "# branch.oid abc"]
+    assert [str(e) for e in parse_status_v2(records)] == ["UU conflict file.py", "!! build/"]
+
+
+def _proc(stdout, returncode=0):
+    proc = MagicMock()
+    proc.stdout = io.BytesIO(stdout)
+    proc.stderr = io.BytesIO(b"boom")
+    proc.wait.return_value = returncode
+    return proc
+
+
+def test_closing_early_kills_git():
+    proc = _proc(b"a\0b\0c\0")
+    records = git_records(["status"], popen=lambda *a, **k: proc)
+    assert next(records) == "a"
+    records.close()
+    proc.kill.assert_called_once()
+
+
+def test_failure_after_full_read_raises_with_stderr():
+    records = git_records(["log"], popen=lambda *a, **k: _proc(b"", returncode=128))
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        list(records)
+    assert info.value.stderr == "boom"
+
+
+def test_heavy_stderr_does_not_block_stdout():
+    # More stderr than a pipe buffer holds, written before any stdout record
+    script = "import sys; sys.stderr.write('w' * 1000000); sys.stdout.write('a\\0b\\0'); sys.exit(1)"
+    popen = lambda cmd, **kw: subprocess.Popen([sys.executable, "-c", script], **kw)
+    records = git_records(["log"], popen=popen)
+    assert next(records) == "a"
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        list(records)
+    assert len(info.value.stderr) == 1000000
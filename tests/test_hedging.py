@@ -0,0 +1,99 @@
+# tests/test_hedging.py
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.hedging import Hedger, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker()
+    for ms in range(1, 101):
+        tracker.record("groq", ms / 1000)
+    assert tracker.percentile("groq", 50) == pytest.approx(0.050)
+    assert tracker.percentile("groq", 95) == pytest.approx(0.095)
+    assert tracker.percentile("ollama", 95) is None
+
+
+def test_fast_primary_is_not_hedged():
+    hedger = Hedger(default_delay=1.0)
+    secondary_called = threading.Event()
+    winner, out = hedger.call(("groq", lambda: "fast"), ("ollama", secondary_called.set))
+    assert (winner, out) == ("groq", "fast")
+    assert hedger.hedged == 0
+    assert not secondary_called.is_set()
+
+
+def test_slow_primary_loses_to_secondary(tmp_path):
+    log = tmp_path / "hedge.jsonl"
+    hedger = Hedger(default_delay=0.02, log_path=str(log))
+    release = threading.Event()
+
+    def slow():
+        release.wait(2)
+        return "slow"
+
+    try:
+        winner, out = hedger.call(("groq", slow), ("ollama", lambda: "local"))
+    finally:
+        release.set()
+    assert (winner, out) == ("ollama", "local")
+    assert hedger.hedged == 1
+    assert hedger.wins["ollama"] == 1
+    entry = json.loads(log.read_text(encoding="utf-8").splitlines()[-1])
+    assert entry["winner"] == "ollama" and entry["hedged"] is True
+
+
+def test_primary_failure_fails_over():
+    hedger = Hedger(default_delay=5)
+
+    def broken():
+        raise RuntimeError("Groq request failed")
+
+    start = time.perf_counter()
+    assert hedger.call(("groq", broken), ("ollama", lambda: "local")) == ("ollama", "local")
+    assert time.perf_counter() - start < 1
+    assert hedger.failovers == 1
+
+
+def test_both_failing_raises_primary_error():
+    hedger = Hedger(default_delay=0.01)
+
+    def fail(msg):
+        def run():
+            raise RuntimeError(msg)
+        return run
+
+    with pytest.raises(RuntimeError, match="groq down"):
+        hedger.call(("groq", fail("groq down")), ("ollama", fail("ollama down")))
+
+
+def test_threshold_follows_observed_latency():
+    hedger = Hedger(percentile=95, default_delay=3.0, min_samples=5)
+    assert hedger.delay_for("groq") == 3.0
+    for _ in range(5):
+        hedger.tracker.record("groq", 0.4)
+    assert hedger.delay_for("groq") == pytest.approx(0.4)
+
+
+def test_ask_llm_hedges_when_enabled():
+    hedger = Hedger(default_delay=0.01)
+    release = threading.Event()
+
+    def slow_groq(messages, **kwargs):
+        release.wait(2)
+        return "groq"
+
+    try:
+        with patch("Lucien.HEDGE_ENABLED", True), \
+             patch("Lucien.HEDGER", hedger), \
+             patch("Lucien.chat_groq", side_effect=slow_groq), \
+             patch("Lucien.chat_ollama", return_value="ollama") as mock_ollama:
+            assert Lucien.ask_llm("groq", Lucien.build_messages("hi")) == "ollama"
+    finally:
+        release.set()
+    assert mock_ollama.call_args.kwargs["model"] == Lucien.DEFAULT_MODELS["ollama"]
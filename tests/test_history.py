@@ -0,0 +1,70 @@
+# tests/test_history.py
+from io import StringIO
+from unittest.mock import patch
+
+import Lucien
+from core.history import ConversationHistory
+from core.tokens import estimate_messages_tokens, estimate_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("x" * 400) == 100
+
+
+def test_build_includes_recent_turns_in_order():
+    history = ConversationHistory(budget=1000)
+    history.add("q1", "a1")
+    history.add("q2", "a2")
+    messages = history.build("sys", "q3")
+    assert [m["content"] for m in messages] == ["sys", "q1", "a1", "q2", "a2", "q3"]
+    assert [m["role"] for m in messages[1:3]] == ["user", "assistant"]
+
+
+def test_payload_stays_within_budget():
+    history = ConversationHistory(budget=300)
+    for i in range(200):
+        history.add(f"question {i} " + "x" * 200, f"answer {i} " + "y" * 200)
+    messages = history.build("system", "latest")
+    assert estimate_messages_tokens(messages) <= 300
+    assert messages[-1]["content"] == "latest"
+    assert "question 199" in messages[-3]["content"]
+    assert len(history.turns) < 5
+
+
+def test_evicted_turns_roll_into_cached_summary():
+    calls = []
+
+    def summarizer(previous, turns):
+        calls.append(turns)
+        return (previous + " " if previous else "") + ",".join(u for u, _ in turns)
+
+    history = ConversationHistory(budget=160, summarizer=summarizer)
+    history.add("first " + "x" * 400, "a")
+    history.add("second", "b")
+    assert history.summary.startswith("first")
+    summarized = len(calls)
+    # Building requests never re-summarizes
+    history.build("sys", "next")
+    history.build("sys", "next")
+    assert len(calls) == summarized
+    assert "Summary of the earlier conversation" in history.build("sys", "next")[0]["content"]
+
+
+def test_dispatch_sends_previous_turns():
+    with patch("Lucien.USE_INTERNET", False), \
+         patch("Lucien.chat_ollama", side_effect=["Hi Luis", "Your name is Luis"]) as mock_chat, \
+         patch("sys.stdout", new=StringIO()):
+        Lucien.dispatch("my name is Luis")
+        Lucien.dispatch("what is my name?")
+    sent = mock_chat.call_args.args[0]
+    assert [m["content"] for m in sent[1:]] == ["my name is Luis", "Hi Luis", "what is my name?"]
+
+
+def test_history_clear_command():
+    Lucien.CONVERSATION.add("q", "a")
+    with patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("history clear")
+    assert "cleared" in fake_out.getvalue()
+    assert Lucien.CONVERSATION.turns == []
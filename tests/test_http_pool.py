@@ -0,0 +1,63 @@
+# tests/test_http_pool.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.http_pool import PoolConfig, close_sessions, get_session
+
+
+class _ChatStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    peers = set()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        _ChatStub.peers.add(self.client_address)
+        body = json.dumps({"message": {"role": "assistant", "content": "pong"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    _ChatStub.peers = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    close_sessions()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/chat"
+    close_sessions()
+    server.shutdown()
+
+
+def test_session_is_shared_per_provider():
+    close_sessions()
+    try:
+        assert get_session("groq") is get_session("groq")
+        assert get_session("groq") is not get_session("ollama")
+    finally:
+        close_sessions()
+
+
+def test_pool_config_timeout_tuple():
+    config = PoolConfig(connect_timeout=2, read_timeout=15)
+    assert config.timeout == (2, 15)
+
+
+def test_chat_ollama_reuses_connection(stub_url):
+    messages = [{"role": "user", "content": "ping"}]
+    with patch("Lucien.OLLAMA_URL", stub_url):
+        for _ in range(5):
+            assert Lucien.chat_ollama(messages) == "pong"
+    # All five calls should ride the same keep-alive connection
+    assert len(_ChatStub.peers) == 1
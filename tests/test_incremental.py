@@ -0,0 +1,112 @@
+# tests/test_incremental.py
+import json
+import os
+from io import StringIO
+from unittest.mock import patch
+
+import Lucien
+from core.incremental import Manifest, expand
+
+
+def _touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_expand_globs_directories_and_missing_paths(tmp_path):
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "a.md").write_text("a")
+    (tmp_path / "src" / "sub" / "b.md").write_text("b")
+    found = expand([str(tmp_path / "src" / "**" / "*.md"), str(tmp_path / "missing.txt")])
+    assert found == sorted([str(tmp_path / "src" / "a.md"), str(tmp_path / "src" / "sub" / "b.md"),
+                            str(tmp_path / "missing.txt")])
+    assert expand([str(tmp_path / "src")]) == [f for f in found if f.endswith(".md")]
+
+
+def test_manifest_fresh_until_content_changes(tmp_path):
+    src, out = tmp_path / "in.txt", tmp_path / "out.txt"
+    src.write_text("v1")
+    out.write_text("built")
+    m = Manifest(tmp_path / "manifest.json")
+    assert not m.is_fresh("s:1", "build", [str(src)], [str(out)])
+    assert m.record("s:1", "build", [str(src)], [str(out)])
+    assert Manifest(tmp_path / "manifest.json").is_fresh("s:1", "build", [str(src)], [str(out)])
+    assert not m.is_fresh("s:1", "build --other", [str(src)], [str(out)])
+
+    _touch_later(src)  # same content, new mtime: still fresh
+    assert m.is_fresh("s:1", "build", [str(src)], [str(out)])
+    src.write_text("v2")
+    assert not m.is_fresh("s:1", "build", [str(src)], [str(out)])
+
+
+def test_missing_output_is_never_fresh_or_recorded(tmp_path):
+    m = Manifest(tmp_path / "manifest.json")
+    assert not m.record("s:1", "build", [], [str(tmp_path / "nope")])
+    assert not m.is_fresh("s:1", "build", [], [str(tmp_path / "nope")])
+
+
+def test_cast_skips_unchanged_steps(tmp_path, monkeypatch):
+    monkeypatch.setattr(Lucien, "SPELLS_FILE", tmp_path / "spells.json")
+    src, out = tmp_path / "in.txt", tmp_path / "out.txt"
+    src.write_text("hello")
+    (tmp_path / "spells.json").write_text(json.dumps({"build": {
+        "commands": ["copy it", "announce"], "description": "", "created": "2025-01-01T00:00:00", "count": 2,
+    }}), encoding="utf-8")
+    calls = []
+
+    def copy(args):
+        calls.append("copy")
+        out.write_text(src.read_text().upper())
+
+    with patch.dict(Lucien.COMMANDS, {"copy": copy, "announce": lambda a: calls.append("announce")}), \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch(f"spell io build 1 {src} -> {out}")
+        Lucien.cmd_cast_spell("build")
+        Lucien.cmd_cast_spell("build")
+        src.write_text("changed")
+        Lucien.cmd_cast_spell("build")
+        Lucien.cmd_cast_spell("build --force")
+    assert calls == ["copy", "announce", "announce", "copy", "announce", "copy", "announce"]
+    assert fake_out.getvalue().count("Up to date, skipped") == 1
+    assert out.read_text() == "CHANGED"
+
+
+def test_output_not_rewritten_by_the_run_is_not_recorded(tmp_path):
+    out = tmp_path / "out.txt"
+    out.write_text("old build")
+    m = Manifest(tmp_path / "manifest.json")
+    before = m.stamp([str(out)])
+    assert not m.record("s:1", "build", [], [str(out)], before)
+    _touch_later(out)
+    assert m.record("s:1", "build", [], [str(out)], before)
+
+
+def test_failed_step_runs_again_on_the_next_cast(tmp_path, monkeypatch):
+    monkeypatch.setattr(Lucien, "SPELLS_FILE", tmp_path / "spells.json")
+    src, out = tmp_path / "in.txt", tmp_path / "out.txt"
+    src.write_text("hello")
+    out.write_text("stale")
+    (tmp_path / "spells.json").write_text(json.dumps({"build": {
+        "commands": ["build it", "check it"], "description": "", "created": "2025-01-01T00:00:00", "count": 2,
+    }}), encoding="utf-8")
+    calls = []
+
+    def broken_build(args):
+        calls.append("build")
+        print("❌ compiler error")  # fails the way handlers do: by printing, leaving the old output
+
+    def check(args):
+        calls.append("check")  # returns normally but never rewrites its declared output
+
+    with patch.dict(Lucien.COMMANDS, {"build": broken_build, "check": check}), \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch(f"spell io build 1 {src} -> {out}")
+        Lucien.dispatch(f"spell io build 2 {src} -> {out}")
+        Lucien.cmd_cast_spell("build")
+        Lucien.cmd_cast_spell("build")
+    assert calls == ["build", "check", "build", "check"]
+    output = fake_out.getvalue()
+    assert "Up to date, skipped" not in output
+    assert output.count("Step 1 reported a problem") == 2
+    assert output.count("Step 2 did not write all declared outputs") == 2
+    assert out.read_text() == "stale"
@@ -0,0 +1,84 @@
+# tests/test_llm_cache.py
+import os
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import Lucien
+from core.llm_cache import ResponseCache, make_key
+
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hello"}]
+
+
+def test_make_key_normalizes_messages():
+    base = make_key("groq", "m", 0.5, MESSAGES)
+    padded = [{"role": "system", "content": "sys\r\n"}, {"role": "user", "content": "  hello "}]
+    assert make_key("groq", "m", 0.5, padded) == base
+    assert make_key("ollama", "m", 0.5, MESSAGES) != base
+    assert make_key("groq", "m", 0.2, MESSAGES) != base
+    assert make_key("groq", "other", 0.5, MESSAGES) != base
+
+
+def test_memory_lru_is_bounded(tmp_path):
+    cache = ResponseCache(tmp_path, max_entries=2)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.put(key, key.upper())
+    assert cache.stats()["memory_entries"] == 2
+    # The evicted entry is still served from disk
+    assert cache.get("aa1") == "AA1"
+    assert cache.disk_hits == 1
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    ResponseCache(tmp_path).put("abc", "answer")
+    fresh = ResponseCache(tmp_path)
+    assert fresh.get("abc") == "answer"
+    assert fresh.get("missing") is None
+    assert (fresh.hits, fresh.misses) == (1, 1)
+
+
+def test_ttl_expiry(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0.01)
+    cache.put("abc", "answer")
+    time.sleep(0.02)
+    assert cache.get("abc") is None
+
+
+def test_size_eviction_drops_oldest(tmp_path):
+    cache = ResponseCache(tmp_path, max_entries=1, max_bytes=400)
+    for i in range(10):
+        key = f"{i:02d}key"
+        cache.put(key, "x" * 60)
+        path = cache._path(key)
+        os.utime(path, (i, i + 1_000_000_000))
+    assert cache.stats()["disk_bytes"] <= 400
+    assert cache.get("09key") is not None
+    assert cache.get("00key") is None
+
+
+def test_ai_command_uses_cache(isolated_llm_cache):
+    with patch("Lucien.chat_groq", return_value="Groq response") as mock_groq, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_ai("groq Hello")
+        Lucien.cmd_ai("groq Hello")
+        Lucien.cmd_ai("--no-cache groq Hello")
+    assert mock_groq.call_count == 2
+    assert fake_out.getvalue().count("Groq response") == 3
+    assert isolated_llm_cache.hits == 1
+
+
+def test_cache_off_bypasses_lookup(isolated_llm_cache):
+    with patch("Lucien.CACHE_ENABLED", False), \
+         patch("Lucien.chat_ollama", return_value="local") as mock_ollama, \
+         patch("sys.stdout", new=StringIO()):
+        Lucien.cmd_ai("ollama Hi")
+        Lucien.cmd_ai("ollama Hi")
+    assert mock_ollama.call_count == 2
+    assert isolated_llm_cache.stats()["disk_entries"] == 0
+
+
+def test_cache_stats_command():
+    with patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("cache stats")
+    assert "Hits: 0" in fake_out.getvalue()
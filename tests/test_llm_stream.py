@@ -0,0 +1,61 @@
+# tests/test_llm_stream.py
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.llm_stream import StreamStats, iter_ndjson_content, iter_sse_content, timed
+
+
+def _sse(content):
+    return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+def test_iter_sse_content():
+    lines = [b"", _sse("Hel").encode(), b": keep-alive", _sse("lo").encode(), b"data: [DONE]", _sse("x").encode()]
+    assert list(iter_sse_content(lines)) == ["Hel", "lo"]
+
+
+def test_iter_sse_content_reports_usage():
+    stats = StreamStats("groq", "m")
+    final = "data: " + json.dumps({"choices": [], "x_groq": {"usage": {"completion_tokens": 7}}})
+    list(iter_sse_content([_sse("a"), final, "data: [DONE]"], stats))
+    assert stats.completion_tokens == 7
+
+
+def test_iter_ndjson_content():
+    lines = [
+        json.dumps({"message": {"content": "Hi"}, "done": False}),
+        json.dumps({"message": {"content": " there"}, "done": False}),
+        json.dumps({"message": {"content": ""}, "done": True, "eval_count": 2}),
+    ]
+    stats = StreamStats("ollama", "llama3")
+    assert list(iter_ndjson_content(lines, stats)) == ["Hi", " there"]
+    assert stats.completion_tokens == 2
+
+
+def test_iter_ndjson_content_error():
+    with pytest.raises(RuntimeError, match="model not found"):
+        list(iter_ndjson_content([json.dumps({"error": "model not found"})]))
+
+
+def test_timed_records_ttft_and_rate():
+    stats = StreamStats("groq", "m")
+    assert list(timed(iter(["a", "b", "c"]), stats)) == ["a", "b", "c"]
+    assert stats.ttft is not None and stats.ttft >= 0
+    assert stats.tokens == 3
+    assert stats.finished >= stats.first_token_at
+
+
+def test_dispatch_streams_when_enabled():
+    with patch("Lucien.STREAM_OUTPUT", True), \
+         patch("Lucien.USE_INTERNET", True), \
+         patch("Lucien.stream_groq", return_value=iter(["Hello", ", wizard"])) as mock_stream, \
+         patch("Lucien.chat_groq") as mock_chat, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("tell me something")
+    mock_stream.assert_called_once()
+    mock_chat.assert_not_called()
+    assert "Hello, wizard" in fake_out.getvalue()
@@ -0,0 +1,62 @@
+# tests/test_ollama_warm.py
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import Lucien
+from core.ollama_warm import WarmthStats, preload, start_preload
+
+
+def _response(body):
+    r = MagicMock()
+    r.json.return_value = body
+    r.content = b"{}"
+    return r
+
+
+def test_warmth_stats_split_cold_and_warm():
+    stats = WarmthStats()
+    stats.record("llama3", 4.0, {"load_duration": 3_500_000_000, "prompt_eval_count": 40})
+    stats.record("llama3", 0.4, {"load_duration": 2_000_000, "prompt_eval_count": 6})
+    stats.record("llama3", 0.6, {"load_duration": 1_000_000})
+    s = stats.summary()
+    assert (s["cold_calls"], s["warm_calls"]) == (1, 2)
+    assert s["cold_avg"] == 4.0
+    assert abs(s["warm_avg"] - 0.5) < 1e-9
+    assert s["last_prompt_tokens"] == 6
+
+
+def test_preload_sends_empty_chat_with_keep_alive():
+    session = MagicMock()
+    session.post.return_value = _response({"done": True, "load_duration": 2_000_000_000})
+    stats = WarmthStats()
+    preload(session, "http://ollama/api/chat", "llama3", "30m", 10, stats)
+    body = session.post.call_args.kwargs["json"]
+    assert body == {"model": "llama3", "messages": [], "keep_alive": "30m"}
+    assert stats.preload["ok"] and stats.preload["load"] == 2.0
+
+
+def test_start_preload_records_failure_without_raising():
+    session = MagicMock()
+    session.post.side_effect = ConnectionError("refused")
+    stats = WarmthStats()
+    start_preload(lambda: session, "http://ollama/api/chat", "llama3", "30m", 1, stats).join(2)
+    assert stats.preload == {"model": "llama3", "ok": False, "error": "refused"}
+
+
+def test_chat_ollama_sets_keep_alive_and_records_timing():
+    stats = WarmthStats()
+    session = MagicMock()
+    session.post.return_value = _response({"message": {"content": "hi"}, "done": True,
+                                           "load_duration": 1_000, "prompt_eval_count": 12})
+    with patch("Lucien.get_session", return_value=session), \
+         patch("Lucien.OLLAMA_WARMTH", stats), \
+         patch("Lucien.OLLAMA_KEEP_ALIVE", "1h"):
+        assert Lucien.chat_ollama([{"role": "user", "content": "ping"}]) == "hi"
+    assert session.post.call_args.kwargs["json"]["keep_alive"] == "1h"
+    assert stats.summary()["warm_calls"] == 1
+
+
+def test_ollama_status_command():
+    with patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("ollama status")
+    assert "keep_alive" in fake_out.getvalue()
@@ -0,0 +1,79 @@
+# tests/test_plugins.py
+import inspect
+import json
+import re
+import sys
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.plugins import LazyCommand, plugin_status, read_manifest, register
+from core.router import CommandTable
+from plugins import INTERACTIVE, MANIFEST
+
+
+def test_lazy_command_imports_on_first_call(tmp_path, monkeypatch):
+    (tmp_path / "lucien_test_plugin.py").write_text(
+        "def hello(args):\n    print('hello ' + args)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    table = CommandTable({"say": lambda args: None})
+    manifest = {"lucien_test_plugin": {"say hello": "hello", "say": "hello"}}
+    assert register(table, manifest) == 1  # existing "say" is kept
+    assert isinstance(table["say hello"], LazyCommand)
+    assert "lucien_test_plugin" not in sys.modules
+    assert plugin_status(manifest) == [("lucien_test_plugin", False, ["say hello", "say"])]
+
+    with patch('sys.stdout', new=StringIO()) as out:
+        name, handler, args = table.resolve("say hello world")
+        handler(args)
+    assert out.getvalue() == "hello world\n"
+    assert table["say hello"].__name__ == "hello"  # placeholder replaced
+    sys.modules.pop("lucien_test_plugin", None)
+
+
+def test_missing_plugin_reports_instead_of_raising():
+    table = CommandTable()
+    register(table, {"no_such_plugin_module": {"broken": "run"}})
+    with patch('sys.stdout', new=StringIO()) as out:
+        table["broken"]("")
+    assert "Command 'broken' is unavailable" in out.getvalue()
+    assert isinstance(table["broken"], LazyCommand)
+
+
+def test_read_manifest(tmp_path):
+    assert read_manifest(tmp_path / "missing.json") == {}
+    good = tmp_path / "plugins.json"
+    good.write_text(json.dumps({"mod": {"do thing": "run"}}))
+    assert read_manifest(good) == {"mod": {"do thing": "run"}}
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({"mod": ["run"]}))
+    with pytest.raises(ValueError):
+        read_manifest(bad)
+
+
+def test_builtin_plugins_resolve_to_real_handlers():
+    for module, commands in MANIFEST.items():
+        for name, attr in commands.items():
+            assert name in Lucien.COMMANDS
+            assert callable(getattr(__import__(module, fromlist=[attr]), attr))
+
+
+def test_every_builtin_command_that_reads_input_is_interactive():
+    reads_input = set()
+    for module, commands in MANIFEST.items():
+        for name, attr in commands.items():
+            source = inspect.getsource(getattr(__import__(module, fromlist=[attr]), attr))
+            if re.search(r"\binput\b", source):
+                reads_input.add(name)
+    assert reads_input == INTERACTIVE
+
+
+def test_generate_password_through_dispatch():
+    with patch('sys.stdout', new=StringIO()) as out:
+        Lucien.dispatch("generate password 12")
+        Lucien.cmd_plugins("")
+    lines = out.getvalue().splitlines()
+    assert len(lines[0]) == 12
+    assert any("plugins.system (loaded)" in line for line in lines)
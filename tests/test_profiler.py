@@ -0,0 +1,100 @@
+# tests/test_profiler.py
+import json
+import subprocess
+import sys
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import Lucien
+from core.profiler import SpellProfiler, format_table
+from core.spell_dag import step_order
+from core.telemetry import Telemetry
+
+
+def test_profiler_measures_wall_subprocess_llm_and_memory():
+    telemetry = Telemetry()
+
+    def llm_step():
+        with telemetry.track("groq", "m"):
+            time.sleep(0.02)
+
+    def subprocess_step():
+        subprocess.run([sys.executable, "-c", "import time; time.sleep(0.05)"], check=True)
+
+    def memory_step():
+        block = bytearray(2_000_000)
+        return len(block) > 0
+
+    with SpellProfiler(telemetry=telemetry) as profiler:
+        llm = profiler.run(1, "ai question", llm_step)
+        sub = profiler.run(2, "run shell sleep", subprocess_step)
+        mem = profiler.run(3, "build", memory_step)
+        bad = profiler.run(4, "broken", lambda: 1 / 0)
+
+    assert subprocess.Popen.__name__ == "Popen"  # hook removed again
+    assert llm.llm_calls == 1 and llm.llm >= 0.02 and llm.subprocess == 0
+    assert sub.subprocesses == 1 and sub.subprocess >= 0.05 and sub.wall >= sub.subprocess
+    assert mem.memory_peak >= 2_000_000
+    assert bad.error.startswith("ZeroDivisionError")
+    assert profiler.ranked()[0] is sub
+
+
+def test_subprocesses_of_other_threads_are_not_counted():
+    def background():
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+    def step():
+        thread = threading.Thread(target=background)
+        thread.start()
+        thread.join()
+
+    with SpellProfiler() as profiler:
+        result = profiler.run(1, "idle", step)
+    assert (result.subprocesses, result.subprocess) == (0, 0.0)
+
+
+def test_cprofile_keeps_slowest_step(tmp_path):
+    with SpellProfiler(cprofile=True) as profiler:
+        profiler.run(1, "fast", lambda: None)
+        profiler.run(2, "slow", lambda: time.sleep(0.02))
+    number, top = profiler.dump_slowest(tmp_path / "slow.prof")
+    assert number == 2 and "sleep" in top
+    assert (tmp_path / "slow.prof").stat().st_size > 0
+
+
+def test_step_order_respects_dependencies():
+    assert step_order([[], [], []]) == [1, 2, 3]
+    assert step_order([[3], [], []]) == [2, 3, 1]
+
+
+def test_format_table_truncates_long_commands():
+    with SpellProfiler() as profiler:
+        step = profiler.run(1, "x" * 60, lambda: None)
+    header, row = format_table([step], width=20)
+    assert "Wall" in header and row.endswith("x" * 17 + "...")
+
+
+def test_profile_spell_command_reports_table_and_saves_json(tmp_path):
+    spell = {"commands": ["remember one", "remember two"], "count": 2}
+    with patch('Lucien.load_spells', return_value={"demo": spell}), \
+         patch('Lucien.PROFILE_DIR', tmp_path), \
+         patch('Lucien.save_memory'), \
+         patch('Lucien.memory', {"notes": []}), \
+         patch('sys.stdout', new=StringIO()) as out:
+        Lucien.cmd_profile_spell("demo")
+    output = out.getvalue()
+    assert "Profile of 'demo'" in output and "remember two" in output
+    saved = json.loads(next(tmp_path.glob("demo-*.json")).read_text())
+    assert saved["spell"] == "demo" and saved["process_wide"] == ["cpu", "llm", "llm_calls"]
+    assert "CPU*" in output and "LLM are process-wide" in output
+    assert [s["command"] for s in saved["steps"]] == ["remember one", "remember two"]
+    assert not list(tmp_path.glob("*.prof"))
+
+
+def test_profile_spell_unknown_spell_and_usage():
+    with patch('Lucien.load_spells', return_value={}), patch('sys.stdout', new=StringIO()) as out:
+        Lucien.cmd_profile_spell("missing")
+        Lucien.cmd_profile_spell("demo --bogus")
+    assert "not found" in out.getvalue() and "Usage: profile spell" in out.getvalue()
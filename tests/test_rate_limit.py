@@ -0,0 +1,117 @@
+# tests/test_rate_limit.py
+import pytest
+from requests.structures import CaseInsensitiveDict
+from unittest.mock import patch
+
+import Lucien
+from core.rate_limit import RequestScheduler, TokenBucket, parse_duration, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = b""
+
+    def close(self):
+        pass
+
+
+def test_parse_duration_groq_formats():
+    assert parse_duration("7.66s") == pytest.approx(7.66)
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration("3") == 3.0
+    assert parse_duration("soon") is None
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480) == pytest.approx(10)
+
+
+def test_token_bucket_paces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(60, capacity=2, clock=clock)  # one per second
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+
+def test_scheduler_honors_retry_after():
+    clock = FakeClock()
+    responses = iter([FakeResponse(429, {"Retry-After": "5"}), FakeResponse(200)])
+    scheduler = RequestScheduler(requests_per_min=600, tokens_per_min=100000,
+                                 sleep=clock.sleep, rng=lambda: 0.0, clock=clock)
+    resp = scheduler.submit(lambda: next(responses))
+    assert resp.status_code == 200
+    assert scheduler.retries == 1
+    assert clock.now >= 1005.0
+
+
+def test_scheduler_retries_exceptions_then_gives_up():
+    clock = FakeClock()
+    calls = []
+
+    def send():
+        calls.append(1)
+        raise ConnectionError("reset")
+
+    scheduler = RequestScheduler(max_retries=2, retry_exceptions=(ConnectionError,),
+                                 sleep=clock.sleep, rng=lambda: 1.0, clock=clock)
+    with pytest.raises(ConnectionError):
+        scheduler.submit(send)
+    assert len(calls) == 3
+
+
+def test_scheduler_returns_last_response_after_max_retries():
+    clock = FakeClock()
+    scheduler = RequestScheduler(max_retries=1, sleep=clock.sleep, rng=lambda: 0.5, clock=clock)
+    resp = scheduler.submit(lambda: FakeResponse(503))
+    assert resp.status_code == 503
+    assert scheduler.retries == 1
+
+
+def test_scheduler_does_not_retry_client_errors():
+    clock = FakeClock()
+    scheduler = RequestScheduler(sleep=clock.sleep, rng=lambda: 0.5, clock=clock)
+    for status in (400, 401, 409):
+        assert scheduler.submit(lambda: FakeResponse(status)).status_code == status
+    assert scheduler.retries == 0
+
+
+def test_scheduler_blocks_on_exhausted_rate_limit_headers():
+    clock = FakeClock()
+    scheduler = RequestScheduler(requests_per_min=600, tokens_per_min=100000,
+                                 sleep=clock.sleep, clock=clock)
+    headers = {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "7.5s"}
+    scheduler.submit(lambda: FakeResponse(200, headers))
+    start = clock.now
+    scheduler.submit(lambda: FakeResponse(200))
+    assert clock.now - start >= 7.5
+
+
+def test_chat_groq_retries_429():
+    scheduler = RequestScheduler(requests_per_min=600, tokens_per_min=100000,
+                                 sleep=lambda s: None, rng=lambda: 0.0)
+    limited = FakeResponse(429, {"retry-after": "0"})
+    ok = FakeResponse(200)
+    ok.json = lambda: {"choices": [{"message": {"content": "hi"}}]}
+    ok.raise_for_status = lambda: None
+    with patch("Lucien.GROQ_API_KEY", "test"), \
+         patch("Lucien.GROQ_SCHEDULER", scheduler), \
+         patch("Lucien.get_session") as mock_session:
+        mock_session.return_value.post.side_effect = [limited, ok]
+        assert Lucien.chat_groq([{"role": "user", "content": "ping"}]) == "hi"
+    assert scheduler.retries == 1
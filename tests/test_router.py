@@ -0,0 +1,55 @@
+# tests/test_router.py
+from io import StringIO
+from unittest.mock import patch
+
+import Lucien
+from core.router import CommandTable, CommandTrie
+
+
+def test_trie_longest_prefix_and_args():
+    trie = CommandTrie()
+    ai, batch, status = object(), object(), object()
+    trie.insert("ai", ai)
+    trie.insert("ai batch", batch)
+    trie.insert("git status", status)
+    assert trie.match("ai groq hello  world") == ("ai", ai, "groq hello  world")
+    assert trie.match("ai batch prompts.txt --out r.jsonl") == ("ai batch", batch, "prompts.txt --out r.jsonl")
+    assert trie.match("git status") == ("git status", status, "")
+    assert trie.match("git") is None
+    assert trie.match("git stash") is None
+    assert trie.match("what is git status") is None
+    assert trie.match("") is None
+
+
+def test_trie_remove_prunes_and_keeps_shorter_commands():
+    trie = CommandTrie()
+    trie.insert("ai", 1)
+    trie.insert("ai batch", 2)
+    assert trie.remove("ai batch")
+    assert not trie.remove("ai batch")
+    assert trie.match("ai batch x") == ("ai", 1, "batch x")
+    assert len(trie) == 1 and trie._root.children["ai"].children == {}
+
+
+def test_command_table_keeps_trie_in_step_with_dict():
+    table = CommandTable({"help": 1})
+    table["show memory"] = 2
+    assert table.resolve("show memory now") == ("show memory", 2, "now")
+    with patch.dict(table, {"show memory": 3, "extra": 4}):
+        assert table.resolve("show memory")[1] == 3
+        assert table.resolve("extra x")[1] == 4
+    assert table.resolve("show memory")[1] == 2
+    assert table.resolve("extra") is None
+    assert table.pop("help") == 1 and table.resolve("help") is None
+    del table["show memory"]
+    assert table == {} and len(table.trie) == 0
+
+
+def test_dispatch_routes_multi_word_commands_by_longest_prefix():
+    with patch('Lucien.cmd_ai_batch') as batch, patch('sys.stdout', new=StringIO()):
+        with patch.dict(Lucien.COMMANDS, {"ai batch": batch}):
+            Lucien.dispatch("ai batch prompts.txt")
+    batch.assert_called_once_with("prompts.txt")
+    assert Lucien.resolve_command("show memory")[0] == "show memory"
+    assert Lucien.resolve_command("git status --limit 5")[2] == "--limit 5"
+    assert Lucien.resolve_command("tell me a story") is None
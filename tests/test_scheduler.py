@@ -0,0 +1,149 @@
+# tests/test_scheduler.py
+import threading
+import time
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.scheduler import CronSchedule, Scheduler, parse_schedule
+
+
+def _ts(*args):
+    return datetime(*args).timestamp()
+
+
+def test_parse_schedule_intervals_and_errors():
+    assert parse_schedule("every 5m").seconds == 300
+    assert str(parse_schedule("every 90s")) == "every 90s"
+    assert str(parse_schedule("every 2h")) == "every 2h"
+    with pytest.raises(ValueError):
+        parse_schedule("hourly")
+    with pytest.raises(ValueError, match="minute"):
+        parse_schedule("cron 61 * * * *")
+    with pytest.raises(ValueError, match="minute"):
+        parse_schedule("cron 5/ * * * *")
+
+
+def test_cron_start_with_step_runs_to_the_field_maximum():
+    schedule = CronSchedule("5/15 1/6 * * *")
+    assert schedule.minutes == {5, 20, 35, 50}
+    assert schedule.hours == {1, 7, 13, 19}
+    assert CronSchedule("5/15 * * * *").next_after(_ts(2026, 10, 17, 10, 51)) == _ts(2026, 10, 17, 11, 5)
+
+
+def test_cron_next_after():
+    saturday = _ts(2026, 10, 17, 10, 7)
+    assert CronSchedule("*/15 * * * *").next_after(saturday) == _ts(2026, 10, 17, 10, 15)
+    assert CronSchedule("0 9 * * 1-5").next_after(saturday) == _ts(2026, 10, 19, 9, 0)
+    assert CronSchedule("30 2 1 * *").next_after(saturday) == _ts(2026, 11, 1, 2, 30)
+    assert CronSchedule("0 0 * * 7").next_after(saturday) == _ts(2026, 10, 18, 0, 0)
+    # day and weekday both restricted: either one matches
+    assert CronSchedule("0 0 20 * 1").next_after(saturday) == _ts(2026, 10, 19, 0, 0)
+
+
+def test_interval_runs_keep_cadence_and_record_history(tmp_path):
+    now = [1000.0]
+    ran = []
+    scheduler = Scheduler(tmp_path / "s.json", lambda name: (ran.append(name), ("ok", "done"))[1],
+                          clock=lambda: now[0])
+    scheduler.add("pull", "every 60s")
+    assert scheduler.run_pending() == []
+    now[0] = 1200.0  # three periods late: runs once, next run stays on the 60s grid
+    assert scheduler.run_pending() == ["pull"]
+    scheduler.stop()
+    assert ran == ["pull"]
+    assert scheduler.jobs["pull"].next_run == 1240.0
+    record = scheduler.recent("pull")[0]
+    assert (record.outcome, record.detail, record.started) == ("ok", "done", 1200.0)
+    assert Scheduler(tmp_path / "s.json", None).load()["pull"].spec == "every 60s"
+
+
+def test_overlapping_run_is_skipped(tmp_path):
+    now = [0.0]
+    release = threading.Event()
+    scheduler = Scheduler(tmp_path / "s.json", lambda name: (release.wait(2), ("ok", ""))[1],
+                          clock=lambda: now[0])
+    scheduler.add("slow", "every 10s")
+    now[0] = 10.0
+    assert scheduler.run_pending() == ["slow"]
+    now[0] = 20.0
+    assert scheduler.run_pending() == []
+    release.set()
+    scheduler.stop()
+    outcomes = [r.outcome for r in scheduler.recent()]
+    assert outcomes == ["ok", "skipped"]
+    assert scheduler.jobs["slow"].skipped == 1 and scheduler.jobs["slow"].runs == 1
+
+
+def test_errors_are_recorded_and_history_is_bounded(tmp_path):
+    now = [0.0]
+
+    def boom(name):
+        raise RuntimeError("disk gone")
+
+    scheduler = Scheduler(tmp_path / "s.json", boom, history_size=2, clock=lambda: now[0])
+    scheduler.add("check", "every 1s")
+    for t in (1.0, 2.0, 3.0):
+        now[0] = t
+        scheduler.run_pending()
+        while scheduler.jobs["check"].running:
+            time.sleep(0.001)
+    scheduler.stop()
+    records = scheduler.recent()
+    assert len(records) == 2
+    assert records[0].outcome == "error" and "disk gone" in records[0].detail
+
+
+def test_background_thread_runs_due_jobs(tmp_path):
+    done = threading.Event()
+    scheduler = Scheduler(tmp_path / "s.json", lambda name: (done.set(), ("ok", ""))[1])
+    scheduler.add("tick", "every 1s")
+    scheduler.jobs["tick"].next_run = time.time()
+    assert scheduler.start()
+    assert done.wait(2)
+    assert scheduler.stop()
+    assert not scheduler.active
+
+
+def test_scheduled_spell_outcome_from_cast_output():
+    spell = {"commands": ["remember x"], "count": 1}
+    with patch('Lucien.load_spells', return_value={"notes": spell}), \
+         patch('Lucien.cmd_cast_spell', side_effect=lambda name: print("❌ Error: boom")):
+        assert Lucien._run_scheduled_spell("notes") == ("failed", "❌ Error: boom")
+    with patch('Lucien.load_spells', return_value={}):
+        assert Lucien._run_scheduled_spell("gone")[0] == "failed"
+
+
+def test_schedule_commands(tmp_path):
+    spell = {"commands": ["remember x"], "count": 1}
+    with patch('Lucien.load_spells', return_value={"notes": spell}), \
+         patch('sys.stdout', new=StringIO()) as out:
+        Lucien.cmd_schedule_add("notes every 5m")
+        Lucien.cmd_schedule_add("notes hourly")
+        Lucien.cmd_schedule_add("missing every 5m")
+        Lucien.cmd_schedule_list("")
+        Lucien.cmd_schedule_history("")
+        Lucien.cmd_schedule_remove("notes")
+        Lucien.cmd_schedule_remove("notes")
+        Lucien.cmd_schedule_stop("")
+    output = out.getvalue()
+    assert "'notes' scheduled every 5m" in output and "Scheduler started" in output
+    assert "Invalid schedule" in output and "Spell 'missing' not found" in output
+    assert "notes: every 5m" in output and "No scheduled runs yet" in output
+    assert "unscheduled" in output and "is not scheduled" in output
+    assert "Scheduler stopped" in output
+
+
+def test_spells_that_ask_for_input_are_not_scheduled_or_run():
+    spell = {"commands": ["remember x", "delete file old.log"], "count": 2}
+    with patch('Lucien.load_spells', return_value={"ask": spell}), \
+         patch('Lucien.SCHEDULER') as scheduler, patch('Lucien.cmd_cast_spell') as cast, \
+         patch('sys.stdout', new=StringIO()) as out:
+        Lucien.cmd_schedule_add("ask every 5m")
+        assert Lucien._run_scheduled_spell("ask") == ("failed", "step(s) 2 ask for input")
+    assert "Step(s) 2 of 'ask' ask for input" in out.getvalue()
+    scheduler.add.assert_not_called()
+    cast.assert_not_called()
@@ -0,0 +1,119 @@
+# tests/test_semantic_cache.py
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import Lucien
+from core.semantic_cache import HashingVectorizer, SemanticCache
+
+
+def test_vectorizer_is_normalized_and_stable():
+    vec = HashingVectorizer(64)
+    a = vec.transform("Explain this error")
+    assert abs(float(a @ a) - 1.0) < 1e-5
+    assert (a == HashingVectorizer(64).transform("Explain this error")).all()
+
+
+def test_reworded_prompt_hits_unrelated_misses():
+    cache = SemanticCache(max_entries=10)
+    cache.add("ctx", "explain this error", "It means X")
+    hit = cache.lookup("ctx", "what does this error mean")
+    assert hit is not None and hit[0] == "It means X"
+    assert cache.lookup("ctx", "how do I sort a dictionary by value") is None
+    assert cache.lookup("other-ctx", "explain this error") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+# Calibration pairs for the default threshold: rewordings that must hit...
+PARAPHRASES = [
+    ("explain this error", "what does this error mean"),
+    ("how do I reverse a list in python", "how can I reverse a python list"),
+    ("how do I undo my last git commit", "how to undo the last git commit"),
+    ("write a function to reverse a string", "create a function that reverses a string"),
+    ("what is the difference between a list and a tuple", "difference between list and tuple"),
+    ("fix this TypeError", "how do I fix this TypeError"),
+    ("explain recursion", "what does recursion mean"),
+]
+# ...and near misses that must not
+NEAR_MISSES = [
+    ("sort a list ascending", "sort a list descending"),
+    ("sort a list in python", "sort a list in javascript"),
+    ("translate hello to french", "translate hello to spanish"),
+    ("why is my test failing", "why is my test not failing"),
+    ("is this thread safe", "isn't this thread safe"),
+    ("retry 3 times", "retry 5 times"),
+    ("convert json to yaml", "convert yaml to json"),
+    ("read a file line by line", "write a file line by line"),
+    ("how do I reverse a list in python", "how do I reverse a string in python"),
+    ("what port does http use", "what port does https use"),
+    ("how do I create a git branch", "how do I delete a git branch"),
+    ("find the largest number in a list", "find the smallest number in a list"),
+    ("enable logging in flask", "disable logging in flask"),
+]
+
+
+@pytest.mark.parametrize("cached, asked", PARAPHRASES)
+def test_default_threshold_matches_paraphrases(cached, asked):
+    cache = SemanticCache(max_entries=10)
+    cache.add("ctx", cached, "answer")
+    assert cache.lookup("ctx", asked) is not None
+
+
+@pytest.mark.parametrize("cached, asked", NEAR_MISSES)
+def test_opposites_numbers_and_languages_never_match(cached, asked):
+    cache = SemanticCache(max_entries=10)
+    cache.add("ctx", cached, "answer")
+    assert cache.lookup("ctx", asked) is None
+    assert cache.lookup("ctx", cached) is not None
+
+
+def test_lookup_skips_an_incompatible_best_match_for_a_compatible_one():
+    cache = SemanticCache(max_entries=10)
+    cache.add("ctx", "sort a list descending", "big first")
+    cache.add("ctx", "please sort the list ascending", "small first")
+    assert cache.lookup("ctx", "sort a list ascending")[0] == "small first"
+
+
+def test_full_cache_evicts_least_recently_used():
+    cache = SemanticCache(max_entries=2, threshold=0.99)
+    cache.add("ns", "reverse a python list", "A")
+    cache.add("ns", "merge two git branches", "B")
+    assert cache.lookup("ns", "reverse a python list")[0] == "A"
+    cache.add("ns", "parse json from a file", "C")
+    assert len(cache) == 2
+    assert cache.lookup("ns", "merge two git branches") is None
+    assert cache.lookup("ns", "reverse a python list")[0] == "A"
+
+
+def test_dispatch_serves_reworded_question_with_history_on(monkeypatch):
+    monkeypatch.setattr(Lucien, "_semantic", SemanticCache(max_entries=100))
+    with patch("Lucien.SEMANTIC_ENABLED", True), \
+         patch("Lucien.HISTORY_ENABLED", True), \
+         patch("Lucien.USE_INTERNET", False), \
+         patch("Lucien.chat_ollama", return_value="A KeyError means a missing key") as mock_chat, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("explain this KeyError")
+        Lucien.dispatch("history clear")
+        Lucien.dispatch("what does this KeyError mean")
+    assert mock_chat.call_count == 1
+    assert fake_out.getvalue().count("missing key") == 2
+
+
+def test_follow_up_in_another_conversation_is_not_served_from_cache(monkeypatch):
+    monkeypatch.setattr(Lucien, "_semantic", SemanticCache(max_entries=100))
+    answers = iter(["Sets are unordered", "More on sets", "Git rebase replays commits", "More on rebase"])
+    with patch("Lucien.SEMANTIC_ENABLED", True), \
+         patch("Lucien.HISTORY_ENABLED", True), \
+         patch("Lucien.USE_INTERNET", False), \
+         patch("Lucien.chat_ollama", side_effect=lambda *a, **k: next(answers)) as mock_chat, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("what is a python set")
+        Lucien.dispatch("explain more")
+        Lucien.dispatch("history clear")
+        Lucien.dispatch("what does git rebase do")
+        Lucien.dispatch("explain more")
+    assert mock_chat.call_count == 4
+    assert fake_out.getvalue().splitlines()[-1] == "More on rebase"
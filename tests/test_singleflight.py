@@ -0,0 +1,77 @@
+# tests/test_singleflight.py
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return "answer"
+
+    def caller():
+        results.append(flight.do("k", slow))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.coalesced < 4:
+        threading.Event().wait(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert results == ["answer"] * 5
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_errors_propagate_to_waiters_and_are_not_remembered():
+    flight = SingleFlight()
+    with pytest.raises(RuntimeError):
+        flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+    assert flight.do("k", lambda: "ok") == "ok"
+    assert flight.executed == 2
+
+
+def test_ask_llm_coalesces_identical_prompts():
+    flight = SingleFlight()
+    release = threading.Event()
+    answers = []
+
+    def slow_chat(messages, **kwargs):
+        release.wait(2)
+        return "shared"
+
+    with patch("Lucien.INFLIGHT", flight), \
+         patch("Lucien.CACHE_ENABLED", False), \
+         patch("Lucien.chat_ollama", side_effect=slow_chat) as mock_chat:
+        threads = [threading.Thread(target=lambda: answers.append(
+            Lucien.ask_llm("ollama", Lucien.build_messages("same question")))) for _ in range(3)]
+        for t in threads:
+            t.start()
+        while flight.coalesced < 2:
+            threading.Event().wait(0.001)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+    assert mock_chat.call_count == 1
+    assert answers == ["shared"] * 3
+
+
+def test_cache_stats_shows_coalescing():
+    with patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_cache_stats("")
+    assert "In-flight coalescing" in fake_out.getvalue()
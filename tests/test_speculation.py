@@ -0,0 +1,69 @@
+# tests/test_speculation.py
+import shutil
+import subprocess
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.speculation import Speculator
+
+
+def test_claim_waits_for_running_job_with_matching_key():
+    release = threading.Event()
+    spec = Speculator()
+    spec.start("tree-a", lambda: release.wait(5) and "msg")
+    threading.Timer(0.05, release.set).start()
+    assert spec.claim("tree-a", timeout=5) == "msg"
+    assert spec.stats()["used"] == 1
+    assert spec.claim("tree-a") is None  # consumed
+
+
+def test_changed_key_is_a_miss_and_newer_start_wins():
+    spec = Speculator()
+    spec.start("tree-a", lambda: "a")
+    spec.start("tree-b", lambda: "b")
+    assert spec.start("tree-b", lambda: "again") is False
+    assert spec.claim("tree-c") is None
+    s = spec.stats()
+    assert (s["started"], s["used"], s["missed"]) == (2, 0, 1)
+
+
+def test_failed_job_is_reported_not_raised():
+    spec = Speculator()
+
+    def boom():
+        raise RuntimeError("offline")
+
+    spec.start("k", boom)
+    assert spec.claim("k", timeout=5) is None
+    assert spec.stats()["failed"] == 1
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_git_add_drafts_message_used_by_commit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for args in (["init", "-q"], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git"] + args, check=True)
+    (tmp_path / "a.py").write_text("print('a')\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("print('b')\n", encoding="utf-8")
+
+    with patch("Lucien.SPECULATE_COMMIT", True), \
+         patch("Lucien.USE_INTERNET", False), \
+         patch("Lucien.ask_llm", return_value="feat: add a") as mock_ask, \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_git_add("a.py")
+        Lucien.cmd_git_commit("")
+        assert "(drafted after git add)" in fake_out.getvalue()
+        assert mock_ask.call_count == 1
+
+        # Index changes after the draft: commit falls back to generating
+        (tmp_path / "a.py").write_text("print('a2')\n", encoding="utf-8")
+        Lucien.cmd_git_add("a.py")
+        subprocess.run(["git", "add", "b.py"], check=True)
+        Lucien.cmd_git_commit("")
+    assert "(drafted after git add)" not in fake_out.getvalue().splitlines()[-1]
+    stats = Lucien.COMMIT_SPECULATOR.stats()
+    assert (stats["started"], stats["used"], stats["missed"]) == (2, 1, 1)
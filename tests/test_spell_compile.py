@@ -0,0 +1,69 @@
+# tests/test_spell_compile.py
+import json
+import os
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+
+
+@pytest.fixture
+def spells_file(tmp_path, monkeypatch):
+    path = tmp_path / "spells.json"
+    monkeypatch.setattr(Lucien, "SPELLS_FILE", path)
+    return path
+
+
+def test_resolve_command_matches_dispatch_rules():
+    name, fn, args = Lucien.resolve_command("git status --limit 5")
+    assert (name, fn, args) == ("git status", Lucien.cmd_git_status, "--limit 5")
+    assert Lucien.resolve_command("remember buy milk")[2] == "buy milk"
+    assert Lucien.resolve_command("what is a monad") is None
+
+
+def test_load_spells_reuses_parse_until_file_changes(spells_file):
+    spells_file.write_text(json.dumps({"a": {"commands": ["help"], "count": 1}}), encoding="utf-8")
+    with patch("Lucien.json.load", wraps=json.load) as mock_load:
+        assert "a" in Lucien.load_spells()
+        assert "a" in Lucien.load_spells()
+        assert mock_load.call_count == 1
+        spells_file.write_text(json.dumps({"b": {"commands": ["help"], "count": 1}}), encoding="utf-8")
+        st = spells_file.stat()
+        os.utime(spells_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert list(Lucien.load_spells()) == ["b"]
+        assert mock_load.call_count == 2
+
+
+def test_recording_flags_unresolved_lines_and_stores_steps(spells_file, monkeypatch):
+    monkeypatch.setattr(Lucien, "recording_spell", None)
+    monkeypatch.setattr(Lucien, "recorded_commands", [])
+    with patch("sys.stdout", new=StringIO()) as fake_out, \
+         patch("Lucien.respond", return_value="ok"), \
+         patch("Lucien.semantic_answer", return_value=None):
+        Lucien.dispatch("record spell morning")
+        Lucien.dispatch("show memory")
+        Lucien.dispatch("shwo memory")
+        Lucien.dispatch("stop recording")
+    output = fake_out.getvalue()
+    assert "'shwo memory' is not a command" in output
+    assert "1 line(s) are not commands" in output
+    saved = json.loads(spells_file.read_text(encoding="utf-8"))["morning"]
+    assert saved["steps"] == ["show memory", None]
+
+
+def test_cast_calls_handlers_directly_and_dispatches_the_rest(spells_file):
+    spells_file.write_text(json.dumps({"s": {
+        "commands": ["remember one", "explain monads"],
+        "steps": ["remember", None],
+        "description": "", "created": "2025-01-01T00:00:00", "count": 2,
+    }}), encoding="utf-8")
+    calls = []
+    with patch.dict(Lucien.COMMANDS, {"remember": calls.append}), \
+         patch("Lucien.dispatch") as mock_dispatch, \
+         patch("sys.stdout", new=StringIO()):
+        Lucien.cmd_cast_spell("s")
+        Lucien.cmd_cast_spell("s")
+    assert calls == ["one", "one"]
+    assert [c.args[0] for c in mock_dispatch.call_args_list] == ["explain monads"] * 2
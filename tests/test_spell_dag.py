@@ -0,0 +1,156 @@
+# tests/test_spell_dag.py
+import json
+import sys
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.output_capture import ThreadLocalStdout, install
+from core.spell_dag import check_dependencies, parse_stages, run_dag
+
+
+def test_parse_stages_builds_dependencies():
+    assert parse_stages("1 2 | 3", 4) == [[], [], [1, 2], [3]]
+    with pytest.raises(ValueError, match="out of range"):
+        parse_stages("1 | 5", 4)
+    with pytest.raises(ValueError, match="twice"):
+        parse_stages("1 | 1", 2)
+
+
+def test_check_dependencies_rejects_cycles():
+    with pytest.raises(ValueError, match="cycle"):
+        check_dependencies([[3], [1], [2]])
+
+
+def test_run_dag_runs_independent_steps_concurrently_in_order():
+    both_running = threading.Barrier(2, timeout=2)
+
+    def run_step(number):
+        if number in (1, 2):
+            both_running.wait()  # deadlocks unless steps 1 and 2 overlap
+            time.sleep(0.02 if number == 1 else 0)
+        return f"out{number}"
+
+    results = list(run_dag(3, [[], [], [1, 2]], run_step, max_workers=4))
+    assert [r.number for r in results] == [1, 2, 3]
+    assert [r.output for r in results] == ["out1", "out2", "out3"]
+
+
+def test_failed_step_skips_dependents_only():
+    def run_step(number):
+        if number == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    results = list(run_dag(3, [[], [1], []], run_step))
+    assert str(results[0].error) == "boom"
+    assert results[1].skipped
+    assert results[2].output == "ok" and not results[2].skipped
+
+
+def test_thread_local_stdout_separates_threads():
+    outputs = {}
+    with patch("sys.stdout", new=StringIO()) as real:
+        out = install()
+        assert install() is out and out.target is real
+
+        def work(name):
+            with out.capture() as buf:
+                for _ in range(50):
+                    print(name)
+            outputs[name] = buf.getvalue()
+        threads = [threading.Thread(target=work, args=(n,)) for n in "ab"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print("main")
+    assert outputs["a"] == "a\n" * 50 and outputs["b"] == "b\n" * 50
+    assert real.getvalue() == "main\n"
+
+
+def test_cast_parallel_spell_prints_in_step_order(tmp_path, monkeypatch):
+    spells_file = tmp_path / "spells.json"
+    monkeypatch.setattr(Lucien, "SPELLS_FILE", spells_file)
+    spells_file.write_text(json.dumps({"s": {
+        "commands": ["slow", "fast", "last"], "description": "", "created": "2025-01-01T00:00:00", "count": 3,
+    }}), encoding="utf-8")
+    handlers = {
+        "slow": lambda args: (time.sleep(0.05), print("slow done")),
+        "fast": lambda args: print("fast done"),
+        "last": lambda args: print("last done"),
+    }
+    with patch.dict(Lucien.COMMANDS, handlers), patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_spell_stages("s 1 2 | 3")
+        Lucien.cmd_cast_spell("s")
+    output = fake_out.getvalue()
+    assert output.index("slow done") < output.index("fast done") < output.index("last done")
+    assert "[1/3] slow (" in output
+    assert "✅ Spell 's' completed!" in output
+    assert "s wall" in output
+
+
+def test_overlapping_parallel_casts_keep_their_own_output():
+    def work(args):
+        time.sleep(0.02)
+        print(f"did {args}")
+    spells = {"a": ["work a1", "work a2", "work a3"], "b": ["work b1", "work b2", "work b3"]}
+    outputs = {}
+    with patch.dict(Lucien.COMMANDS, {"work": work}), patch("sys.stdout", new=StringIO()) as real:
+        for name, commands in spells.items():
+            Lucien.store_spell(name, {"commands": commands, "description": "", "created": "2025-01-01T00:00:00",
+                                      "count": 3, "after": [[], [], [1, 2]]})
+
+        def cast(name):
+            with install().capture() as buffer:
+                Lucien.cmd_cast_spell(name)
+            outputs[name] = buffer.getvalue()
+        threads = [threading.Thread(target=cast, args=(name,)) for name in spells]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert isinstance(sys.stdout, ThreadLocalStdout) and sys.stdout.target is real
+    assert real.getvalue() == ""
+    for name, other in (("a", "b"), ("b", "a")):
+        assert all(f"did {name}{i}" in outputs[name] for i in (1, 2, 3))
+        assert f"did {other}" not in outputs[name]
+        assert f"✅ Spell '{name}' completed!" in outputs[name]
+
+
+def test_steps_that_ask_for_input_run_one_at_a_time():
+    asked = []
+
+    def confirm(args):
+        asked.append(threading.current_thread() is threading.main_thread())
+        print(f"answer {input('sure? ')}")
+    with patch.dict(Lucien.COMMANDS, {"delete file": confirm, "work": print}), \
+            patch("builtins.input", return_value="y"), patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.store_spell("ask", {"commands": ["delete file x", "work first"], "description": "",
+                                   "created": "2025-01-01T00:00:00", "count": 2, "after": [[2], []]})
+        Lucien.cmd_cast_spell("ask")
+    output = fake_out.getvalue()
+    assert asked == [True]
+    assert "Step(s) 1 ask for input" in output
+    assert output.index("first") < output.index("answer y")
+
+
+def test_single_stage_spell_runs_its_steps_concurrently():
+    both_running = threading.Barrier(2, timeout=2)
+    passed = []
+
+    def work(args):
+        both_running.wait()  # breaks unless both steps run at once
+        passed.append(args)
+    with patch.dict(Lucien.COMMANDS, {"work": work}), patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.store_spell("pair", {"commands": ["work a", "work b"], "description": "",
+                                    "created": "2025-01-01T00:00:00", "count": 2})
+        Lucien.cmd_spell_stages("pair 1 2")
+        assert Lucien.find_spell("pair")["after"] == [[], []]
+        Lucien.cmd_cast_spell("pair")
+    assert sorted(passed) == ["a", "b"]
+    assert "✅ Spell 'pair' completed!" in fake_out.getvalue()
@@ -0,0 +1,81 @@
+# tests/test_spell_store.py
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import Lucien
+from core.spell_store import SqliteSpellStore
+
+
+def _spell(*commands, **extra):
+    spell = {"commands": list(commands), "description": "d", "created": "2025-01-01T00:00:00",
+             "count": len(commands)}
+    spell.update(extra)
+    return spell
+
+
+def test_put_get_delete_and_tags(tmp_path):
+    store = SqliteSpellStore(tmp_path / "spells.db")
+    store.put("a", _spell("help", tags=["daily"]))
+    store.put("b", _spell("git status"))
+    assert store.get("a")["commands"] == ["help"]
+    assert store.get("missing") is None
+    assert not store.add("a", _spell("other"))
+    assert [row[0] for row in store.summaries("daily")] == ["a"]
+    store.record_use("a")
+    store.record_use("a")
+    assert store.summaries()[0][4] == 2
+    store.put("a", _spell("help", "list spells"))  # keeps usage, replaces tags
+    assert store.summaries()[0][4:] == (2, [])
+    assert store.delete("b") and not store.delete("b")
+    assert store.journal_mode() == "wal"
+
+
+def test_replace_all_and_second_connection_see_same_rows(tmp_path):
+    path = tmp_path / "spells.db"
+    store = SqliteSpellStore(path)
+    store.replace_all({"a": _spell("help"), "b": _spell("help")})
+    store.replace_all({"b": _spell("git log"), "c": _spell("help")})
+    assert SqliteSpellStore(path).load_all() == {"b": _spell("git log"), "c": _spell("help")}
+
+
+def test_migrate_json_runs_once(tmp_path):
+    source = tmp_path / "spells.json"
+    source.write_text(json.dumps({"a": _spell("help", tags=["x"])}), encoding="utf-8")
+    store = SqliteSpellStore(tmp_path / "spells.db")
+    assert store.migrate_json(source) == 1
+    store.delete("a")
+    assert store.migrate_json(source) is None
+    assert store.get("a") is None
+
+
+def test_commands_use_sqlite_store(tmp_path, monkeypatch):
+    source = tmp_path / "spells.json"
+    source.write_text(json.dumps({"old": _spell("help")}), encoding="utf-8")
+    monkeypatch.setattr(Lucien, "SPELLS_FILE", source)
+    monkeypatch.setattr(Lucien, "SPELL_STORE", "sqlite")
+    monkeypatch.setattr(Lucien, "SPELL_DB", tmp_path / "spells.db")
+    monkeypatch.setattr(Lucien, "_sqlite_spells", None)
+    with patch.dict(Lucien.COMMANDS, {"help": lambda args: None}), \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("spell tag old nightly")
+        Lucien.dispatch("cast spell old")
+        Lucien.dispatch("list spells --tag nightly")
+        Lucien.dispatch("delete spell old")
+        Lucien.dispatch("list spells")
+    output = fake_out.getvalue()
+    assert "Imported 1 spell(s)" in output
+    assert "Cast: 1x, Tags: nightly" in output
+    assert "✅ Spell 'old' deleted" in output
+    assert output.rstrip().endswith("No spells recorded yet.")
+    assert json.loads(source.read_text(encoding="utf-8")) == {"old": _spell("help")}  # JSON left intact
+
+
+def test_spell_tag_leaves_the_loaded_spell_alone_when_saving_fails():
+    spell = _spell("help")
+    with patch("Lucien.find_spell", return_value=spell), \
+         patch("Lucien.store_spell", return_value=False), \
+         patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.cmd_spell_tag("s nightly")
+    assert "❌ Error saving spell" in fake_out.getvalue()
+    assert "tags" not in spell
@@ -0,0 +1,58 @@
+# tests/test_startup.py
+import os
+from pathlib import Path
+
+import pytest
+
+from core.startup import direct_imports, format_breakdown, measure_import, parse_importtime
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Best-of-3 wall time for `import Lucien` in a fresh interpreter
+STARTUP_BUDGET_MS = float(os.getenv("LUCIEN_STARTUP_BUDGET_MS", "250"))
+
+# Only needed by specific commands; importing any of them at startup is a regression
+LAZY_MODULES = ["requests", "urllib3", "psutil", "asyncio", "sqlite3", "webbrowser",
+                "cProfile", "tracemalloc", "numpy", "socketserver", "plugins.system", "plugins.files",
+                "core.batch", "core.daemon"]
+
+
+@pytest.fixture
+def fresh_cwd(tmp_path, monkeypatch):
+    # An unreadable memory file makes an eager load_memory() fail the import
+    (tmp_path / "memory.json").write_text("{not json")
+    monkeypatch.setenv("MEMORY_FILE", str(tmp_path / "memory.json"))
+    return tmp_path
+
+
+def test_import_is_lazy_and_has_no_side_effects(fresh_cwd):
+    report = measure_import("Lucien", cwd=fresh_cwd, path=REPO_ROOT)
+    assert [m for m in LAZY_MODULES if m in report.modules] == []
+    assert not (fresh_cwd / ".lucien").exists()
+
+
+def test_dotenv_is_only_imported_when_there_is_a_file(fresh_cwd):
+    if any((d / ".env").is_file() for d in (REPO_ROOT, *REPO_ROOT.parents)):
+        pytest.skip("a .env file would be loaded")
+    assert "dotenv" not in measure_import("Lucien", cwd=fresh_cwd, path=REPO_ROOT).modules
+
+
+def test_startup_time_budget(fresh_cwd):
+    best = min(measure_import("Lucien", cwd=fresh_cwd, path=REPO_ROOT).seconds for _ in range(3))
+    assert best * 1000 < STARTUP_BUDGET_MS, f"import Lucien took {best * 1000:.0f} ms"
+
+
+def test_parse_importtime_and_breakdown():
+    text = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     json.decoder",
+        "import time:       200 |        300 |   json",
+        "import time:        50 |         50 |   core.tokens",
+        "import time:      1000 |       1350 | Lucien",
+    ])
+    entries = parse_importtime(text)
+    assert [(e.name, e.depth) for e in entries] == [("json.decoder", 2), ("json", 1), ("core.tokens", 1), ("Lucien", 0)]
+    top, children = direct_imports(entries, "Lucien")
+    assert top.cumulative_us == 1350 and {c.name for c in children} == {"json", "core.tokens"}
+    lines = format_breakdown(entries, "Lucien")
+    assert lines[0].startswith("Lucien: 1.4 ms total") and "json" in lines[2]
@@ -0,0 +1,60 @@
+# tests/test_telemetry.py
+import json
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import Lucien
+from core.telemetry import LatencyHistogram, Telemetry
+
+
+def test_histogram_percentiles_within_bucket_error():
+    hist = LatencyHistogram()
+    for ms in range(1, 1001):
+        hist.add(ms / 1000)
+    assert hist.percentile(50) == pytest.approx(0.5, rel=0.06)
+    assert hist.percentile(95) == pytest.approx(0.95, rel=0.06)
+    assert hist.percentile(99) == pytest.approx(0.99, rel=0.06)
+    assert len(hist.buckets) < 200
+
+
+def test_track_records_outcomes_and_jsonl(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    telemetry = Telemetry(path=str(path))
+    with telemetry.track("groq", "m") as rec:
+        rec["completion_tokens"] = 10
+    with pytest.raises(RuntimeError):
+        with telemetry.track("groq", "m") as rec:
+            rec["status"] = 429
+            raise RuntimeError("rate limited")
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [r["outcome"] for r in rows] == ["ok", "http_429"]
+    summary = telemetry.summary()[0]
+    assert (summary["calls"], summary["errors"], summary["completion_tokens"]) == (2, 1, 10)
+
+
+def test_chat_ollama_is_instrumented():
+    telemetry = Telemetry()
+    session = MagicMock()
+    resp = session.post.return_value
+    resp.status_code = 200
+    resp.content = b'{"message": {"content": "hi"}}'
+    resp.json.return_value = {"message": {"content": "hi"}, "prompt_eval_count": 5, "eval_count": 3}
+    with patch("Lucien.get_session", return_value=session), patch("Lucien.TELEMETRY", telemetry):
+        Lucien.chat_ollama([{"role": "user", "content": "ping"}], model="llama3")
+    row = telemetry.summary()[0]
+    assert (row["provider"], row["model"], row["calls"]) == ("ollama", "llama3", 1)
+    assert (row["prompt_tokens"], row["completion_tokens"]) == (5, 3)
+    assert row["bytes_sent"] > 0 and row["bytes_received"] == len(resp.content)
+
+
+def test_stats_command():
+    telemetry = Telemetry()
+    with telemetry.track("groq", "llama3-70b-8192") as rec:
+        rec["completion_tokens"] = 4
+    with patch("Lucien.TELEMETRY", telemetry), patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("stats")
+    out = fake_out.getvalue()
+    assert "groq/llama3-70b-8192: 1 calls, 0 errors" in out
+    assert "p95" in out
@@ -0,0 +1,73 @@
+# tests/test_workspace.py
+import shutil
+import subprocess
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+import Lucien
+from core.workspace import Workspace, repo_status, run_across
+
+
+def _init_repo(path, dirty=False):
+    path.mkdir()
+    for args in (["init", "-q"], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git", "-C", str(path)] + args, check=True)
+    (path / "f.txt").write_text("one\n", encoding="utf-8")
+    subprocess.run(["git", "-C", str(path), "add", "f.txt"], check=True)
+    subprocess.run(["git", "-C", str(path), "commit", "-qm", f"init {path.name}"], check=True)
+    if dirty:
+        (path / "f.txt").write_text("two\n", encoding="utf-8")
+
+
+def test_patterns_persist_and_expand_to_git_checkouts(tmp_path):
+    (tmp_path / "a" / ".git").mkdir(parents=True)
+    (tmp_path / "b" / ".git").mkdir(parents=True)
+    (tmp_path / "not-a-repo").mkdir()
+    ws = Workspace(tmp_path / "ws.json")
+    assert ws.add(str(tmp_path / "*"))
+    assert ws.add(str(tmp_path / "a"))
+    assert not ws.add(str(tmp_path / "a"))
+    assert Workspace(tmp_path / "ws.json").repos() == [str(tmp_path / "a"), str(tmp_path / "b")]
+
+
+def test_run_across_keeps_order_bounds_workers_and_captures_errors():
+    active = peak = 0
+    lock = threading.Lock()
+
+    def op(repo):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.03 if repo == "r0" else 0.01)
+        with lock:
+            active -= 1
+        if repo == "r3":
+            raise subprocess.CalledProcessError(128, "git", stderr="fatal: broken\nmore")
+        return [repo.upper()]
+
+    results = list(run_across([f"r{i}" for i in range(6)], op, max_workers=2))
+    assert [r.repo for r in results] == [f"r{i}" for i in range(6)]
+    assert results[0].lines == ["R0"]
+    assert results[3].error == "fatal: broken"
+    assert peak <= 2
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_workspace_status_reports_each_repo_with_timings(tmp_path, monkeypatch):
+    _init_repo(tmp_path / "clean")
+    _init_repo(tmp_path / "dirty", dirty=True)
+    assert repo_status(str(tmp_path / "dirty")) == [" M f.txt"]
+    ws = Workspace(tmp_path / "ws.json")
+    ws.add(str(tmp_path / "*"))
+    monkeypatch.setattr(Lucien, "WORKSPACE", ws)
+    with patch("sys.stdout", new=StringIO()) as fake_out:
+        Lucien.dispatch("workspace status")
+    output = fake_out.getvalue()
+    assert "git status across 2 repositories" in output
+    assert output.index("clean - nothing to report") < output.index(" M f.txt")
+    assert "Timing (" in output and "dirty" in output.split("Timing (")[1]